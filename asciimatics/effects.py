@@ -887,29 +887,25 @@ class Clock(Effect):
         # Clear old hands
         if self._old_time is not None:
             ot = self._old_time
-            self._screen.move(self._x, self._y)
-            self._screen.draw(self._x + (self._r * sin(_hour_pos(ot))),
-                              self._y - (self._r * cos(_hour_pos(ot)) / 2),
-                              char=" ", bg=self._bg)
-            self._screen.move(self._x, self._y)
-            self._screen.draw(self._x + (self._r * sin(_min_pos(ot)) * 2),
-                              self._y - (self._r * cos(_min_pos(ot))),
-                              char=" ", bg=self._bg)
-            self._screen.move(self._x, self._y)
-            self._screen.draw(self._x + (self._r * sin(_sec_pos(ot)) * 2),
-                              self._y - (self._r * cos(_sec_pos(ot))),
-                              char=" ", bg=self._bg)
+            self._screen.draw_lines(
+                [[(self._x, self._y),
+                  (self._x + (self._r * sin(_hour_pos(ot))), self._y - (self._r * cos(_hour_pos(ot)) / 2))],
+                 [(self._x, self._y),
+                  (self._x + (self._r * sin(_min_pos(ot)) * 2), self._y - (self._r * cos(_min_pos(ot))))],
+                 [(self._x, self._y),
+                  (self._x + (self._r * sin(_sec_pos(ot)) * 2), self._y - (self._r * cos(_sec_pos(ot))))]],
+                char=" ", bg=self._bg)
 
         # Draw new ones
         new_time = datetime.datetime.now().timetuple()
-        self._screen.move(self._x, self._y)
-        self._screen.draw(self._x + (self._r * sin(_hour_pos(new_time))),
-                          self._y - (self._r * cos(_hour_pos(new_time)) / 2),
-                          colour=Screen.COLOUR_WHITE, bg=self._bg)
-        self._screen.move(self._x, self._y)
-        self._screen.draw(self._x + (self._r * sin(_min_pos(new_time)) * 2),
-                          self._y - (self._r * cos(_min_pos(new_time))),
-                          colour=Screen.COLOUR_WHITE, bg=self._bg)
+        self._screen.draw_lines(
+            [[(self._x, self._y),
+              (self._x + (self._r * sin(_hour_pos(new_time))),
+               self._y - (self._r * cos(_hour_pos(new_time)) / 2))],
+             [(self._x, self._y),
+              (self._x + (self._r * sin(_min_pos(new_time)) * 2),
+               self._y - (self._r * cos(_min_pos(new_time))))]],
+            colour=Screen.COLOUR_WHITE, bg=self._bg)
         self._screen.move(self._x, self._y)
         self._screen.draw(self._x + (self._r * sin(_sec_pos(new_time)) * 2),
                           self._y - (self._r * cos(_sec_pos(new_time))),
@@ -973,15 +969,11 @@ class Cog(Effect):
 
         # Clear old wave.
         if self._old_frame != 0:
-            self._screen.move(f(0), g(0))
-            for x in range(81):
-                self._screen.draw(f(x), g(x), char=" ")
+            self._screen.draw_lines([[(f(x), g(x)) for x in range(81)]], char=" ")
 
         # Draw new one
         self._old_frame += self._direction
-        self._screen.move(f(0), g(0))
-        for x in range(81):
-            self._screen.draw(f(x), g(x), colour=self._colour)
+        self._screen.draw_lines([[(f(x), g(x)) for x in range(81)]], colour=self._colour)
 
     @property
     def stop_frame(self):
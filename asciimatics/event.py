@@ -19,18 +19,25 @@ class KeyboardEvent(Event):
     Its key field is the `key_code`.  This is the ordinal representation of the key (taking into
     account keyboard state - e.g. caps lock) if possible, or an extended key code (the `KEY_xxx`
     constants in the :py:obj:`.Screen` class) where not.
+
+    If the Screen is merging repeated key presses, the `repeat` field is the number of times that
+    the key was pressed.
     """
 
-    def __init__(self, key_code):
+    def __init__(self, key_code, repeat=1):
         """
         :param key_code: the ordinal value of the key that was pressed.
+        :param repeat: the number of times the key was pressed.
         """
         self.key_code = key_code
+        self.repeat = repeat
 
     def __repr__(self):
         """
         :returns: a string representation of the keyboard event.
         """
+        if self.repeat > 1:
+            return "KeyboardEvent: {} x{}".format(self.key_code, self.repeat)
         return "KeyboardEvent: {}".format(self.key_code)
 
 
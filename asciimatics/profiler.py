@@ -0,0 +1,317 @@
+"""
+This module provides a simple profiler to find out which Effects (and widgets) are using the most
+time when playing a Scene.  For more details, see
+http://asciimatics.readthedocs.io/en/latest/animation.html
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import object
+import time
+from asciimatics.effects import Effect
+from asciimatics.screen import Screen
+from asciimatics.widgets import Frame
+
+
+class ProfileStats(object):
+    """
+    Cumulative profiling results for a single Effect or widget.
+
+    All times are in seconds and include any time spent in child objects - e.g. a Frame includes
+    the time taken to update all of its widgets.
+    """
+
+    def __init__(self, target, name, parent=None):
+        """
+        :param target: The Effect or widget being profiled.
+        :param name: The name to use for the target in reports.
+        :param parent: The ProfileStats of the Frame that owns this widget (if any).
+        """
+        #: The Effect or widget being profiled.
+        self.target = target
+
+        #: The name of the target.
+        self.name = name
+
+        #: The ProfileStats of the Frame that owns this widget (if any).
+        self.parent = parent
+
+        #: Number of times the target has been updated.
+        self.calls = 0
+
+        #: Total time spent updating the target.
+        self.total_time = 0.0
+
+        #: Longest time taken by a single update.
+        self.max_time = 0.0
+
+        #: Total number of cells drawn by the target.
+        self.cells = 0
+
+    @property
+    def mean_time(self):
+        """
+        The average time taken for each update.
+        """
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+    def reset(self):
+        """
+        Reset the cumulative results.
+        """
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.cells = 0
+
+    def __repr__(self):
+        """
+        :returns: a string representation of the results.
+        """
+        return "ProfileStats {}: {} calls, {:.2f}ms, {} cells".format(
+            self.name, self.calls, self.total_time * 1000, self.cells)
+
+
+class Profiler(object):
+    """
+    Profiler to record how long each Effect takes to update and how many cells it draws.
+
+    This is opt-in: only the Effects that you pass to :py:meth:`.profile` (or
+    :py:meth:`.profile_scene`) are profiled, and they are only slowed down while they are being
+    profiled.  For a Frame, each of its widgets is also profiled.  For example:
+
+    .. code-block:: python
+
+        profiler = Profiler()
+        profiler.profile_scene(scene)
+        screen.play([scene])
+        print("\\n".join(profiler.report()))
+    """
+
+    def __init__(self):
+        # Keep the results in order of profiling, with an index by target for quick look-ups.
+        self._stats = []
+        self._stats_by_id = {}
+
+    def profile(self, effect):
+        """
+        Start profiling an Effect.
+
+        :param effect: The Effect to profile.
+        """
+        stats = self._get_stats(effect)
+        if "update" not in effect.__dict__:
+            original = effect.update
+
+            def _update(frame_no):
+                self._measure(stats, effect.screen, original, frame_no)
+
+            effect.update = _update
+        if isinstance(effect, Frame):
+            # Widgets can't be patched directly (as they use slots), so the Frame calls back into
+            # the Profiler to update each widget instead.
+            def _profile_widget(widget, frame_no):
+                self._measure(self._get_stats(widget, stats), effect.canvas, widget.update, frame_no)
+
+            effect._profile_widget = _profile_widget
+
+    def profile_scene(self, scene):
+        """
+        Start profiling all the Effects in a Scene.
+
+        :param scene: The Scene to profile.
+        """
+        for effect in scene.effects:
+            self.profile(effect)
+
+    def stop(self):
+        """
+        Stop profiling.  The results so far are still available.
+        """
+        for stats in self._stats:
+            target = stats.target
+            if isinstance(target, Effect):
+                if "update" in target.__dict__:
+                    del target.update
+                if isinstance(target, Frame):
+                    target._profile_widget = None
+
+    def reset(self):
+        """
+        Reset all the results.
+        """
+        for stats in self._stats:
+            stats.reset()
+
+    @property
+    def results(self):
+        """
+        The list of :py:obj:`.ProfileStats` for all profiled objects, sorted by total time
+        (slowest first).
+        """
+        return sorted(self._stats, key=lambda s: s.total_time, reverse=True)
+
+    def report(self, limit=None):
+        """
+        Create a text report of the profiling results.
+
+        :param limit: The maximum number of objects to include.  Defaults to all of them.
+        :returns: The report as a list of lines.
+        """
+        lines = ["{:<32} {:>8} {:>10} {:>10} {:>10}".format(
+            "Name", "Calls", "Total ms", "Mean ms", "Cells")]
+        for stats in self.results[:limit]:
+            lines.append("{:<32} {:>8} {:>10.2f} {:>10.3f} {:>10}".format(
+                stats.name[:32], stats.calls, stats.total_time * 1000, stats.mean_time * 1000,
+                stats.cells))
+        return lines
+
+    @staticmethod
+    def _name(target):
+        """
+        Create a name for an Effect or widget.
+        """
+        name = getattr(target, "name", None)
+        if name:
+            return "{}({})".format(type(target).__name__, name)
+        return type(target).__name__
+
+    @staticmethod
+    def _hook(buffer, name, hook):
+        """
+        Temporarily replace a method of a buffer.
+
+        :returns: Any previous replacement, so that nested hooks can be unwound.
+        """
+        old = buffer.__dict__.get(name)
+        setattr(buffer, name, hook)
+        return old
+
+    @staticmethod
+    def _unhook(buffer, name, old):
+        """
+        Undo a call to _hook.
+        """
+        if old is None:
+            del buffer.__dict__[name]
+        else:
+            setattr(buffer, name, old)
+
+    def _get_stats(self, target, parent=None):
+        """
+        Find (or create) the ProfileStats for an Effect or widget.
+
+        :param target: The Effect or widget being profiled.
+        :param parent: The ProfileStats of the owning Frame (if any).
+        """
+        # The stats hold a reference to the target, so its id can't be re-used while we have them.
+        stats = self._stats_by_id.get(id(target))
+        if stats is None:
+            stats = ProfileStats(target, self._name(target), parent)
+            self._stats.append(stats)
+            self._stats_by_id[id(target)] = stats
+        return stats
+
+    def _measure(self, stats, canvas, fn, frame_no):
+        """
+        Call an update function and record how long it took and how many cells it drew.
+
+        :param stats: The ProfileStats to update.
+        :param canvas: The Screen or Canvas that is drawn on (if any).
+        :param fn: The update function to call.
+        :param frame_no: The frame number to pass to the update function.
+        """
+        # Count the cells drawn by temporarily hooking the canvas' buffer.  These are instance
+        # attributes, so just deleting them restores the original methods.
+        cells = [0]
+        hooks = []
+        if canvas is not None:
+            buffer = canvas._buffer
+
+            def _set(x, y, value, _next=buffer.set):
+                cells[0] += len(value) if isinstance(x, slice) else 1
+                _next(x, y, value)
+
+            def _clear(fg, attr, bg, x=0, y=0, w=None, h=None, _next=buffer.clear):
+                cells[0] += ((buffer.width if w is None else w) *
+                             (buffer.height if h is None else h))
+                _next(fg, attr, bg, x, y, w, h)
+
+            def _recolour(x, y, w, h, fg_map=None, bg_map=None, _next=buffer.recolour):
+                cells[0] += w * h
+                _next(x, y, w, h, fg_map, bg_map)
+
+            def _block_transfer(other, x, y, _next=buffer.block_transfer):
+                # Only the damaged cells are copied, so count those as they are marked dirty.
+                def _mark_dirty(row, start, end, _mark=buffer._mark_dirty):
+                    cells[0] += end - start
+                    _mark(row, start, end)
+
+                old = self._hook(buffer, "_mark_dirty", _mark_dirty)
+                try:
+                    _next(other, x, y)
+                finally:
+                    self._unhook(buffer, "_mark_dirty", old)
+
+            hooks = [(name, self._hook(buffer, name, hook))
+                     for name, hook in (("set", _set), ("clear", _clear), ("recolour", _recolour),
+                                        ("block_transfer", _block_transfer))]
+        start = time.time()
+        try:
+            fn(frame_no)
+        finally:
+            elapsed = time.time() - start
+            for name, old in reversed(hooks):
+                self._unhook(buffer, name, old)
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.cells += cells[0]
+
+
+class ProfilerOverlay(Effect):
+    """
+    Effect to display the slowest Effects from a :py:obj:`.Profiler` on the Screen.
+
+    Add this as the last Effect in your Scene so that it is drawn on top of everything else.
+    """
+
+    def __init__(self, screen, profiler, count=5, x=0, y=0, colour=Screen.COLOUR_YELLOW,
+                 bg=Screen.COLOUR_BLUE, **kwargs):
+        """
+        :param screen: The Screen being used for the Scene.
+        :param profiler: The Profiler to display.
+        :param count: The number of Effects to display.
+        :param x: The column (x coord) for the top left of the overlay.
+        :param y: The line (y coord) for the top left of the overlay.
+        :param colour: The foreground colour for the overlay.
+        :param bg: The background colour for the overlay.
+
+        Also see the common keyword arguments in :py:obj:`.Effect`.
+        """
+        super(ProfilerOverlay, self).__init__(screen, **kwargs)
+        self._profiler = profiler
+        self._count = count
+        self._x = x
+        self._y = y
+        self._colour = colour
+        self._bg = bg
+
+    def reset(self):
+        pass
+
+    def _update(self, frame_no):
+        for i, line in enumerate(self._profiler.report(limit=self._count)):
+            self._screen.print_at(line, self._x, self._screen.start_line + self._y + i,
+                                  self._colour, Screen.A_BOLD if i == 0 else Screen.A_NORMAL,
+                                  self._bg)
+
+    @property
+    def stop_frame(self):
+        return self._stop_frame
+
+    @property
+    def frame_update_count(self):
+        # Refresh the results about once a second at the default frame rate.
+        return 20
@@ -0,0 +1,349 @@
+"""
+This module allows you to record the output of a Screen to a file and play it back later.  For more
+details see http://asciimatics.readthedocs.io/en/latest/animation.html
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import object
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from asciimatics.effects import Effect
+from asciimatics.exceptions import StopApplication
+from asciimatics.scene import Scene
+from asciimatics.screen import HeadlessScreen
+
+#: Version number for the recording file format.
+RECORDING_VERSION = 1
+
+
+def _open(filename, mode):
+    """
+    Open a recording file, compressing it if the name ends in .gz.
+    """
+    return gzip.open(filename, mode) if filename.endswith(".gz") else open(filename, mode)
+
+
+def _is_file(filename):
+    """
+    Check whether we've been given an open file rather than a file name.
+    """
+    return hasattr(filename, "read") or hasattr(filename, "write")
+
+
+class Recorder(object):
+    """
+    Class to write a recording file.  You don't normally need to use this directly - just call
+    :py:meth:`~.Screen.start_recording` to start recording a Screen.
+
+    The file is similar to an asciicast: the first line is a JSON header describing the Screen and
+    each following line is a JSON list of the time (in seconds) for one refresh and the list of
+    changes that it made to the display.  Each change is one of the following lists.
+
+    * `["p", x, y, fg, attr, bg, text]` - print a run of text at the specified location.
+    * `["s", y, height, lines]` - scroll a band of lines on the display (like
+      :py:meth:`~.Screen.scroll_region`).
+    * `["c"]` - clear the display.
+    """
+
+    def __init__(self, filename, width, height, colours, unicode_aware):
+        """
+        :param filename: The file to create.  If this ends with ".gz" it will be compressed.  You
+            can also pass a binary file object to write to (which is left open).
+        :param width: The width of the Screen being recorded.
+        :param height: The height of the Screen being recorded.
+        :param colours: The number of colours supported by the Screen.
+        :param unicode_aware: Whether the Screen is unicode aware.
+        """
+        self._close = not _is_file(filename)
+        self._file = _open(filename, "wb") if self._close else filename
+        self._write({
+            "version": RECORDING_VERSION,
+            "width": width,
+            "height": height,
+            "colours": colours,
+            "unicode_aware": unicode_aware,
+            "timestamp": int(time.time()),
+        })
+
+    def _write(self, data):
+        self._file.write((json.dumps(data, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def write_frame(self, timestamp, changes):
+        """
+        Add a refresh to the recording.
+
+        :param timestamp: The time of the refresh in seconds since the recording started.
+        :param changes: The list of changes made to the display.
+        """
+        self._write([round(timestamp, 3), changes])
+
+    def close(self):
+        """
+        Finish the recording and close the file (if the Recorder opened it).
+        """
+        if self._close:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class Recording(object):
+    """
+    A recording loaded from a file created by :py:meth:`~.Screen.start_recording`.
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: The recording file to load, or a binary file object to read it from.
+        """
+        if _is_file(filename):
+            lines = filename.read().decode("utf-8").splitlines()
+        else:
+            with _open(filename, "rb") as f:
+                lines = f.read().decode("utf-8").splitlines()
+        header = json.loads(lines[0])
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError("Unsupported recording version: {}".format(header.get("version")))
+
+        #: The width of the recorded Screen.
+        self.width = header["width"]
+
+        #: The height of the recorded Screen.
+        self.height = header["height"]
+
+        #: The number of colours supported by the recorded Screen.
+        self.colours = header["colours"]
+
+        #: Whether the recorded Screen was unicode aware.
+        self.unicode_aware = header["unicode_aware"]
+
+        #: The list of (time, changes) for each refresh in the recording.
+        self.frames = [tuple(json.loads(line)) for line in lines[1:] if line]
+
+    @property
+    def duration(self):
+        """
+        The length of the recording in seconds.
+        """
+        return self.frames[-1][0] if self.frames else 0
+
+    def draw_frame(self, screen, index):
+        """
+        Apply the changes for one refresh in the recording to a Screen (or Canvas).  You still need
+        to refresh the Screen to display them.
+
+        :param screen: The Screen to draw on.
+        :param index: The index of the frame in :py:obj:`.frames`.
+        """
+        start_line = screen.start_line
+        for change in self.frames[index][1]:
+            if change[0] == "p":
+                x, y, fg, attr, bg, text = change[1:]
+                screen.print_at(text, x, start_line + y, fg, attr, bg)
+            elif change[0] == "s":
+                y, height, lines = change[1:]
+                screen.scroll_region(start_line + y, height, lines)
+            elif change[0] == "c":
+                screen.clear_buffer(7, 0, 0)
+
+    def play(self, screen, speed=1.0, repeat=False, stop_on_input=True):
+        """
+        Play the recording on a Screen, using the original timings.
+
+        :param screen: The Screen to play the recording on.
+        :param speed: Multiplier for the playback speed - e.g. 2 plays it twice as fast.
+        :param repeat: Whether to play the recording in a loop.
+        :param stop_on_input: Whether to stop when the user presses a key.
+        """
+        while True:
+            start = time.time()
+            for i, frame in enumerate(self.frames):
+                delay = start + frame[0] / speed - time.time()
+                if delay > 0:
+                    if stop_on_input:
+                        screen.wait_for_input(delay)
+                    else:
+                        time.sleep(delay)
+                if stop_on_input and screen.get_event() is not None:
+                    return
+                self.draw_frame(screen, i)
+                screen.refresh()
+            if not repeat:
+                return
+
+
+class Replay(Effect):
+    """
+    Effect to play back a :py:obj:`.Recording` as part of a Scene.
+
+    This allows you to pre-compute expensive animations and then replay them for next to no CPU.
+    """
+
+    def __init__(self, screen, recording, speed=1.0, repeat=True, stop_app=False, fps=None, **kwargs):
+        """
+        :param screen: The Screen being used for the Scene.
+        :param recording: The Recording to play back.
+        :param speed: Multiplier for the playback speed - e.g. 2 plays it twice as fast.
+        :param repeat: Whether to repeat the recording once it has finished.
+        :param stop_app: Whether to stop the application once the recording has finished.
+        :param fps: Optional frame rate to use to convert frame numbers into times in the recording.
+            By default the recording is played using the current time, but this allows you to play
+            it in step with the rest of the Scene instead.
+
+        Also see the common keyword arguments in :py:obj:`.Effect`.
+        """
+        super(Replay, self).__init__(screen, **kwargs)
+        self._recording = recording
+        self._speed = speed
+        self._repeat = repeat
+        self._stop_app = stop_app
+        self._fps = fps
+        self._start = None
+        self._index = 0
+
+    def reset(self):
+        self._start = None
+        self._index = 0
+
+    def _update(self, frame_no):
+        # Check whether the whole recording has been displayed yet.
+        frames = self._recording.frames
+        if self._index >= len(frames):
+            if self._stop_app:
+                raise StopApplication("End of recording")
+            if not self._repeat:
+                return
+            self.reset()
+
+        if self._fps is None:
+            now = time.time()
+            if self._start is None:
+                self._start = now
+            elapsed = (now - self._start) * self._speed
+        else:
+            if self._start is None:
+                self._start = frame_no
+            elapsed = (frame_no - self._start) * self._speed / self._fps
+        while self._index < len(frames) and frames[self._index][0] <= elapsed:
+            self._recording.draw_frame(self._screen, self._index)
+            self._index += 1
+
+    @property
+    def stop_frame(self):
+        return self._stop_frame
+
+
+class SceneCache(object):
+    """
+    Cache of pre-rendered Scenes.
+
+    Many Scenes (e.g. credits or splash screens) always draw exactly the same thing for a given
+    Screen.  This cache renders such a Scene once (off-screen, as fast as possible) and records the
+    output.  Later plays just replay the recorded changes, so none of the Effects need to run.
+
+    The cache is keyed by the Scene name and the size, colours and unicode support of the Screen.
+    It is held in memory and can optionally be saved on disk too, so that it can be reused next time
+    the application runs.  For example:
+
+    .. code-block:: python
+
+        def intro(screen):
+            return Scene([Print(screen, FigletText("Hello"), 0)], 100)
+
+        cache = SceneCache("/var/cache/my_app")
+        screen.play([cache.scene(screen, "intro", intro)])
+    """
+
+    def __init__(self, directory=None, fps=20):
+        """
+        :param directory: Optional directory in which to save the rendered Scenes.
+        :param fps: The frame rate that the Scenes will be played at.
+        """
+        self._directory = directory
+        self._fps = fps
+        self._recordings = {}
+
+    def _filename(self, key):
+        # Only use safe characters from the name in the file name, adding a hash of the full name
+        # to keep them unique.
+        name = key[0]
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self._directory, "{}_{}_{}x{}_{}{}.rec.gz".format(
+            re.sub(r"[^A-Za-z0-9_-]", "_", name)[:40], digest, key[1], key[2], key[3],
+            "_unicode" if key[4] else ""))
+
+    def recording(self, screen, name, create):
+        """
+        Get the Recording of a Scene for a Screen, rendering it if needed.
+
+        :param screen: The Screen that the Scene will be played on.
+        :param name: The unique name of the Scene.  This is used as part of the cache key.
+        :param create: Function to create the Scene for a Screen.  The Scene must have a fixed
+            duration.
+        :returns: The Recording of the Scene.
+        """
+        key = (name, screen.width, screen.height, screen.colours, screen.unicode_aware)
+        recording = self._recordings.get(key)
+        if recording is None and self._directory is not None and os.path.exists(self._filename(key)):
+            recording = Recording(self._filename(key))
+        if recording is None:
+            recording = self._render(screen, create, key)
+        self._recordings[key] = recording
+        return recording
+
+    def scene(self, screen, name, create):
+        """
+        Create a Scene that replays the cached version of another Scene, rendering it if needed.
+
+        :param screen: The Screen that the Scene will be played on.
+        :param name: The unique name of the Scene.  This is used as part of the cache key and as
+            the name of the new Scene.
+        :param create: Function to create the Scene for a Screen.  The Scene must have a fixed
+            duration.
+        :returns: The new Scene.
+        """
+        recording = self.recording(screen, name, create)
+        duration = int(round(recording.duration * self._fps)) + 1
+        return Scene([Replay(screen, recording, repeat=False, fps=self._fps)], duration, name=name)
+
+    def _render(self, screen, create, key):
+        """
+        Render a Scene off-screen and record the results.
+        """
+        headless = HeadlessScreen(screen.height, screen.width, colours=screen.colours,
+                                  unicode_aware=screen.unicode_aware)
+        scene = create(headless)
+        if scene.duration <= 0:
+            raise ValueError("Cached Scenes must have a fixed duration")
+
+        # Record using the frame number as the clock so that the recording doesn't depend on how
+        # quickly we can render it.
+        output = io.BytesIO()
+        frame = [0]
+        headless.start_recording(output, clock=lambda: frame[0] / self._fps)
+        headless.set_scenes([scene])
+        try:
+            while True:
+                headless.draw_next_frame(repeat=False)
+                frame[0] += 1
+        except StopApplication:
+            pass
+
+        # Make sure that the recording lasts as long as the original Scene.
+        frame[0] = scene.duration - 1
+        headless.stop_recording(mark_end=True)
+
+        data = output.getvalue()
+        if self._directory is not None:
+            if not os.path.isdir(self._directory):
+                os.makedirs(self._directory)
+            with gzip.open(self._filename(key), "wb") as f:
+                f.write(data)
+        return Recording(io.BytesIO(data))
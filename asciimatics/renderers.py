@@ -18,10 +18,9 @@ from pyfiglet import Figlet, DEFAULT_FONT
 from PIL import Image
 import re
 
-from wcwidth.wcwidth import wcswidth
-
 from asciimatics.screen import Screen
 from asciimatics.constants import COLOUR_REGEX
+from asciimatics.widths import string_width
 
 
 #: Attribute conversion table for the ${c,a} form of attributes for
@@ -201,7 +200,7 @@ class StaticRenderer(Renderer):
 
         if self._max_width == 0:
             for image in self._plain_images:
-                new_max = max([wcswidth(x) for x in image])
+                new_max = max([string_width(x) for x in image])
                 self._max_width = max(new_max, self._max_width)
         return self._max_width
 
@@ -469,7 +468,7 @@ class SpeechBubble(StaticRenderer):
                      "R" for left or right tails.  Can be None for no tail.
         """
         super(SpeechBubble, self).__init__()
-        max_len = max([wcswidth(x) for x in text.split("\n")])
+        max_len = max([string_width(x) for x in text.split("\n")])
         if uni:
             bubble = "╭─" + "─" * max_len + "─╮\n"
             for line in text.split("\n"):
@@ -8,12 +8,15 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import errno
 import os
 import signal
 import struct
 import sys
 import time
+from array import array
 from abc import ABCMeta, abstractmethod
+from collections import deque
 from functools import update_wrapper, partial
 from locale import getlocale, getdefaultlocale
 from logging import getLogger
@@ -26,11 +29,11 @@ from builtins import chr
 from builtins import str
 from future.utils import with_metaclass
 from future.moves.itertools import zip_longest
-from wcwidth import wcwidth, wcswidth
 
 from asciimatics.event import KeyboardEvent, MouseEvent
 from asciimatics.exceptions import ResizeScreenError, StopApplication, NextScene
 from asciimatics.utilities import _DotDict
+from asciimatics.widths import char_width, string_width
 import asciimatics.constants as constants
 
 logger = getLogger(__name__)
@@ -39,6 +42,173 @@ logger = getLogger(__name__)
 ENABLE_EXTENDED_FLAGS = 0x0080
 ENABLE_QUICK_EDIT_MODE = 0x0040
 
+# Offset of the low byte of each colour in the raw bytes of a colour array.
+_LOW_BYTE = 0 if sys.byteorder == "little" else 1
+
+
+def _map_colours(colours, table, translation):
+    """
+    Map an array of colours through a look-up table.
+
+    Palette indexes always fit into the low byte of each colour, so this can be done for the whole
+    array at once by translating the raw bytes, rather than looking up each colour in turn.
+
+    :param colours: The array of colours to map.
+    :param table: The look-up table (indexed by colour).
+    :param translation: The same look-up table as a 256 byte translation table.
+    :returns: A new array of the mapped colours.
+    """
+    raw = bytearray(colours.tobytes() if hasattr(colours, "tobytes") else colours.tostring())
+    if raw[1 - _LOW_BYTE::2].strip(b"\0"):
+        # Not all palette indexes, so do it the slow way.
+        return array("h", [table[c] for c in colours])
+    raw[_LOW_BYTE::2] = raw[_LOW_BYTE::2].translate(translation)
+    return array("h", bytes(raw))
+
+
+class _CellArrays(object):
+    """
+    Compact storage for a grid of screen cells.
+
+    Rather than holding a tuple per cell, each field of a cell is held in its own typed array,
+    indexed by `y * width + x`.
+    """
+
+    __slots__ = ["chars", "fg", "attr", "bg", "width"]
+
+    def __init__(self, size, fg=7, attr=0, bg=0):
+        """
+        :param size: Number of cells to store.
+        :param fg: The foreground colour for the initial cells.
+        :param attr: The attribute value for the initial cells.
+        :param bg: The background colour for the initial cells.
+        """
+        self.chars = array("i", [32]) * size
+        self.fg = array("h", [fg]) * size
+        self.attr = array("h", [attr]) * size
+        self.bg = array("h", [bg]) * size
+        self.width = array("b", [1]) * size
+
+    @property
+    def planes(self):
+        """
+        The arrays making up this store, in the same order as the fields of a cell tuple.
+        """
+        return self.chars, self.fg, self.attr, self.bg, self.width
+
+    def fill(self, start, end, fg, attr, bg):
+        """
+        Fill a range of cells with spaces in the specified colours.
+
+        :param start: The index of the first cell to fill.
+        :param end: The index after the last cell to fill.
+        :param fg: The foreground colour to use.
+        :param attr: The attribute value to use.
+        :param bg: The background colour to use.
+        """
+        count = end - start
+        self.chars[start:end] = array("i", [32]) * count
+        self.fg[start:end] = array("h", [fg]) * count
+        self.attr[start:end] = array("h", [attr]) * count
+        self.bg[start:end] = array("h", [bg]) * count
+        self.width[start:end] = array("b", [1]) * count
+
+    def move(self, src, dst, count):
+        """
+        Move a range of cells to a new (possibly overlapping) location in the store.
+
+        :param src: The index of the first cell to move.
+        :param dst: The index of the destination for the first cell.
+        :param count: The number of cells to move.
+        """
+        for plane in self.planes:
+            plane[dst:dst + count] = plane[src:src + count]
+
+    def copy_from(self, other, src, dst, count):
+        """
+        Copy a range of cells from another store into this one.
+
+        :param other: The store to copy from.
+        :param src: The index of the first cell to copy in the other store.
+        :param dst: The index of the destination for the first cell in this store.
+        :param count: The number of cells to copy.
+        """
+        self.chars[dst:dst + count] = other.chars[src:src + count]
+        self.fg[dst:dst + count] = other.fg[src:src + count]
+        self.attr[dst:dst + count] = other.attr[src:src + count]
+        self.bg[dst:dst + count] = other.bg[src:src + count]
+        self.width[dst:dst + count] = other.width[src:src + count]
+
+    def recolour(self, start, end, fg_map=None, bg_map=None):
+        """
+        Map the colours of a range of cells through look-up tables.
+
+        :param start: The index of the first cell to change.
+        :param end: The index after the last cell to change.
+        :param fg_map: Optional (table, translation) tuple for the foreground colours - see
+            _map_colours.
+        :param bg_map: Optional (table, translation) tuple for the background colours.
+        """
+        if fg_map is not None:
+            self.fg[start:end] = _map_colours(self.fg[start:end], *fg_map)
+        if bg_map is not None:
+            self.bg[start:end] = _map_colours(self.bg[start:end], *bg_map)
+
+    def differs(self, other, start, end):
+        """
+        Check whether a range of cells is different between this store and another.
+
+        :param other: The store to compare against.
+        :param start: The index of the first cell to compare.
+        :param end: The index after the last cell to compare.
+        """
+        return (self.chars[start:end] != other.chars[start:end] or
+                self.fg[start:end] != other.fg[start:end] or
+                self.attr[start:end] != other.attr[start:end] or
+                self.bg[start:end] != other.bg[start:end] or
+                self.width[start:end] != other.width[start:end])
+
+    def changed_span(self, other, src, dst, count):
+        """
+        Find which cells in a range would be changed by copying them from another store.
+
+        :param other: The store to copy from.
+        :param src: The index of the first cell to copy in the other store.
+        :param dst: The index of the destination for the first cell in this store.
+        :param count: The number of cells to copy.
+        :returns: A tuple of the offsets of the first changed cell and the cell after the last
+            changed cell, or None if nothing would change.
+        """
+        planes = list(zip(self.planes, other.planes))
+
+        def _same(start, end):
+            for mine, theirs in planes:
+                if mine[dst + start:dst + end] != theirs[src + start:src + end]:
+                    return False
+            return True
+
+        if _same(0, count):
+            return None
+
+        # Binary chop for the longest matching prefix and suffix, so that we only ever compare
+        # whole slices rather than looping through each cell.
+        low, high = 0, count
+        while high - low > 1:
+            mid = (low + high) // 2
+            if _same(0, mid):
+                low = mid
+            else:
+                high = mid
+        first = low
+        low, high = first, count
+        while high - low > 1:
+            mid = (low + high) // 2
+            if _same(mid, count):
+                high = mid
+            else:
+                low = mid
+        return first, high
+
 
 class _DoubleBuffer(object):
     """
@@ -54,9 +224,34 @@ class _DoubleBuffer(object):
         self._height = height
         self._width = width
         self._double_buffer = None
-        line = [(u" ", Screen.COLOUR_WHITE, 0, 0, 1) for _ in range(self._width)]
-        self._screen_buffer = [line[:] for _ in range(self._height)]
+        self._screen_buffer = _CellArrays(self._height * self._width)
+
+        # Span of columns in each row that may have changed since the last sync.  A row is clean
+        # when its start is not less than its end.
+        self._dirty_start = None
+        self._dirty_end = None
         self.clear(Screen.COLOUR_WHITE, 0, 0)
+        self._reset_dirty()
+
+    def _reset_dirty(self):
+        """
+        Mark every row as clean.
+        """
+        self._dirty_start = array("i", [self._width]) * self._height
+        self._dirty_end = array("i", [0]) * self._height
+
+    def _mark_dirty(self, y, start, end):
+        """
+        Record that some cells in a row have been changed.
+
+        :param y: The row that has changed.
+        :param start: The first column that has changed.
+        :param end: The column after the last one that has changed.
+        """
+        if start < self._dirty_start[y]:
+            self._dirty_start[y] = start
+        if end > self._dirty_end[y]:
+            self._dirty_end[y] = end
 
     def clear(self, fg, attr, bg, x=0, y=0, w=None, h=None):
         """
@@ -75,12 +270,18 @@ class _DoubleBuffer(object):
         """
         width = self._width if w is None else w
         height = self._height if h is None else h
-        line = [(u" ", fg, attr, bg, 1) for _ in range(width)]
         if x == 0 and y == 0 and w is None and h is None:
-            self._double_buffer = [line[:] for _ in range(height)]
+            if self._double_buffer is None:
+                self._double_buffer = _CellArrays(self._height * self._width, fg, attr, bg)
+            else:
+                self._double_buffer.fill(0, self._height * self._width, fg, attr, bg)
+            self._dirty_start = array("i", [0]) * self._height
+            self._dirty_end = array("i", [self._width]) * self._height
         else:
             for i in range(y, y + height):
-                self._double_buffer[i][x:x + w] = line[:]
+                start = i * self._width + x
+                self._double_buffer.fill(start, start + width, fg, attr, bg)
+                self._mark_dirty(i, x, x + width)
 
     def get(self, x, y):
         """
@@ -91,59 +292,128 @@ class _DoubleBuffer(object):
 
         :return: A 5-tuple of (unicode, foreground, attributes, background, width).
         """
-        return self._double_buffer[y][x]
+        i = y * self._width + x
+        cells = self._double_buffer
+        return chr(cells.chars[i]), cells.fg[i], cells.attr[i], cells.bg[i], cells.width[i]
 
     def set(self, x, y, value):
         """
         Set the cell value from the specified location
 
-        :param x: The column (x coord) of the character.
+        :param x: The column (x coord) of the character, or a slice of columns.
         :param y: The row (y coord) of the character.
-        :param value: A 5-tuple of (unicode, foreground, attributes, background, width).
-        """
-        self._double_buffer[y][x] = value
+        :param value: A 5-tuple of (unicode, foreground, attributes, background, width), or a list
+            of them if x is a slice.
+        """
+        cells = self._double_buffer
+        if isinstance(x, slice):
+            start = y * self._width + x.start
+            end = start + len(value)
+            cells.chars[start:end] = array("i", [ord(v[0]) for v in value])
+            cells.fg[start:end] = array("h", [v[1] for v in value])
+            cells.attr[start:end] = array("h", [v[2] for v in value])
+            cells.bg[start:end] = array("h", [v[3] for v in value])
+            cells.width[start:end] = array("b", [v[4] for v in value])
+            self._mark_dirty(y, x.start, x.start + len(value))
+        else:
+            i = y * self._width + x
+            cells.chars[i] = ord(value[0])
+            cells.fg[i] = value[1]
+            cells.attr[i] = value[2]
+            cells.bg[i] = value[3]
+            cells.width[i] = value[4]
+            if x < self._dirty_start[y]:
+                self._dirty_start[y] = x
+            if x >= self._dirty_end[y]:
+                self._dirty_end[y] = x + 1
 
     def deltas(self, start, height):
         """
-        Return a list-like (i.e. iterable) object of (y, x) tuples
+        Return a list-like (i.e. iterable) object of (y, x) tuples.
+
+        Only rows that have been changed since the last call to sync are checked.
         """
+        new = self._double_buffer
+        old = self._screen_buffer
         for y in range(start, min(start + height, self._height)):
-            for x in range(self._width):
-                old_cell = self._screen_buffer[y][x]
-                new_cell = self._double_buffer[y][x]
-                if old_cell != new_cell:
+            dirty_start = self._dirty_start[y]
+            dirty_end = self._dirty_end[y]
+            if dirty_start >= dirty_end:
+                continue
+            row = y * self._width
+            if not new.differs(old, row + dirty_start, row + dirty_end):
+                continue
+            for x in range(dirty_start, dirty_end):
+                i = row + x
+                if (new.chars[i] != old.chars[i] or new.fg[i] != old.fg[i] or
+                        new.attr[i] != old.attr[i] or new.bg[i] != old.bg[i] or
+                        new.width[i] != old.width[i]):
                     yield y, x
 
-    def scroll(self, lines):
+    def scroll(self, lines, y=0, h=None, screen_buffer=True):
         """
         Scroll the window up or down.
 
+        Defaults to scrolling the whole buffer, but can be restricted to a band of lines.
+
         :param lines: Number of lines to scroll.  Negative numbers move the buffer up.
-        """
-        line = [(u" ", Screen.COLOUR_WHITE, 0, 0, 1) for _ in range(self._width)]
-        if lines > 0:
-            # Limit to buffer size - this will just invalidate all the data
-            lines = min(lines, self._height)
-            for y in range(0, self._height - lines):
-                self._double_buffer[y] = self._double_buffer[y + lines]
-                self._screen_buffer[y] = self._screen_buffer[y + lines]
-            for y in range(self._height - lines, self._height):
-                self._double_buffer[y] = line[:]
-                self._screen_buffer[y] = line[:]
+        :param y: Optional first line of the band to scroll.
+        :param h: Optional height of the band to scroll.
+        :param screen_buffer: Whether to scroll the screen buffer too - i.e. whether the real screen
+            is being scrolled in the same way.
+        """
+        height = self._height - y if h is None else h
+
+        # Limit to buffer size - this will just invalidate all the data
+        lines = max(min(lines, height), -height)
+        start = y * self._width
+        size = height * self._width
+        count = (height - abs(lines)) * self._width
+        for cells in (self._double_buffer, self._screen_buffer) if screen_buffer else (self._double_buffer,):
+            if lines > 0:
+                cells.move(start + lines * self._width, start, count)
+                cells.fill(start + count, start + size, Screen.COLOUR_WHITE, 0, 0)
+            else:
+                cells.move(start, start - lines * self._width, count)
+                cells.fill(start, start + size - count, Screen.COLOUR_WHITE, 0, 0)
+
+        if screen_buffer:
+            # Both buffers have moved together, so the dirty rows move with them and the new blank
+            # rows are clean.
+            clean_start = array("i", [self._width]) * abs(lines)
+            clean_end = array("i", [0]) * abs(lines)
+            if lines > 0:
+                self._dirty_start[y:y + height] = self._dirty_start[y + lines:y + height] + clean_start
+                self._dirty_end[y:y + height] = self._dirty_end[y + lines:y + height] + clean_end
+            else:
+                self._dirty_start[y:y + height] = clean_start + self._dirty_start[y:y + height + lines]
+                self._dirty_end[y:y + height] = clean_end + self._dirty_end[y:y + height + lines]
         else:
-            # Limit to buffer size - this will just invalidate all the data
-            lines = max(lines, -self._height)
-            for y in range(0, -lines):
-                self._double_buffer[self._height + lines + y] = line[:]
-                self._screen_buffer[y] = line[:]
-            for y in range(self._height - 1, -lines, -1):
-                self._double_buffer[y] = self._double_buffer[y + lines]
-                self._screen_buffer[y] = self._screen_buffer[y + lines]
+            # Only the double buffer has moved, so the whole band needs checking.
+            for i in range(y, y + height):
+                self._mark_dirty(i, 0, self._width)
+
+    def invalidate(self, y, h):
+        """
+        Forget what is on the real screen for a band of lines, so that the next call to deltas
+        returns every cell in the band.
+
+        :param y: The first line of the band.
+        :param h: The height of the band.
+        """
+        start = y * self._width
+        end = (y + h) * self._width
+        self._screen_buffer.chars[start:end] = array("i", [-1]) * (end - start)
+        for i in range(y, y + h):
+            self._mark_dirty(i, 0, self._width)
 
     def block_transfer(self, buffer, x, y):
         """
         Copy a buffer entirely to this double buffer.
 
+        Only the cells that would change are actually copied (and so need checking on the next
+        refresh).
+
         :param buffer: The double buffer to copy
         :param x: The X origin for where to place it in this buffer
         :param y: The Y origin for where to place it in this buffer
@@ -156,11 +426,42 @@ class _DoubleBuffer(object):
         if block_min_x > block_max_x:
             return
 
-        # Copy the available section
-        for by in range(0, self._height):
-            if y <= by < y + buffer.height:
-                self._double_buffer[by][block_min_x:block_max_x] = buffer.slice(
-                    block_min_x - x, by - y, block_max_x - block_min_x)
+        # Copy the damaged parts of the available section.  We have to compare against what is in
+        # this buffer now (rather than what has changed in the other buffer) because something
+        # else (e.g. an overlapping Frame) may have drawn over this area since the last transfer.
+        for by in range(max(0, y), min(y + buffer.height, self._height)):
+            src = (by - y) * buffer.width + block_min_x - x
+            dst = by * self._width + block_min_x
+            span = self._double_buffer.changed_span(
+                buffer._double_buffer, src, dst, block_max_x - block_min_x)
+            if span is not None:
+                first, end = span
+                self._double_buffer.copy_from(
+                    buffer._double_buffer, src + first, dst + first, end - first)
+                self._mark_dirty(by, block_min_x + first, block_min_x + end)
+
+    def recolour(self, x, y, w, h, fg_map=None, bg_map=None):
+        """
+        Map the colours of a box in the double-buffer through look-up tables.
+
+        :param x: X coordinate for top left of box.
+        :param y: Y coordinate for top left of box.
+        :param w: Width of the box.
+        :param h: Height of the box.
+        :param fg_map: Optional (table, translation) tuple for the foreground colours - see
+            _map_colours.
+        :param bg_map: Optional (table, translation) tuple for the background colours.
+        """
+        if w == self._width:
+            # Full width rows are contiguous, so can be done in one go.
+            self._double_buffer.recolour(y * w, (y + h) * w, fg_map, bg_map)
+            for i in range(y, y + h):
+                self._mark_dirty(i, 0, w)
+        else:
+            for i in range(y, y + h):
+                start = i * self._width + x
+                self._double_buffer.recolour(start, start + w, fg_map, bg_map)
+                self._mark_dirty(i, x, x + w)
 
     def slice(self, x, y, width):
         """
@@ -171,15 +472,23 @@ class _DoubleBuffer(object):
         :param width: The width of slice required
         :return: The slice of tuples from the current double-buffer
         """
-        return self._double_buffer[y][x:x + width]
+        width = min(width, self._width - x)
+        return [self.get(x + i, y) for i in range(width)]
 
     def sync(self):
         """
         Synchronize the screen buffer with the double buffer.
         """
-        # We're copying an array of tuples, so only need to copy the 2-D array (as the tuples are immutable).
-        # This is way faster than a deep copy (which is INCREDIBLY slow).
-        self._screen_buffer = [row[:] for row in self._double_buffer]
+        # Only the dirty spans can differ between the two buffers, so just patch those into the
+        # screen buffer (and mark them clean as we go) rather than copying everything.
+        for y in range(self._height):
+            start = self._dirty_start[y]
+            end = self._dirty_end[y]
+            if start < end:
+                row = y * self._width
+                self._screen_buffer.copy_from(self._double_buffer, row + start, row + start, end - start)
+                self._dirty_start[y] = self._width
+                self._dirty_end[y] = 0
 
     @property
     def height(self):
@@ -217,6 +526,12 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         0xc0, 0xc0, 0xc0,
     ] + [0x00 for _ in range(248 * 3)]
 
+    # Levels used for each channel of the 6x6x6 colour cube in the 256 colour palette.
+    _CUBE_LEVELS = (0x00, 0x5f, 0x87, 0xaf, 0xd7, 0xff)
+
+    # Cache of colour blending look-up tables, shared by all canvases - see _blend_table.
+    _blend_tables = {}
+
     # Colour palette for 256 colour terminals
     _256_palette = [
         0x00, 0x00, 0x00,
@@ -500,9 +815,6 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         self._x = 0
         self._y = 0
 
-        # dictionary cache for colour blending
-        self._blends = {}
-
         # Reset the screen ready to go...
         self.reset()
 
@@ -548,6 +860,21 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         self._buffer.scroll(line - self._start_line)
         self._start_line = line
 
+    def scroll_region(self, y, height, lines):
+        """
+        Scroll a band of whole lines up or down, leaving the rest of the abstract canvas untouched.
+
+        :param y: The line (y coord) for the top of the band.
+        :param height: The number of lines in the band.
+        :param lines: Number of lines to scroll.  Negative numbers scroll down.
+        """
+        # Convert to buffer coordinates and clip to the buffer.
+        y -= self._start_line
+        top = max(0, y)
+        bottom = min(y + height, self._buffer_height)
+        if lines != 0 and top < bottom:
+            self._buffer.scroll(lines, top, bottom - top)
+
     @abstractmethod
     def _reset(self):
         """
@@ -602,49 +929,73 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
             return
 
         text = str(text)
-        if len(text) > 0:
-            if self._unicode_aware:
-                j = 0
-                for i, c in enumerate(text):
-                    # Handle under-run and overrun of double-width glyphs now.
-                    #
-                    # Note that wcwidth uses significant resources, so only call when we have a
-                    # unicode aware application.  The rest of the time assume ASCII.
-                    width = wcwidth(c) if self._unicode_aware and ord(c) >= 256 else 1
-                    if x + i + j < 0:
-                        x += (width - 1)
-                        continue
-                    if x + i + j + width > self.width:
-                        return
-
-                    # Now handle the update.
-                    if c != " " or not transparent:
-                        # Fix up orphaned double-width glyphs that we've just bisected.
-                        if x + i + j - 1 >= 0 and self._buffer.get(x + i + j - 1, y)[4] == 2:
-                            self._buffer.set(x + i + j - 1, y, ("x", 0, 0, 0, 1))
-
-                        self._buffer.set(x + i + j, y, (c, colour, attr, bg, width))
-                        if width == 2:
-                            j += 1
-                            if x + i + j < self.width:
-                                self._buffer.set(x + i + j, y, (c, colour, attr, bg, 0))
-
-                        # Now fix up any glyphs we may have bisected the other way.
-                        if x + i + j + 1 < self.width and self._buffer.get(x + i + j + 1, y)[4] == 0:
-                            self._buffer.set(x + i + j + 1, y, ("x", 0, 0, 0, 1))
+        if len(text) == 0:
+            return
+
+        # Work out the runs of cells to update.  Only unicode aware applications need to check for
+        # double-width glyphs and even then only if there are any non-ASCII characters (as wcwidth
+        # uses significant resources).
+        if self._unicode_aware and ord(max(text)) >= 256:
+            runs = self._wide_runs(text, x, colour, attr, bg, transparent)
+        else:
+            if x < 0:
+                text = text[-x:]
+                x = 0
+            if x + len(text) > self.width:
+                text = text[:self.width - x]
+            if not transparent:
+                runs = [(x, [(c, colour, attr, bg, 1) for c in text])]
             else:
-                # Optimized version that ignores double-width characters
-                if x < 0:
-                    text = text[-x:]
-                    x = 0
-                if x + len(text) > self.width:
-                    text = text[:self.width - x]
-                if not transparent:
-                    self._buffer.set(slice(x, x + len(text)), y, [(c, colour, attr, bg, 1) for c in text])
-                else:
-                    for i, c in enumerate(text):
-                        if c != " ":
-                            self._buffer.set(x + i, y, (c, colour, attr, bg, 1))
+                runs = []
+                offset = 0
+                for word in text.split(" "):
+                    if word:
+                        runs.append((x + offset, [(c, colour, attr, bg, 1) for c in word]))
+                    offset += len(word) + 1
+
+        # Now update the buffer for each run in one go.
+        for start, cells in runs:
+            if not cells:
+                continue
+            end = start + len(cells)
+            if self._unicode_aware:
+                # Fix up orphaned double-width glyphs that we're about to bisect.
+                if start > 0 and self._buffer.get(start - 1, y)[4] == 2:
+                    self._buffer.set(start - 1, y, ("x", 0, 0, 0, 1))
+                if end < self.width and self._buffer.get(end, y)[4] == 0:
+                    self._buffer.set(end, y, ("x", 0, 0, 0, 1))
+            self._buffer.set(slice(start, end), y, cells)
+
+    def _wide_runs(self, text, x, colour, attr, bg, transparent):
+        """
+        Convert text that may contain double-width glyphs into runs of cells for print_at.
+
+        :returns: A list of (x, cells) tuples for each run of cells, clipped to the buffer.
+        """
+        runs = []
+        cells = None
+        j = 0
+        for i, c in enumerate(text):
+            # Handle under-run and overrun of double-width glyphs now.
+            width = char_width(c)
+            if x + i + j < 0:
+                x += (width - 1)
+                continue
+            if x + i + j + width > self.width:
+                break
+
+            # Spaces split the text into separate runs when printing transparently.
+            if c == " " and transparent:
+                cells = None
+                continue
+            if cells is None:
+                cells = []
+                runs.append((x + i + j, cells))
+            cells.append((c, colour, attr, bg, width))
+            if width == 2:
+                j += 1
+                cells.append((c, colour, attr, bg, 0))
+        return runs
 
     def block_transfer(self, buffer, x, y):
         """
@@ -702,7 +1053,7 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         defined in the Screen class.
         """
         if self._unicode_aware:
-            x = (self.width - wcswidth(text)) // 2
+            x = (self.width - string_width(text)) // 2
         else:
             x = (self.width - len(text)) // 2
         self.paint(text, x, y, colour, attr, colour_map=colour_map)
@@ -747,7 +1098,7 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
                         bg = m[2]
                 if c:
                     current += c
-                    next_offset += wcwidth(c) if ord(c) >= 256 else 1
+                    next_offset += char_width(c)
             if len(current) > 0:
                 self.print_at(current, x + offset, y, colour, attr, bg, transparent)
 
@@ -763,38 +1114,77 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         # Don't bother blending if none is required.
         if new is None:
             return old
+        return self._blend_table(new, ratio)[0][old]
+
+    def _blend_table(self, new, ratio):
+        """
+        Get the look-up table for blending a colour into every colour in the palette.
+
+        Tables are only built once for each palette and are then shared by all canvases.
+
+        :param new: The new colour.
+        :param ratio: The ratio to blend new and old.
+        :returns: a (table, translation) tuple, where the table is an array that maps each old
+            colour index to the blended colour index and the translation is the same table as
+            bytes, ready for _map_colours.
+        """
+        colours = min(self.colours, 256)
+        key = (colours, new, ratio)
+        table = _AbstractCanvas._blend_tables.get(key)
+        if table is None:
+            palette = self.palette
+            (r1, g1, b1) = palette[new * 3:new * 3 + 3]
 
-        # Check colour blend cache for a quick answer.
-        key = (min(new, old), max(new, old))
-        if key in self._blends:
-            return self._blends[key]
+            # Helper function to blend RGB values.
+            def f(c1, c2):
+                return ((c1 * ratio) + (c2 * (100 - ratio))) // 100
 
-        # No quick answer - do it the long way...  First lookup the RGB values
-        # for both colours and blend.
-        (r1, g1, b1) = self.palette[new * 3:new * 3 + 3]
-        (r2, g2, b2) = self.palette[old * 3:old * 3 + 3]
+            lut = array("h", [
+                self._nearest_colour(colours, f(r1, r2), f(g1, g2), f(b1, b2))
+                for r2, g2, b2 in zip(palette[0::3], palette[1::3], palette[2::3])])
+            table = (lut, bytes(bytearray(list(lut))))
+            _AbstractCanvas._blend_tables[key] = table
+        return table
 
-        # Helper function to blend RGB values.
-        def f(c1, c2):
-            return ((c1 * ratio) + (c2 * (100 - ratio))) // 100
+    def _nearest_colour(self, colours, r, g, b):
+        """
+        Find the closest colour in the palette to the specified RGB value.
+
+        :param colours: The number of colours in the palette to search.
+        :returns: The index of the closest colour.  If several are equally close, this is the
+            lowest index.
+        """
+        palette = self.palette
+
+        def distance(c):
+            (rc, gc, bc) = palette[c * 3:c * 3 + 3]
+            return sqrt(((rc - r) * 0.3) ** 2 + ((gc - g) * 0.59) ** 2 + ((bc - b) * 0.11) ** 2)
 
-        r = f(r1, r2)
-        g = f(g1, g2)
-        b = f(b1, b2)
+        if colours < 256:
+            candidates = range(colours)
+        else:
+            # The 256 colour palette is 16 system colours followed by a 6x6x6 colour cube and a
+            # ramp of greys.  The weighting is independent for each channel, so the closest cube
+            # colour is just the closest level in each channel.  Similarly, we only need to check
+            # the greys either side of the best weighted average.
+            def level(c):
+                best = 0
+                for i, value in enumerate(self._CUBE_LEVELS):
+                    if abs(value - c) < abs(self._CUBE_LEVELS[best] - c):
+                        best = i
+                return best
+
+            grey = min(max(int(((r * 0.09 + g * 0.3481 + b * 0.0121) / 0.4502 - 8) // 10), 0), 23)
+            candidates = list(range(16)) + [
+                16 + level(r) * 36 + level(g) * 6 + level(b), 232 + grey, 232 + min(grey + 1, 23)]
 
-        # Now do the reverse lookup...
         nearest = (256 ** 2) * 3
         match = 0
-        for c in range(self.colours):
-            (rc, gc, bc) = self.palette[c * 3:c * 3 + 3]
-            diff = sqrt(((rc - r) * 0.3) ** 2 + ((gc - g) * 0.59) ** 2 +
-                        ((bc - b) * 0.11) ** 2)
-            if diff < nearest:
+        for c in candidates:
+            diff = distance(c)
+            if diff < nearest or (diff == nearest and c < match):
                 nearest = diff
                 match = c
-
-        # Save off the answer and return it
-        self._blends[key] = match
         return match
 
     def highlight(self, x, y, w, h, fg=None, bg=None, blend=100):
@@ -814,20 +1204,19 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         defined in the Screen class.  If fg or bg are None that means don't
         change the foreground/background as appropriate.
         """
-        # Convert to buffer coordinates
+        # Convert to buffer coordinates and clip to the buffer.
         y -= self._start_line
-        for i in range(w):
-            if x + i >= self.width or x + i < 0:
-                continue
-
-            for j in range(h):
-                if y + j >= self._buffer_height or y + j < 0:
-                    continue
+        x1 = max(x, 0)
+        x2 = min(x + w, self.width)
+        y1 = max(y, 0)
+        y2 = min(y + h, self._buffer_height)
+        if x1 >= x2 or y1 >= y2:
+            return
 
-                old = self._buffer.get(x + i, y + j)
-                new_bg = self._blend(bg, old[3], blend)
-                new_fg = self._blend(fg, old[1], blend)
-                self._buffer.set(x + i, y + j, (old[0], new_fg, old[2], new_bg, old[4]))
+        # Blend whole rows at once using the look-up tables for the new colours.
+        self._buffer.recolour(x1, y1, x2 - x1, y2 - y1,
+                              None if fg is None else self._blend_table(fg, blend),
+                              None if bg is None else self._blend_table(bg, blend))
 
     def is_visible(self, x, y):
         """
@@ -866,10 +1255,6 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         :param bg: Optional background colour for plotting the line.
         :param thin: Optional width of anti-aliased line.
         """
-        # Decide what type of line drawing to use.
-        line_chars = (self._uni_line_chars if self._unicode_aware else
-                      self._line_chars)
-
         # Define line end points.
         x0 = self._x
         y0 = self._y
@@ -880,6 +1265,51 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         self._x = x1
         self._y = y1
 
+        cells = {}
+        self._rasterise_line(cells, x0, y0, x1, y1, thin, char is None)
+        self._draw_cells(cells, char, colour, bg)
+
+    def draw_lines(self, lines, char=None, colour=7, bg=0, thin=False):
+        """
+        Draw a set of lines, each of which joins up a list of points.
+
+        This is equivalent to calling :py:meth:`.move` for the first point of each line and then
+        :py:meth:`.draw` for each subsequent point, but is much faster for lots of short lines as
+        each character cell is only drawn once.  The drawing cursor is left at the last point.
+
+        :param lines: A list of lines (which are each a list of (x,y) coordinates for the points
+            on the line) - i.e. nested list of 2-tuples.
+        :param char: Optional character to use to draw the lines.
+        :param colour: Optional colour for plotting the lines.
+        :param bg: Optional background colour for plotting the lines.
+        :param thin: Optional width of anti-aliased lines.
+        """
+        # Build up the set of sub-cells to be plotted for all the lines, at double resolution.
+        cells = {}
+        for line in lines:
+            for i, (x, y) in enumerate(line):
+                x1 = int(round(x * 2, 0))
+                y1 = int(round(y * 2, 0))
+                if i > 0:
+                    self._rasterise_line(cells, self._x, self._y, x1, y1, thin, char is None)
+                self._x = x1
+                self._y = y1
+
+        # Now draw each cell once.
+        self._draw_cells(cells, char, colour, bg)
+
+    def _rasterise_line(self, cells, x0, y0, x1, y1, thin, fast_fill):
+        """
+        Add the sub-cells for a line to a dict of cells to be drawn.
+
+        :param cells: A dict mapping (x, y) of each cell to the mask of sub-cells to set.
+        :param x0: Start column (x coord) at double resolution.
+        :param y0: Start line (y coord) at double resolution.
+        :param x1: End column (x coord) at double resolution.
+        :param y1: End line (y coord) at double resolution.
+        :param thin: Whether to draw a thin line.
+        :param fast_fill: Whether horizontal lines can use the polygon filling fast path.
+        """
         # Don't bother drawing anything if we're guaranteed to be off-screen
         if ((x0 < 0 and x1 < 0) or (x0 >= self.width * 2 and x1 >= self.width * 2) or
                 (y0 < 0 and y1 < 0) or (y0 >= self.height * 2 and y1 >= self.height * 2)):
@@ -891,82 +1321,78 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
         sx = -1 if x0 > x1 else 1
         sy = -1 if y0 > y1 else 1
 
-        def _get_start_char(cx, cy):
-            needle = self.get_from(cx, cy)
-            if needle is not None:
-                letter, cfg, _, cbg = needle
-                if colour == cfg and bg == cbg and chr(letter) in line_chars:
-                    return line_chars.find(chr(letter))
-            return 0
-
-        def _fast_fill(start_x, end_x, iy):
-            next_char = -1
-            for ix in range(start_x, end_x):
-                if ix % 2 == 0 or next_char == -1:
-                    next_char = _get_start_char(ix // 2, iy // 2)
-                next_char |= 2 ** abs(ix % 2) * 4 ** (iy % 2)
-                if ix % 2 == 1:
-                    self.print_at(line_chars[next_char], ix // 2, iy // 2, colour, bg=bg)
-            if end_x % 2 == 1:
-                self.print_at(line_chars[next_char], end_x // 2, iy // 2, colour, bg=bg)
-
-        def _draw_on_x(ix, iy):
-            err = dx
-            px = ix - 2
-            py = iy - 2
-            next_char = 0
-            while ix != x1:
-                if ix < px or ix - px >= 2 or iy < py or iy - py >= 2:
-                    px = ix & ~1
-                    py = iy & ~1
-                    next_char = _get_start_char(px // 2, py // 2)
-                next_char |= 2 ** abs(ix % 2) * 4 ** (iy % 2)
-                err -= 2 * dy
-                if err < 0:
+        # Each cell is made up of 2x2 sub-cells, with the masks for each one being:
+        # 1 2
+        # 4 8
+        if dy == 0 and thin and fast_fill:
+            # Fast-path for polygon filling
+            left = 4 if y0 & 1 else 1
+            cy = y0 >> 1
+            for ix in range(min(x0, x1), max(x0, x1)):
+                key = (ix >> 1, cy)
+                cells[key] = cells.get(key, 0) | (left << (ix & 1))
+        elif dx > dy:
+            for ix, iy in ([(x0, y0)] if thin else [(x0, y0), (x0, y0 + 1)]):
+                err = dx
+                while ix != x1:
+                    key = (ix >> 1, iy >> 1)
+                    cells[key] = cells.get(key, 0) | (1 << ((ix & 1) | ((iy & 1) << 1)))
+                    err -= 2 * dy
+                    if err < 0:
+                        iy += sy
+                        err += 2 * dx
+                    ix += sx
+        else:
+            for ix, iy in ([(x0, y0)] if thin else [(x0, y0), (x0 + 1, y0)]):
+                err = dy
+                while iy != y1:
+                    key = (ix >> 1, iy >> 1)
+                    cells[key] = cells.get(key, 0) | (1 << ((ix & 1) | ((iy & 1) << 1)))
+                    err -= 2 * dx
+                    if err < 0:
+                        ix += sx
+                        err += 2 * dy
                     iy += sy
-                    err += 2 * dx
-                ix += sx
 
-                if char is None:
-                    self.print_at(line_chars[next_char],
-                                  px // 2, py // 2, colour, bg=bg)
-                else:
-                    self.print_at(char, px // 2, py // 2, colour, bg=bg)
-
-        def _draw_on_y(ix, iy):
-            err = dy
-            px = ix - 2
-            py = iy - 2
-            next_char = 0
-            while iy != y1:
-                if ix < px or ix - px >= 2 or iy < py or iy - py >= 2:
-                    px = ix & ~1
-                    py = iy & ~1
-                    next_char = _get_start_char(px // 2, py // 2)
-                next_char |= 2 ** abs(ix % 2) * 4 ** (iy % 2)
-                err -= 2 * dx
-                if err < 0:
-                    ix += sx
-                    err += 2 * dy
-                iy += sy
+    def _draw_cells(self, cells, char, colour, bg):
+        """
+        Draw the cells built up by _rasterise_line, merging with any existing line characters.
 
-                if char is None:
-                    self.print_at(line_chars[next_char],
-                                  px // 2, py // 2, colour, bg=bg)
-                else:
-                    self.print_at(char, px // 2, py // 2, colour, bg=bg)
+        :param cells: A dict mapping (x, y) of each cell to the mask of sub-cells to set.
+        :param char: Optional character to use instead of the anti-aliased line characters.
+        :param colour: The colour for plotting the cells.
+        :param bg: The background colour for plotting the cells.
+        """
+        # Decide what type of line drawing to use.
+        line_chars = (self._uni_line_chars if self._unicode_aware else
+                      self._line_chars)
 
-        if dy == 0 and thin and char is None:
-            # Fast-path for polygon filling
-            _fast_fill(min(x0, x1), max(x0, x1), y0)
-        elif dx > dy:
-            _draw_on_x(x0, y0)
-            if not thin:
-                _draw_on_x(x0, y0 + 1)
-        else:
-            _draw_on_y(x0, y0)
-            if not thin:
-                _draw_on_y(x0 + 1, y0)
+        # Print runs of adjacent cells in one go (unless the character is double-width).
+        joinable = char is None or char_width(char) == 1
+        text = ""
+        run_x = run_y = None
+        for cx, cy in sorted(cells, key=lambda c: (c[1], c[0])):
+            by = cy - self._start_line
+            if cx < 0 or cx >= self.width or by < 0 or by >= self._buffer_height:
+                continue
+            if char is None:
+                mask = cells[(cx, cy)]
+                old = self._buffer.get(cx, by)
+                if colour == old[1] and bg == old[3] and old[0] in line_chars:
+                    mask |= line_chars.find(old[0])
+                c = line_chars[mask]
+            else:
+                c = char
+            if joinable and cy == run_y and cx == run_x + len(text):
+                text += c
+            else:
+                if text:
+                    self.print_at(text, run_x, run_y, colour, bg=bg)
+                text = c
+                run_x = cx
+                run_y = cy
+        if text:
+            self.print_at(text, run_x, run_y, colour, bg=bg)
 
     def fill_polygon(self, polygons, colour=7, bg=0):
         """
@@ -1047,7 +1473,8 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
 
         logger.debug("Resulting edges: %s", edges)
 
-        # Render each line in the bounding rectangle.
+        # Render each line in the bounding rectangle, building up the cells to draw for all lines.
+        cells = {}
         for y in [min_y + (i / 2) for i in range(0, int(max_y) * 2)]:
             # Create a list of live edges (for drawing this raster line) and edges for next
             # iteration of the raster.
@@ -1074,9 +1501,13 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
                             if not ((last_x < 0 and edge.x < 0) or
                                     (last_x >= self.width and edge.x >= self.width)):
                                 # Clip raster to screen width.
-                                self.move(max(0, last_x), y)
-                                self.draw(
-                                    min(edge.x, self.width), y, colour=colour, bg=bg, thin=True)
+                                self._rasterise_line(cells,
+                                                     int(round(max(0, last_x) * 2, 0)),
+                                                     int(round(y * 2, 0)),
+                                                     int(round(min(edge.x, self.width) * 2, 0)),
+                                                     int(round(y * 2, 0)),
+                                                     True,
+                                                     True)
 
                 # Update the x location for this active edge.
                 edge.x += edge.dx
@@ -1085,6 +1516,9 @@ class _AbstractCanvas(with_metaclass(ABCMeta, object)):
             # we just need to resort new_edges for the next iteration.
             edges = sorted(new_edges, key=lambda e: e.x)
 
+        # Now draw each cell once.
+        self._draw_cells(cells, None, colour, bg)
+
 
 class Canvas(_AbstractCanvas):
     """
@@ -1117,6 +1551,35 @@ class Canvas(_AbstractCanvas):
         """
         self._screen.block_transfer(self._buffer, self._dx, self._dy)
 
+    def scroll(self):
+        """
+        Scroll the canvas up one line.
+        """
+        super(Canvas, self).scroll()
+        self._scroll_screen(1)
+
+    def scroll_to(self, line):
+        """
+        Scroll the canvas to make a specific line.
+
+        :param line: The line to scroll to.
+        """
+        lines = line - self._start_line
+        super(Canvas, self).scroll_to(line)
+        self._scroll_screen(lines)
+
+    def _scroll_screen(self, lines):
+        """
+        Scroll the lines under this canvas on the underlying screen to match the canvas.
+
+        This is only possible for a canvas that covers the whole width of the screen, but allows the
+        screen to scroll the existing content instead of redrawing it all on the next refresh.
+
+        :param lines: Number of lines scrolled.
+        """
+        if lines != 0 and self._dx == 0 and self.width == self._screen.width:
+            self._screen.scroll_region(self._dy + self._screen.start_line, self.height, lines)
+
     def _reset(self):
         # Nothing needed for a Canvas
         pass
@@ -1131,6 +1594,198 @@ class Canvas(_AbstractCanvas):
         return self._dx, self._dy
 
 
+class FrameScheduler(object):
+    """
+    Class to decide when :py:meth:`.Screen.play` should draw the next frame.
+
+    Frames are scheduled against a fixed time-line for the target frame rate, so the time taken to
+    render a frame is taken into account.  When no Effect needs updating for a while (as defined by
+    their `frame_update_count`), the Screen simply sleeps until the next required update - or some
+    input arrives - rather than waking for every frame in between.
+
+    If drawing falls a whole frame or more behind schedule, the `policy` determines what happens:
+
+    * ``SLIP`` - draw the next frame straight away and carry on from there.  Animations slow down
+      to match the rendering speed.  This is the default.
+    * ``CATCH_UP`` - draw the missed frames back to back (without sleeping) until the Screen is back
+      on schedule.
+    * ``DROP_FRAMES`` - skip the missed frames so that animations keep to real time.  Note that
+      skipped frames are never passed to the Effects.
+
+    You can create your own scheduling rules by sub-classing this object and overriding
+    :py:meth:`.delay` and :py:meth:`.advance`.
+    """
+
+    #: Let the schedule slip when rendering takes too long.
+    SLIP = 0
+
+    #: Draw missed frames back to back until back on schedule.
+    CATCH_UP = 1
+
+    #: Skip missed frames to keep to real time.
+    DROP_FRAMES = 2
+
+    # Use a clock that can't go backwards where we can.
+    _now = staticmethod(getattr(time, "monotonic", time.time))
+
+    def __init__(self, fps=20, policy=SLIP, max_wait=1.0):
+        """
+        :param fps: The target number of frames per second.  Use None to draw frames as fast as
+            possible.
+        :param policy: What to do when rendering falls behind schedule - one of ``SLIP``,
+            ``CATCH_UP`` or ``DROP_FRAMES``.
+        :param max_wait: The maximum time (in seconds) to sleep in one go while idle.  Input (and
+            resizing, where the Screen can detect it straight away) wakes the Screen early.
+        """
+        if fps is not None and fps <= 0:
+            raise ValueError("Invalid frame rate: {}".format(fps))
+        self._frame_time = 0 if fps is None else 1.0 / fps
+        self._policy = policy
+        self._max_wait = max_wait
+        self._last = None
+
+    @property
+    def fps(self):
+        """
+        The target number of frames per second (or None if unlimited).
+        """
+        return None if self._frame_time == 0 else 1.0 / self._frame_time
+
+    def reset(self):
+        """
+        Start a new schedule, assuming that the first frame is being drawn now.
+        """
+        self._last = self._now()
+
+    def wait(self, screen, frames, allow_int=False):
+        """
+        Wait until it is time to draw the next frame.
+
+        :param screen: The Screen being played.
+        :param frames: The number of frames until an Effect next needs updating.
+        :param allow_int: Whether input can interrupt the delay for a single frame.  Longer waits
+            can always be interrupted by input.
+        :returns: The number of frames that have passed (see :py:meth:`.advance`).
+        """
+        delay = self.delay(frames)
+        if delay > 0:
+            if allow_int or frames > 1:
+                screen.wait_for_input(delay)
+            else:
+                time.sleep(delay)
+        return self.advance(frames)
+
+    def delay(self, frames):
+        """
+        Calculate how long to wait before drawing the next frame.
+
+        :param frames: The number of frames until an Effect next needs updating.
+        :returns: The time to wait in seconds (floating point).
+        """
+        if self._last is None:
+            self.reset()
+        if self._frame_time == 0:
+            return 0
+
+        now = self._now()
+        if now < self._last - self._frame_time:
+            # Time has jumped backwards (e.g. time change) - so start a new schedule.
+            self._last = now
+        return max(0, min(self._last + frames * self._frame_time - now, self._max_wait))
+
+    def advance(self, frames):
+        """
+        Move the schedule on to the frame that should be drawn now.
+
+        :param frames: The number of frames until an Effect next needs updating.
+        :returns: The number of frames that have passed.  This is between 1 and `frames` unless
+            the policy is to drop frames.
+        """
+        if self._last is None:
+            self.reset()
+        if self._frame_time == 0:
+            return frames
+
+        frame_time = self._frame_time
+        now = self._now()
+        deadline = self._last + frames * frame_time
+        if now < deadline:
+            # Woken early (e.g. by input), so just count the frames we slept through.
+            passed = int((now - self._last) / frame_time + 1e-6)
+            passed = max(1, min(frames, passed))
+            self._last += passed * frame_time
+        elif now < deadline + frame_time:
+            # On schedule.
+            passed = frames
+            self._last = deadline
+        elif self._policy == FrameScheduler.DROP_FRAMES:
+            # Behind schedule - skip the frames we missed.
+            passed = max(frames, int((now - self._last) / frame_time))
+            self._last += passed * frame_time
+        elif self._policy == FrameScheduler.CATCH_UP and now - deadline < self._max_wait:
+            # Behind schedule - draw the next frame straight away and stay on the time-line.
+            passed = frames
+            self._last = deadline
+        else:
+            # Behind schedule (or too far behind to catch up) - start again from now.
+            passed = frames
+            self._last = now
+        return passed
+
+
+class FrameStats(object):
+    """
+    Performance statistics for a single frame drawn by :py:meth:`.Screen.draw_next_frame`.
+
+    See :py:meth:`.Screen.enable_frame_stats` for how to collect these.  All times are in seconds.
+    """
+
+    def __init__(self, frame):
+        """
+        :param frame: The frame number.
+        """
+        #: The frame number.
+        self.frame = frame
+
+        #: Total time taken to draw the frame.
+        self.total_time = 0.0
+
+        #: Time spent processing input events.
+        self.input_time = 0.0
+
+        #: Number of input events processed.
+        self.events = 0
+
+        #: Time spent updating Effects.
+        self.update_time = 0.0
+
+        #: List of (Effect, time) tuples for each Effect that was updated.
+        self.effect_times = []
+
+        #: Time spent in :py:meth:`~.Screen.refresh`, working out what to draw.
+        self.refresh_time = 0.0
+
+        #: Time spent writing to the terminal (where the Screen buffers its output).
+        self.output_time = 0.0
+
+        #: Number of screen cells that were redrawn.
+        self.cells = 0
+
+        #: Number of bytes written to the terminal (where the Screen buffers its output).
+        self.bytes = 0
+
+        #: Number of escape sequences written to the terminal (where the Screen buffers its
+        #: output).
+        self.escape_sequences = 0
+
+    def __repr__(self):
+        """
+        :returns: a string representation of the statistics.
+        """
+        return "FrameStats {}: {:.2f}ms ({} cells, {} bytes)".format(
+            self.frame, self.total_time * 1000, self.cells, self.bytes)
+
+
 class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
     """
     Class to track basic state of the screen.  This constructs the necessary
@@ -1225,6 +1880,9 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
     KEY_CONTROL = -601
     KEY_MENU = -602
 
+    # Keys that can be merged into a single event when coalescing input.
+    _REPEATABLE_KEYS = frozenset([KEY_UP, KEY_DOWN, KEY_PAGE_UP, KEY_PAGE_DOWN])
+
     def __init__(self, height, width, buffer_height, unicode_aware):
         """
         Don't call this constructor directly.
@@ -1247,6 +1905,12 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         self._cur_x = 0
         self._cur_y = 0
 
+        # Whether the underlying display can scroll a band of lines - see _scroll_region.
+        self._can_scroll_region = False
+
+        # File descriptor that becomes readable when there is input (if any) - see play_async.
+        self._input_fd = None
+
         # Control variables for playing out a set of Scenes.
         self._scenes = []
         self._scene_index = 0
@@ -1254,9 +1918,28 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         self._idle_frame_count = 0
         self._forced_update = False
         self._unhandled_input = self._unhandled_event_default
+        self._wake_up = None
+        self._async_state = None
+        self._next_frame = None
+        self._next_frame_count = 0
+        self._coalesce_events = False
+        self._max_input_time = None
+        self._pending_event = None
+
+        # Performance statistics - see enable_frame_stats.
+        self._frame_stats = None
+        self._frame_stats_callback = None
+        self._current_stats = None
+
+        # Recording of display changes - see start_recording.
+        self._recorder = None
+        self._record_clock = time.time
+        self._record_start = None
+        self._record_changes = []
 
     @classmethod
-    def open(cls, height=None, catch_interrupt=False, unicode_aware=None):
+    def open(cls, height=None, catch_interrupt=False, unicode_aware=None,
+             synchronized_updates=False):
         """
         Construct a new Screen for any platform.  This will just create the
         correct Screen object for your environment.  See :py:meth:`.wrapper` for
@@ -1267,6 +1950,9 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
             interrupts.  Defaults to False to maintain backwards compatibility.
         :param unicode_aware: Whether the application can use unicode or not.
             If None, try to detect from the environment if UTF-8 is enabled.
+        :param synchronized_updates: Whether to ask the terminal to draw each
+            refresh in one go (using synchronized update mode).  Terminals that
+            don't support this will simply ignore it.  Defaults to False.
         """
         if sys.platform == "win32":
             # Clone the standard output buffer so that we can do whatever we
@@ -1340,7 +2026,8 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
                 logger.debug(e)
             screen = _CursesScreen(stdscr, height,
                                    catch_interrupt=catch_interrupt,
-                                   unicode_aware=unicode_aware)
+                                   unicode_aware=unicode_aware,
+                                   synchronized_updates=synchronized_updates)
 
         return screen
 
@@ -1354,7 +2041,7 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
 
     @classmethod
     def wrapper(cls, func, height=None, catch_interrupt=False, arguments=None,
-                unicode_aware=None):
+                unicode_aware=None, synchronized_updates=False):
         """
         Construct a new Screen for any platform.  This will initialize the
         Screen, call the specified function and then tidy up the system as
@@ -1368,10 +2055,14 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
             Screen object).
         :param unicode_aware: Whether the application can use unicode or not.
             If None, try to detect from the environment if UTF-8 is enabled.
+        :param synchronized_updates: Whether to ask the terminal to draw each
+            refresh in one go (using synchronized update mode).  Terminals that
+            don't support this will simply ignore it.  Defaults to False.
         """
         screen = Screen.open(height,
                              catch_interrupt=catch_interrupt,
-                             unicode_aware=unicode_aware)
+                             unicode_aware=unicode_aware,
+                             synchronized_updates=synchronized_updates)
         restore = True
         try:
             try:
@@ -1395,23 +2086,92 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         self._bg = None
         self._cur_x = None
         self._cur_y = None
+        self._region_scrolls = []
+
+    def scroll_region(self, y, height, lines):
+        """
+        Scroll a band of whole lines up or down, leaving the rest of the Screen untouched.
+
+        Where the terminal supports it, the band will be scrolled on the display by the next call
+        to :py:meth:`~.Screen.refresh`, so only the newly exposed lines need to be redrawn.
+
+        :param y: The line (y coord) for the top of the band.
+        :param height: The number of lines in the band.
+        :param lines: Number of lines to scroll.  Negative numbers scroll down.
+        """
+        # Convert to buffer coordinates and clip to the buffer.
+        y -= self._start_line
+        top = max(0, y)
+        bottom = min(y + height, self._buffer_height)
+        if lines == 0 or top >= bottom:
+            return
+
+        # We can only get the display to do the work if the whole band is visible, and we'll
+        # scroll the display in the same order as the double-buffer (i.e. before any pending
+        # full Screen scroll).
+        hardware = (self._can_scroll_region and
+                    bottom <= self.height and
+                    abs(lines) < bottom - top and
+                    self._last_start_line == self._start_line)
+        self._buffer.scroll(lines, top, bottom - top, screen_buffer=hardware)
+        if hardware:
+            self._region_scrolls.append((top, bottom - top, lines))
 
     def refresh(self):
         """
         Refresh the screen.
         """
+        # Scroll any bands of the screen first - we've already sorted the double-buffer to reflect
+        # these changes.  New lines will be blank, so use the default colours to match.
+        changes = None if self._recorder is None else self._record_changes
+        if self._region_scrolls:
+            self._change_colours(Screen.COLOUR_WHITE, 0, 0)
+            for y, height, lines in self._region_scrolls:
+                self._scroll_region(y, height, lines)
+                if changes is not None:
+                    changes.append(["s", y, height, lines])
+            self._region_scrolls = []
+
         # Scroll the screen now - we've already sorted the double-buffer to reflect this change.
         if self._last_start_line != self._start_line:
             self._scroll(self._start_line - self._last_start_line)
+            if changes is not None:
+                changes.append(["s", 0, self.height, self._start_line - self._last_start_line])
             self._last_start_line = self._start_line
 
         # Now draw any deltas to the scrolled screen.  Note that CJK character sets sometimes
         # use double-width characters, so don't try to draw the next 2nd char (of 0 width).
+        #
+        # Adjacent changes with the same colours are coalesced into a single run, so that each
+        # run only needs one colour change and cursor move.
+        run = []
+        run_x = run_y = run_width = run_colours = None
+        cells = 0
         for y, x in self._buffer.deltas(0, self.height):
+            cells += 1
             new_cell = self._buffer.get(x, y)
             if new_cell[4] > 0:
-                self._change_colours(new_cell[1], new_cell[2], new_cell[3])
-                self._print_at(new_cell[0], x, y, new_cell[4])
+                colours = new_cell[1:4]
+                if y != run_y or x != run_x + run_width or colours != run_colours:
+                    if run:
+                        self._change_colours(*run_colours)
+                        self._print_at("".join(run), run_x, run_y, run_width)
+                        if changes is not None:
+                            changes.append(["p", run_x, run_y] + list(run_colours) + ["".join(run)])
+                    run = []
+                    run_x, run_y, run_width, run_colours = x, y, 0, colours
+                run.append(new_cell[0])
+                run_width += new_cell[4]
+        if run:
+            self._change_colours(*run_colours)
+            self._print_at("".join(run), run_x, run_y, run_width)
+            if changes is not None:
+                changes.append(["p", run_x, run_y] + list(run_colours) + ["".join(run)])
+        if self._current_stats is not None:
+            self._current_stats.cells += cells
+        if changes:
+            self._recorder.write_frame(self._record_clock() - self._record_start, changes)
+            self._record_changes = []
 
         # Resynch for next refresh.
         self._buffer.sync()
@@ -1427,6 +2187,8 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         self.reset()
         self._change_colours(Screen.COLOUR_WHITE, 0, 0)
         self._clear()
+        if self._recorder is not None:
+            self._record_changes = [["c"]]
 
     def get_key(self):
         """
@@ -1511,7 +2273,8 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
                 raise NextScene()
 
     def play(self, scenes, stop_on_resize=False, unhandled_input=None,
-             start_scene=None, repeat=True, allow_int=False):
+             start_scene=None, repeat=True, allow_int=False, scheduler=None,
+             coalesce_events=False, max_input_time=None):
         """
         Play a set of scenes.
 
@@ -1530,6 +2293,12 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         :param repeat: Whether to repeat the Scenes once it has reached the end.
             Defaults to True.
         :param allow_int: Allow input to interrupt frame rate delay.
+        :param scheduler: The :py:obj:`.FrameScheduler` to decide when to draw each frame.
+            Defaults to 20 frames per second.
+        :param coalesce_events: Whether to merge runs of similar input events - see
+            :py:meth:`.set_scenes`.
+        :param max_input_time: The maximum time (in seconds) to spend processing input on
+            each frame.  Defaults to no limit.
 
         :raises ResizeScreenError: if the screen is resized (and allowed by
             stop_on_resize).
@@ -1539,31 +2308,177 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         """
         # Initialise the Screen for animation.
         self.set_scenes(
-            scenes, unhandled_input=unhandled_input, start_scene=start_scene)
+            scenes, unhandled_input=unhandled_input, start_scene=start_scene,
+            coalesce_events=coalesce_events, max_input_time=max_input_time)
+        if scheduler is None:
+            scheduler = FrameScheduler()
+        scheduler.reset()
 
         # Mainline loop for animations
         try:
             while True:
-                a = time.time()
                 self.draw_next_frame(repeat=repeat)
                 if self.has_resized():
                     if stop_on_resize:
                         self._scenes[self._scene_index].exit()
                         raise ResizeScreenError("Screen resized",
                                                 self._scenes[self._scene_index])
-                b = time.time()
-                if b - a < 0.05:
-                    # Just in case time has jumped (e.g. time change), ensure we only delay for 0.05s
-                    pause = min(0.05, a + 0.05 - b)
-                    if allow_int:
-                        self.wait_for_input(pause)
-                    else:
-                        time.sleep(pause)
+
+                # Wait for the next frame, skipping over any idle frames that we slept through.
+                frames = scheduler.wait(self, self._frames_to_update(), allow_int=allow_int)
+                self._frame += frames - 1
+                self._idle_frame_count -= frames - 1
         except StopApplication:
             # Time to stop  - just exit the function.
             return
 
-    def set_scenes(self, scenes, unhandled_input=None, start_scene=None):
+    def play_async(self, scenes, stop_on_resize=False, unhandled_input=None,
+                   start_scene=None, repeat=True, scheduler=None, loop=None,
+                   coalesce_events=False, max_input_time=None):
+        """
+        Play a set of scenes inside an asyncio event loop.
+
+        This is the asyncio equivalent of :py:meth:`.play`.  Rather than blocking, it schedules
+        each frame on the event loop and registers the terminal for input, so any input is
+        handled as soon as it arrives.  Your Effects can then use the same loop to wait for other
+        I/O (e.g. sockets or sub-processes) and call :py:meth:`.force_update` to redraw the
+        Screen when they get new data.
+
+        Requires Python 3.5 or later.  For example:
+
+        .. code-block:: python
+
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(screen.play_async(scenes, loop=loop))
+
+        :param scenes: a list of :py:obj:`.Scene` objects to play.
+        :param stop_on_resize: Whether to stop when the screen is resized.
+            Default is to carry on regardless - which will typically result
+            in an error. This is largely done for back-compatibility.
+        :param unhandled_input: Function to call for any input not handled
+            by the Scenes/Effects being played.  Defaults to a function that
+            closes the application on "Q" or "X" being pressed.
+        :param start_scene: The old Scene to start from.  This must have name
+            that matches the name of one of the Scenes passed in.
+        :param repeat: Whether to repeat the Scenes once it has reached the end.
+            Defaults to True.
+        :param scheduler: The :py:obj:`.FrameScheduler` to decide when to draw each frame.
+            Defaults to 20 frames per second.
+        :param loop: The event loop to use.  Defaults to the running event loop if called from a
+            coroutine, or else a new event loop (which you can get from the returned Future).
+        :param coalesce_events: Whether to merge runs of similar input events - see
+            :py:meth:`.set_scenes`.
+        :param max_input_time: The maximum time (in seconds) to spend processing input on
+            each frame.  Defaults to no limit.
+
+        :returns: An asyncio Future that completes when the Scenes stop playing.  This will
+            raise ResizeScreenError if the screen is resized (and allowed by stop_on_resize).
+        """
+        import asyncio
+
+        if loop is None:
+            loop = self._default_loop(asyncio)
+        self.set_scenes(
+            scenes, unhandled_input=unhandled_input, start_scene=start_scene,
+            coalesce_events=coalesce_events, max_input_time=max_input_time)
+        if scheduler is None:
+            scheduler = FrameScheduler()
+        scheduler.reset()
+
+        # We can only sleep through idle frames if the loop can tell us about new input.
+        # Otherwise we have to poll for it on every frame.
+        fd = self._input_fd
+        if fd is not None:
+            try:
+                loop.add_reader(fd, self._wake_up_async, scheduler)
+            except (NotImplementedError, ValueError):
+                fd = None
+
+        def _tidy_up(_):
+            if fd is not None:
+                loop.remove_reader(fd)
+            if self._next_frame is not None:
+                self._next_frame.cancel()
+                self._next_frame = None
+            self._wake_up = None
+
+        self._async_state = (loop, loop.create_future(), repeat, stop_on_resize, fd is None)
+        self._async_state[1].add_done_callback(_tidy_up)
+        self._wake_up = partial(loop.call_soon_threadsafe, self._wake_up_async, scheduler)
+        self._next_frame = loop.call_soon(self._draw_async, scheduler, 0)
+        self._next_frame_count = 0
+        return self._async_state[1]
+
+    @staticmethod
+    def _default_loop(asyncio):
+        """
+        Find the event loop to use for :py:meth:`.play_async` when none is specified.
+
+        :param asyncio: The asyncio module.
+        :returns: The running event loop, or a new one if there isn't one.
+        """
+        if not hasattr(asyncio, "get_running_loop"):
+            # Python 3.6 and earlier - get_event_loop is the only option (and is not deprecated).
+            return asyncio.get_event_loop()
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            # Not called from a coroutine.  Don't use get_event_loop for this as it is deprecated.
+            return asyncio.new_event_loop()
+
+    def _draw_async(self, scheduler, frames):
+        """
+        Draw the next frame for :py:meth:`.play_async` and schedule the following one.
+
+        :param scheduler: The FrameScheduler for this Screen.
+        :param frames: The number of frames that were scheduled for this wait (0 for the first
+            frame).
+        """
+        loop, future, repeat, stop_on_resize, poll = self._async_state
+        self._next_frame = None
+        if future.done():
+            return
+
+        # Skip over any idle frames that we slept through and draw the next one.
+        if frames > 0:
+            passed = scheduler.advance(frames)
+            self._frame += passed - 1
+            self._idle_frame_count -= passed - 1
+        try:
+            self.draw_next_frame(repeat=repeat)
+            if self.has_resized():
+                if stop_on_resize:
+                    self._scenes[self._scene_index].exit()
+                    raise ResizeScreenError("Screen resized",
+                                            self._scenes[self._scene_index])
+        except StopApplication:
+            future.set_result(None)
+            return
+        except Exception as e:
+            future.set_exception(e)
+            return
+
+        # Now schedule the next frame.
+        frames = 1 if poll else self._frames_to_update()
+        self._next_frame = loop.call_at(
+            loop.time() + scheduler.delay(frames), self._draw_async, scheduler, frames)
+        self._next_frame_count = frames
+
+    def _wake_up_async(self, scheduler):
+        """
+        Draw the next frame for :py:meth:`.play_async` straight away - e.g. because of new input.
+
+        :param scheduler: The FrameScheduler for this Screen.
+        """
+        if self._next_frame is not None:
+            # The scheduler needs to know how many frames the cancelled wait was for, so that it
+            # can work out how many of them have gone by.
+            self._next_frame.cancel()
+            self._next_frame = None
+            self._draw_async(scheduler, self._next_frame_count)
+
+    def set_scenes(self, scenes, unhandled_input=None, start_scene=None,
+                   coalesce_events=False, max_input_time=None):
         """
         Remember a set of scenes to be played.  This must be called before
         using :py:meth:`.draw_next_frame`.
@@ -1574,15 +2489,25 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
             closes the application on "Q" or "X" being pressed.
         :param start_scene: The old Scene to start from.  This must have name
             that matches the name of one of the Scenes passed in.
+        :param coalesce_events: Whether to merge runs of similar input events.
+        :param max_input_time: The maximum time (in seconds) to spend processing input on
+            each frame.  Defaults to no limit.
 
         :raises ResizeScreenError: if the screen is resized (and allowed by
             stop_on_resize).
 
         The unhandled input function just takes one parameter - the input
         event that was not handled.
+
+        If you coalesce events, consecutive mouse moves (with no buttons pressed) are merged
+        into the last one, and repeated presses of the up, down, page up and page down keys are
+        merged into a single :py:obj:`.KeyboardEvent` with a `repeat` count.  Only use this if
+        all your Effects handle that count - as all the standard widgets do.
         """
         # Save off the scenes now.
         self._scenes = scenes
+        self._coalesce_events = coalesce_events
+        self._max_input_time = max_input_time
 
         # Set up default unhandled input handler if needed.
         if unhandled_input is None:
@@ -1626,17 +2551,23 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         :raises StopApplication: if the application should be terminated.
         """
         scene = self._scenes[self._scene_index]
+        stats = None if self._frame_stats is None else FrameStats(self._frame + 1)
         try:
             # Check for an event now and remember for refresh reasons.
-            event = self.get_event()
+            start = time.time()
+            event = self._next_event()
             got_event = event is not None
 
-            # Now process all the input events
+            # Now process all the input events (within the allotted time).
             while event is not None:
+                if stats is not None:
+                    stats.events += 1
                 event = scene.process_event(event)
                 if event is not None and self._unhandled_input is not None:
                     self._unhandled_input(event)
-                event = self.get_event()
+                if self._max_input_time is not None and time.time() - start >= self._max_input_time:
+                    break
+                event = self._next_event()
 
             # Only bother with a refresh if there was an event to process or
             # we have to refresh due to the refresh limit required for an
@@ -1646,9 +2577,17 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
             if got_event or self._idle_frame_count <= 0 or self._forced_update:
                 self._forced_update = False
                 self._idle_frame_count = 1000000
+                if stats is not None:
+                    update_start = time.time()
+                    stats.input_time = update_start - start
                 for effect in scene.effects:
                     # Update the effect and delete if needed.
-                    effect.update(self._frame)
+                    if stats is None:
+                        effect.update(self._frame)
+                    else:
+                        effect_start = time.time()
+                        effect.update(self._frame)
+                        stats.effect_times.append((effect, time.time() - effect_start))
                     if effect.delete_count is not None:
                         effect.delete_count -= 1
                         if effect.delete_count <= 0:
@@ -1658,7 +2597,22 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
                     if effect.frame_update_count > 0:
                         self._idle_frame_count = min(self._idle_frame_count,
                                                      effect.frame_update_count)
-                self.refresh()
+                if stats is None:
+                    self.refresh()
+                else:
+                    refresh_start = time.time()
+                    stats.update_time = refresh_start - update_start
+                    self._current_stats = stats
+                    try:
+                        self.refresh()
+                    finally:
+                        self._current_stats = None
+                    end = time.time()
+                    stats.refresh_time = end - refresh_start - stats.output_time
+                    stats.total_time = end - start
+                    self._frame_stats.append(stats)
+                    if self._frame_stats_callback is not None:
+                        self._frame_stats_callback(stats)
 
             if 0 < scene.duration <= self._frame:
                 raise NextScene()
@@ -1693,6 +2647,59 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
             if scene.clear:
                 self.clear()
 
+    def _next_event(self):
+        """
+        Get the next input event to process, merging similar events if required.
+
+        :returns: The next event, or None if there is no more input.
+        """
+        event = self._pending_event
+        self._pending_event = None
+        if event is None:
+            event = self.get_event()
+        if self._coalesce_events and event is not None:
+            while True:
+                next_event = self.get_event()
+                if next_event is None:
+                    break
+                merged = self._merge_events(event, next_event)
+                if merged is None:
+                    # Save this event for next time.
+                    self._pending_event = next_event
+                    break
+                event = merged
+        return event
+
+    @staticmethod
+    def _merge_events(first, second):
+        """
+        Merge a pair of consecutive input events if possible.
+
+        :param first: The earlier event.
+        :param second: The later event.
+        :returns: The merged event, or None if they can't be merged.
+        """
+        if isinstance(first, MouseEvent) and isinstance(second, MouseEvent):
+            # Only the last position matters for plain mouse moves.
+            if first.buttons == second.buttons == 0:
+                return second
+        elif isinstance(first, KeyboardEvent) and isinstance(second, KeyboardEvent):
+            if first.key_code == second.key_code and first.key_code in Screen._REPEATABLE_KEYS:
+                return KeyboardEvent(first.key_code, repeat=first.repeat + second.repeat)
+        return None
+
+    def _frames_to_update(self):
+        """
+        :returns: The number of frames until the current Scene next needs to be updated.
+        """
+        if self._forced_update or self._pending_event is not None:
+            return 1
+        frames = max(1, self._idle_frame_count)
+        duration = self._scenes[self._scene_index].duration
+        if duration > 0:
+            frames = min(frames, max(1, duration - self._frame))
+        return frames
+
     @property
     def current_scene(self):
         """
@@ -1706,8 +2713,104 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         Force the Screen to redraw the current Scene on the next call to
         draw_next_frame, overriding the frame_update_count value for all the
         Effects.
+
+        If the Screen is being played by :py:meth:`.play_async`, this will also
+        wake it up to draw the next frame straight away.  It is safe to call
+        this from any thread.
         """
         self._forced_update = True
+        if self._wake_up is not None:
+            self._wake_up()
+
+    def enable_frame_stats(self, history=100, callback=None):
+        """
+        Start recording performance statistics for each frame drawn by :py:meth:`.draw_next_frame`
+        (and hence :py:meth:`.play`).
+
+        The statistics for each frame are stored in a :py:obj:`.FrameStats` object.  The most
+        recent ones are available from :py:obj:`.frame_stats`, or you can provide a callback to be
+        notified as each frame is drawn - e.g. to log or alert on slow frames.
+
+        :param history: The number of recent frames to keep.
+        :param callback: Optional function to call with the FrameStats for each new frame.
+        """
+        self._frame_stats = deque(maxlen=history)
+        self._frame_stats_callback = callback
+
+    def disable_frame_stats(self):
+        """
+        Stop recording performance statistics.
+        """
+        self._frame_stats = None
+        self._frame_stats_callback = None
+
+    def start_recording(self, filename, clock=None):
+        """
+        Start recording all changes to the display (with their timings) to a file.
+
+        You can load the file later as a :py:obj:`.Recording` to play it back on any Screen -
+        e.g. to replay an expensive animation for next to no CPU, or to reproduce a problem
+        offline.  The recording starts with the current contents of the display.
+
+        :param filename: The file to create.  If this ends with ".gz" it will be compressed.  You
+            can also pass a binary file object to write to.
+        :param clock: Optional function that returns the current time (in seconds) to use for the
+            timings.  Defaults to the real time.  This allows you to record against a different
+            time-line - e.g. the frame number when drawing frames as fast as possible.
+        """
+        from asciimatics.recording import Recorder
+        self.stop_recording()
+        self._record_clock = time.time if clock is None else clock
+        self._recorder = Recorder(filename, self.width, self.height, self.colours, self.unicode_aware)
+        self._record_start = self._record_clock()
+
+        # Take a snapshot of what is on the display right now.
+        changes = [["c"]]
+        cells = self._buffer._screen_buffer
+        width = self.width
+        for y in range(self.height):
+            run = []
+            run_x = run_colours = None
+            for x in range(width):
+                i = y * width + x
+                if cells.width[i] == 0:
+                    continue
+                colours = [cells.fg[i], cells.attr[i], cells.bg[i]]
+                if colours != run_colours:
+                    if run:
+                        changes.append(["p", run_x, y] + run_colours + ["".join(run)])
+                    run = []
+                    run_x, run_colours = x, colours
+                run.append(chr(cells.chars[i]))
+            text = "".join(run)
+            if run_colours == [Screen.COLOUR_WHITE, 0, 0]:
+                text = text.rstrip()
+            if text:
+                changes.append(["p", run_x, y] + run_colours + [text])
+        self._recorder.write_frame(0, changes)
+        self._record_changes = []
+
+    def stop_recording(self, mark_end=False):
+        """
+        Stop recording the display and close the recording file.
+
+        :param mark_end: Whether to add an empty refresh to the recording at the current time, so
+            that it lasts until now rather than ending at the last change to the display.
+        """
+        if self._recorder is not None:
+            if mark_end:
+                self._recorder.write_frame(self._record_clock() - self._record_start, [])
+            self._recorder.close()
+            self._recorder = None
+            self._record_changes = []
+
+    @property
+    def frame_stats(self):
+        """
+        The list of :py:obj:`.FrameStats` for the most recent frames (oldest first).  This is
+        empty unless you have called :py:meth:`.enable_frame_stats`.
+        """
+        return [] if self._frame_stats is None else list(self._frame_stats)
 
     @abstractmethod
     def _change_colours(self, colour, attr, bg):
@@ -1735,7 +2838,7 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         :param text: The text string to print.
         :param x: The x coordinate
         :param y: The Y coordinate
-        :param width: The width of the character (for dual-width glyphs in CJK languages).
+        :param width: The width of the text (allowing for dual-width glyphs in CJK languages).
         """
 
     @abstractmethod
@@ -1752,6 +2855,20 @@ class Screen(with_metaclass(ABCMeta, _AbstractCanvas)):
         :param lines: Number of lines to scroll.  Negative numbers scroll down.
         """
 
+    def _scroll_region(self, y, height, lines):
+        """
+        Scroll a band of whole lines on the display up or down, clearing the newly exposed lines.
+
+        This is only used if the concrete Screen class sets `_can_scroll_region`, which should
+        then override this method to get the display to do the work.  By default, the whole band is
+        just redrawn by the rest of the refresh.
+
+        :param y: The top line of the band.
+        :param height: The number of lines in the band.
+        :param lines: Number of lines to scroll.  Negative numbers scroll down.
+        """
+        self._buffer.invalidate(y, height)
+
     @abstractmethod
     def set_title(self, title):
         """
@@ -1812,6 +2929,189 @@ class ManagedScreen():
         self.screen.close()
 
 
+class HeadlessScreen(Screen):
+    """
+    Screen that renders to an in-memory display instead of a real terminal.
+
+    This allows you to run Scenes (e.g. using :py:meth:`~.Screen.play` or
+    :py:meth:`~.Screen.draw_next_frame`) without a tty - for example, to benchmark
+    your application or to pre-render frames on a server.  Input is taken from a
+    scripted queue of events that you can supply on construction or add later.
+    """
+
+    def __init__(self, height=25, width=80, colours=256, unicode_aware=False,
+                 buffer_height=None, events=None):
+        """
+        :param height: The height of the display.
+        :param width: The width of the display.
+        :param colours: The number of colours supported by the display.
+        :param unicode_aware: Whether this Screen can use unicode or not.
+        :param buffer_height: Optional buffer height for this Screen.
+        :param events: Optional list of :py:obj:`.Event` objects to return from
+            :py:meth:`.get_event`.
+        """
+        super(HeadlessScreen, self).__init__(height, width, buffer_height, unicode_aware)
+        self.colours = colours
+        self._can_scroll_region = True
+        self._display = _CellArrays(height * width)
+        self._events = deque(events if events else [])
+        self._title = None
+
+    def add_event(self, event):
+        """
+        Add an event to the end of the input queue.
+
+        :param event: The :py:obj:`.Event` to be returned by :py:meth:`.get_event`.
+        """
+        self._events.append(event)
+
+    def get_display(self, x, y):
+        """
+        Get the character that has been drawn on the display at the specified location.
+
+        Unlike :py:meth:`~.Screen.get_from`, this only reflects what has been drawn by
+        calls to :py:meth:`~.Screen.refresh`.
+
+        :param x: The column (x coord) of the character.
+        :param y: The row (y coord) of the character.
+
+        :return: A 4-tuple of (ascii code, foreground, attributes, background)
+                 for the character at the location.
+        """
+        i = y * self.width + x
+        display = self._display
+        return display.chars[i], display.fg[i], display.attr[i], display.bg[i]
+
+    @property
+    def display_text(self):
+        """
+        :return: The text that has been drawn on the display as a list of lines.
+        """
+        display = self._display
+        return ["".join(chr(display.chars[i])
+                        for i in range(y * self.width, (y + 1) * self.width) if display.width[i] != 0)
+                for y in range(self.height)]
+
+    @property
+    def title(self):
+        """
+        :return: The title set for this Screen, or None if no title has been set.
+        """
+        return self._title
+
+    def close(self, restore=True):
+        """
+        Close down this Screen.  There is nothing to tidy up for a headless Screen.
+
+        :param restore: whether to restore the environment or not.
+        """
+
+    def get_event(self):
+        """
+        Get the next event from the input queue.
+
+        :returns: The next :py:obj:`.Event` object, or None if the queue is empty.
+        """
+        return self._events.popleft() if self._events else None
+
+    def has_resized(self):
+        """
+        Check whether the screen has been re-sized.  A headless Screen never resizes.
+        """
+        return False
+
+    def wait_for_input(self, timeout):
+        """
+        Wait until there is some input or the timeout is hit.
+
+        :param timeout: Time to wait for input in seconds (floating point).
+        """
+        if not self._events:
+            time.sleep(timeout)
+
+    def set_title(self, title):
+        """
+        Set the title for this Screen.
+
+        :param title: The title to be set.
+        """
+        self._title = title
+
+    def _change_colours(self, colour, attr, bg):
+        """
+        Change current colour if required.
+
+        :param colour: New colour to use.
+        :param attr: New attributes to use.
+        :param bg: New background colour to use.
+        """
+        self._colour = colour
+        self._attr = attr
+        self._bg = bg
+
+    def _print_at(self, text, x, y, width):
+        """
+        Print string at the required location.
+
+        :param text: The text string to print.
+        :param x: The x coordinate
+        :param y: The Y coordinate
+        :param width: The width of the text (allowing for dual-width glyphs in CJK languages).
+        """
+        # Lay out the glyphs in the display, allowing for any double-width characters.
+        display = self._display
+        offset = y * self.width + x
+        end = offset + width
+        for c in text:
+            if offset >= end:
+                break
+            glyph_width = char_width(c) if self._unicode_aware else 1
+            display.chars[offset] = ord(c)
+            display.fg[offset] = self._colour
+            display.attr[offset] = self._attr
+            display.bg[offset] = self._bg
+            display.width[offset] = glyph_width
+            if glyph_width == 2 and offset + 1 < end:
+                display.width[offset + 1] = 0
+            offset += max(1, glyph_width)
+        self._cur_x = x + width
+        self._cur_y = y
+
+    def _clear(self):
+        """
+        Clear the display.
+        """
+        self._display.fill(0, self.height * self.width, self._colour, self._attr, self._bg)
+
+    def _scroll(self, lines):
+        """
+        Scroll the display up or down.
+
+        :param lines: Number of lines to scroll.  Negative numbers scroll down.
+        """
+        self._scroll_region(0, self.height, lines)
+
+    def _scroll_region(self, y, height, lines):
+        """
+        Scroll a band of whole lines on the display up or down.
+
+        :param y: The top line of the band.
+        :param height: The number of lines in the band.
+        :param lines: Number of lines to scroll.  Negative numbers scroll down.
+        """
+        lines = max(min(lines, height), -height)
+        start = y * self.width
+        size = height * self.width
+        count = (height - abs(lines)) * self.width
+        if lines > 0:
+            self._display.move(start + lines * self.width, start, count)
+            self._display.fill(start + count, start + size, Screen.COLOUR_WHITE, 0, 0)
+        else:
+            self._display.move(start, start - lines * self.width, count)
+            self._display.fill(start, start + size - count, Screen.COLOUR_WHITE, 0, 0)
+        self._cur_x = self._cur_y = None
+
+
 if sys.platform == "win32":
     import win32con
     import win32console
@@ -1969,6 +3269,9 @@ if sys.platform == "win32":
             # Windows is limited to the ANSI colour set.
             self.colours = 8
 
+            # The console can scroll any part of the screen buffer.
+            self._can_scroll_region = True
+
             # Opt for compatibility with Linux by default
             self._map_all = False
 
@@ -2121,7 +3424,7 @@ if sys.platform == "win32":
             :param text: The text string to print.
             :param x: The x coordinate
             :param y: The Y coordinate
-            :param width: The width of the character (for dual-width glyphs in CJK languages).
+            :param width: The width of the text (allowing for dual-width glyphs in CJK languages).
             """
             # We can throw temporary errors on resizing, so catch and ignore
             # them on the assumption that we'll resize shortly.
@@ -2164,6 +3467,31 @@ if sys.platform == "win32":
             self._stdout.ScrollConsoleScreenBuffer(
                 rectangle, None, new_pos, " ", 0)
 
+        def _scroll_region(self, y, height, lines):
+            """
+            Scroll a band of whole lines on the display up or down.
+
+            :param y: The top line of the band.
+            :param height: The number of lines in the band.
+            :param lines: Number of lines to scroll.  Negative numbers scroll
+                down.
+            """
+            info = self._stdout.GetConsoleScreenBufferInfo()['Window']
+            top = info.Top + y
+            bottom = top + height - 1
+            clip = win32console.PySMALL_RECTType(
+                info.Left, top, info.Right, bottom)
+            if lines > 0:
+                rectangle = win32console.PySMALL_RECTType(
+                    info.Left, top + lines, info.Right, bottom)
+                new_pos = win32console.PyCOORDType(info.Left, top)
+            else:
+                rectangle = win32console.PySMALL_RECTType(
+                    info.Left, top, info.Right, bottom + lines)
+                new_pos = win32console.PyCOORDType(info.Left, top - lines)
+            self._stdout.ScrollConsoleScreenBuffer(
+                rectangle, clip, new_pos, " ", 0)
+
         def _clear(self):
             """
             Clear the terminal.
@@ -2191,6 +3519,7 @@ if sys.platform == "win32":
 else:
     # UNIX compatible platform - use curses
     import curses
+    import fcntl
     import select
     import termios
 
@@ -2248,12 +3577,14 @@ else:
         }
 
         def __init__(self, win, height=None, catch_interrupt=False,
-                     unicode_aware=False):
+                     unicode_aware=False, synchronized_updates=False):
             """
             :param win: The window object as returned by the curses wrapper method.
             :param height: The height of the screen buffer to be used (for teesting only).
             :param catch_interrupt: Whether to catch SIGINT or not.
             :param unicode_aware: Whether this Screen can use unicode or not.
+            :param synchronized_updates: Whether to wrap each refresh in
+                synchronized update sequences.
             """
             # Determine unicode support if needed.
             if unicode_aware is None:
@@ -2284,8 +3615,12 @@ else:
             # Store previous handlers for restoration at close
             self._signal_state = _SignalState()
 
-            # Set up signal handler for screen resizing.
+            # Set up signal handler for screen resizing.  On Python 3, signals don't interrupt
+            # select, so the handler also writes to a pipe to wake up wait_for_input.
             self._re_sized = False
+            self._resize_pipe = os.pipe()
+            for fd in self._resize_pipe:
+                fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
             self._signal_state.set(signal.SIGWINCH, self._resize_handler)
 
             # Catch SIGINTs and translated them to ctrl-c if needed.
@@ -2316,6 +3651,44 @@ else:
             self._a_underline = curses.tigetstr("smul").decode("utf-8")
             self._clear_screen = curses.tigetstr("clear").decode("utf-8")
 
+            # Expanding the parameterized escape codes is expensive, so cache
+            # the results as we go.  Most terminals use the standard ANSI
+            # sequence for cursor moves, so just format those directly.
+            self._fg_colours = {}
+            self._bg_colours = {}
+            self._cursor_moves = {}
+            self._ansi_cursor = self._move_y_x == b"\x1b[%i%p1%d;%p2%dH"
+
+            # Optional capabilities for relative cursor moves.
+            self._carriage_return = self._optional_capability("cr")
+            self._down_1 = self._optional_capability("cud1")
+            self._right_1 = self._optional_capability("cuf1")
+            self._left_1 = self._optional_capability("cub1")
+            self._right = curses.tigetstr("cuf")
+            self._left = curses.tigetstr("cub")
+            self._column = curses.tigetstr("hpa")
+            self._rights = {}
+            self._lefts = {}
+            self._columns = {}
+
+            # Scrolling regions are needed to scroll part of the screen.
+            self._change_scroll_region = curses.tigetstr("csr")
+            self._can_scroll_region = self._change_scroll_region is not None
+            self._input_fd = sys.stdin.fileno()
+
+            # Synchronized updates are advertised by the Sync extended
+            # capability.  If that's missing, fall back to DEC private mode
+            # 2026, which terminals ignore if they don't support it.
+            self._begin_sync = self._end_sync = None
+            if synchronized_updates:
+                sync = curses.tigetstr("Sync")
+                if sync is not None:
+                    self._begin_sync = curses.tparm(sync, 1).decode("utf-8")
+                    self._end_sync = curses.tparm(sync, 2).decode("utf-8")
+                else:
+                    self._begin_sync = "\x1b[?2026h"
+                    self._end_sync = "\x1b[?2026l"
+
             # Look for a mismatch between the kernel terminal and the terminfo
             # database for backspace.  Fix up keyboard mappings if needed.
             kbs = curses.tigetstr("kbs").decode("utf-8")
@@ -2335,9 +3708,26 @@ else:
             self._bytes_to_read = 0
             self._bytes_to_return = b""
 
+            # Output for each frame is built up in memory and then written to the terminal in one
+            # go on refresh.
+            self._output = []
+            self._encoding = getattr(sys.stdout, "encoding", None) or "utf-8"
+
             # We'll actually break out into low-level output, so flush any
             # high level buffers now.
             self._screen.refresh()
+            sys.stdout.flush()
+
+        @staticmethod
+        def _optional_capability(name):
+            """
+            Look up a terminfo string capability that may not be defined.
+
+            :param name: The name of the capability.
+            :returns: The decoded capability, or None if it is not defined.
+            """
+            capability = curses.tigetstr(name)
+            return None if capability is None else capability.decode("utf-8")
 
         def close(self, restore=True):
             """
@@ -2346,22 +3736,79 @@ else:
             :param restore: whether to restore the environment or not.
             """
             self._signal_state.restore()
+            for fd in self._resize_pipe:
+                os.close(fd)
+            self._flush_output()
             if restore:
                 self._screen.keypad(0)
                 curses.echo()
                 curses.nocbreak()
                 curses.endwin()
 
-        @staticmethod
-        def _safe_write(msg):
+        def _safe_write(self, msg):
             """
-            Safe write to screen - catches IOErrors on screen resize.
+            Queue output for the screen.  Nothing is written until the next
+            call to :py:meth:`._flush_output`.
 
             :param msg: The message to write to the screen.
             """
+            self._output.append(msg)
+
+        def _flush_output(self):
+            """
+            Safe write of all queued output to the screen - catches IOErrors on
+            screen resize.
+            """
+            if not self._output:
+                return
+
+            # Encode the whole frame at once.  Any characters that can't be
+            # encoded are probably a sign that the user has the wrong locale,
+            # so just replace them and soldier on anyway.
+            data = "".join(self._output)
+            stats = self._current_stats
+            if stats is not None:
+                start = time.time()
+                stats.escape_sequences += data.count("\x1b")
+            data = data.encode(self._encoding, "replace")
+            self._output = []
+            try:
+                self._write_output(data)
+            finally:
+                if stats is not None:
+                    stats.output_time += time.time() - start
+                    stats.bytes += len(data)
+
+        def _write_output(self, data):
+            """
+            Write encoded output to the terminal.
+
+            :param data: The bytes to write.
+            """
             try:
-                sys.stdout.write(msg)
-            except IOError:
+                fd = sys.stdout.fileno()
+            except (AttributeError, ValueError, IOError):
+                fd = None
+            try:
+                if fd is None:
+                    sys.stdout.write(data.decode(self._encoding))
+                    sys.stdout.flush()
+                    return
+
+                # Write straight to the terminal (after anything already
+                # buffered by stdout), allowing for partial writes and
+                # non-blocking file descriptors.
+                sys.stdout.flush()
+                data = memoryview(data)
+                while len(data) > 0:
+                    try:
+                        data = data[os.write(fd, data):]
+                    except (IOError, OSError) as e:
+                        if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                            select.select([], [fd], [])
+                        elif e.errno != errno.EINTR:
+                            raise
+            except (IOError, OSError):
                 # Screen resize can throw IOErrors.  These can be safely
                 # ignored as the screen will be shortly reset anyway.
                 pass
@@ -2375,6 +3822,120 @@ else:
             curses.initscr()
             self._re_sized = True
 
+            # Wake up anything waiting for input so that the resize is handled straight away.
+            try:
+                os.write(self._resize_pipe[1], b"\0")
+            except OSError:
+                # Pipe is full, so there is already a wake up pending.
+                pass
+            if self._wake_up is not None:
+                self._wake_up()
+
+        def _move_cursor(self, x, y):
+            """
+            Get the escape sequence to move the cursor.
+
+            :param x: The x coordinate
+            :param y: The Y coordinate
+            :returns: The escape sequence for the cursor move.
+            """
+            if self._ansi_cursor:
+                return "\x1b[{};{}H".format(y + 1, x + 1)
+            try:
+                return self._cursor_moves[(x, y)]
+            except KeyError:
+                sequence = curses.tparm(self._move_y_x, y, x).decode("utf-8")
+                self._cursor_moves[(x, y)] = sequence
+                return sequence
+
+        def _cursor_path(self, x, y):
+            """
+            Get the cheapest escape sequence to move the cursor from its
+            current location.
+
+            This considers relative moves (including reprinting the current
+            contents of the cells in between) as well as an absolute move.
+
+            :param x: The x coordinate
+            :param y: The Y coordinate
+            :returns: The escape sequence for the cursor move.
+            """
+            best = self._move_cursor(x, y)
+
+            # Only use relative moves when we know exactly where the cursor
+            # is.  Terminals differ on where it is after printing in the last
+            # column, so don't try to be clever there.
+            cur_x = self._cur_x
+            cur_y = self._cur_y
+            if cur_x is None or cur_y is None or cur_x >= self.width:
+                return best
+            if y == cur_y:
+                prefix = ""
+                start = cur_x
+            elif y == cur_y + 1 and self._carriage_return and self._down_1:
+                prefix = self._carriage_return + self._down_1
+                start = 0
+            else:
+                return best
+
+            candidates = [best]
+            if x == start:
+                candidates.append(prefix)
+            elif x > start:
+                if self._right_1 and x - start == 1:
+                    candidates.append(prefix + self._right_1)
+                if self._right:
+                    candidates.append(prefix + self._expand(self._rights, self._right, x - start))
+                if x - start < len(best):
+                    reprint = self._reprint(start, x, y)
+                    if reprint is not None:
+                        candidates.append(prefix + reprint)
+            else:
+                if self._left_1 and start - x == 1:
+                    candidates.append(prefix + self._left_1)
+                if self._left:
+                    candidates.append(prefix + self._expand(self._lefts, self._left, start - x))
+            if self._column and not prefix:
+                candidates.append(self._expand(self._columns, self._column, x))
+            return min(candidates, key=len)
+
+        def _reprint(self, start, end, y):
+            """
+            Get the text needed to move the cursor by reprinting the current
+            contents of the screen.
+
+            :param start: The first column to reprint.
+            :param end: The column after the last one to reprint.
+            :param y: The line to reprint.
+            :returns: The text to print, or None if this is not possible without
+                changing colours or handling wide/non-ASCII characters.
+            """
+            colours = (self._colour, self._attr, self._bg)
+            text = []
+            for x in range(start, end):
+                cell = self._buffer.get(x, y)
+                if cell[1:] != colours + (1,) or ord(cell[0]) >= 128:
+                    return None
+                text.append(cell[0])
+            return "".join(text)
+
+        @staticmethod
+        def _expand(cache, capability, value):
+            """
+            Get the expanded escape sequence for a terminfo capability.
+
+            :param cache: The dictionary of previously expanded sequences.
+            :param capability: The terminfo capability to expand.
+            :param value: The parameter for the capability.
+            :returns: The expanded escape sequence.
+            """
+            try:
+                return cache[value]
+            except KeyError:
+                sequence = curses.tparm(capability, value).decode("utf-8")
+                cache[value] = sequence
+                return sequence
+
         def _scroll(self, lines):
             """
             Scroll the window up or down.
@@ -2384,29 +3945,63 @@ else:
             """
             if lines < 0:
                 self._safe_write("{}{}".format(
-                    curses.tparm(self._move_y_x, 0, 0).decode("utf-8"),
+                    self._move_cursor(0, 0),
                     (self._up_line + self._clear_line) * -lines))
             else:
-                self._safe_write("{}{}".format(curses.tparm(
-                    self._move_y_x, self.height, 0).decode("utf-8"),
+                self._safe_write("{}{}".format(
+                    self._move_cursor(0, self.height),
                     (self._down_line + self._clear_line) * lines))
 
+            # We no longer know where the cursor is, so force an absolute move
+            # next time.
+            self._cur_x = self._cur_y = None
+
+        def _scroll_region(self, y, height, lines):
+            """
+            Scroll a band of whole lines on the display up or down.
+
+            :param y: The top line of the band.
+            :param height: The number of lines in the band.
+            :param lines: Number of lines to scroll.  Negative numbers scroll
+                down.
+            """
+            # Restrict scrolling to the band, scroll it from the relevant edge
+            # and then restore the full screen scrolling region.
+            self._safe_write(curses.tparm(
+                self._change_scroll_region, y, y + height - 1).decode("utf-8"))
+            if lines < 0:
+                self._safe_write("{}{}".format(
+                    self._move_cursor(0, y),
+                    (self._up_line + self._clear_line) * -lines))
+            else:
+                self._safe_write("{}{}".format(
+                    self._move_cursor(0, y + height - 1),
+                    (self._down_line + self._clear_line) * lines))
+            self._safe_write(curses.tparm(
+                self._change_scroll_region, 0, self.height - 1).decode("utf-8"))
+
+            # We no longer know where the cursor is, so force an absolute move
+            # next time.
+            self._cur_x = self._cur_y = None
+
         def _clear(self):
             """
             Clear the Screen of all content.
             """
             self._safe_write(self._clear_screen)
-            sys.stdout.flush()
+            self._flush_output()
 
         def refresh(self):
             """
             Refresh the screen.
             """
             super(_CursesScreen, self).refresh()
-            try:
-                sys.stdout.flush()
-            except IOError:
-                pass
+
+            # Wrap the whole frame in synchronized update sequences if needed.
+            if self._begin_sync and self._output:
+                self._output.insert(0, self._begin_sync)
+                self._output.append(self._end_sync)
+            self._flush_output()
 
         @staticmethod
         def _catch_interrupt(signal_no, frame):
@@ -2506,12 +4101,12 @@ else:
 
             # Now swap colours if required.
             if colour != self._colour:
-                self._safe_write(curses.tparm(
-                    self._fg_color, colour).decode("utf-8"))
+                self._safe_write(self._expand(
+                    self._fg_colours, self._fg_color, colour))
                 self._colour = colour
             if bg != self._bg:
-                self._safe_write(curses.tparm(
-                    self._bg_color, bg).decode("utf-8"))
+                self._safe_write(self._expand(
+                    self._bg_colours, self._bg_color, bg))
                 self._bg = bg
 
         def _print_at(self, text, x, y, width):
@@ -2521,21 +4116,16 @@ else:
             :param text: The text string to print.
             :param x: The x coordinate
             :param y: The Y coordinate
-            :param width: The width of the character (for dual-width glyphs in CJK languages).
+            :param width: The width of the text (allowing for dual-width glyphs in CJK languages).
             """
             # Move the cursor if necessary
             cursor = u""
             if x != self._cur_x or y != self._cur_y:
-                cursor = curses.tparm(self._move_y_x, y, x).decode("utf-8")
+                cursor = self._cursor_path(x, y)
 
             # Print the text at the required location and update the current
             # position.
-            try:
-                self._safe_write(cursor + text)
-            except UnicodeEncodeError:
-                # This is probably a sign that the user has the wrong locale.
-                # Try to soldier on anyway.
-                self._safe_write(cursor + "?" * len(text))
+            self._safe_write(cursor + text)
 
             # Update cursor position for next time...
             self._cur_x = x + width
@@ -2548,8 +4138,12 @@ else:
             :param timeout: Time to wait for input in seconds (floating point).
             """
             try:
-                select.select([sys.stdin], [], [], timeout)
-            except select.error:
+                ready = select.select([sys.stdin, self._resize_pipe[0]], [], [], timeout)[0]
+                if self._resize_pipe[0] in ready:
+                    # Woken up by a resize - clear out the pipe for next time.
+                    while os.read(self._resize_pipe[0], 64):
+                        pass
+            except (select.error, OSError):
                 # Any error will almost certainly result in a a Screen.  Ignore.
                 pass
 
@@ -32,7 +32,7 @@ from asciimatics.event import KeyboardEvent, MouseEvent
 from asciimatics.exceptions import Highlander, InvalidFields
 from asciimatics.screen import Screen, Canvas
 from asciimatics.utilities import readable_timestamp, readable_mem, _DotDict, ColouredText
-from wcwidth import wcswidth, wcwidth
+from asciimatics.widths import string_width, truncate, column_offset, min_start
 
 # Logging
 from logging import getLogger
@@ -153,12 +153,7 @@ def _enforce_width(text, width, unicode_aware=True):
 
     # Can still optimize performance if we are not handling unicode characters.
     if unicode_aware:
-        size = 0
-        for i, c in enumerate(str(text)):
-            w = wcwidth(c) if ord(c) >= 256 else 1
-            if size + w > width:
-                return text[0:i]
-            size += w
+        return truncate(text, width)
     elif len(text) + 1 > width:
         return text[0:width]
     return text
@@ -180,15 +175,10 @@ def _find_min_start(text, max_width, unicode_aware=True, at_end=False):
         return 0
 
     # OK - do it the hard way...
-    result = 0
-    string_len = wcswidth if unicode_aware else len
-    char_len = wcwidth if unicode_aware else lambda x: 1
-    display_end = string_len(text)
-    while display_end > max_width:
-        result += 1
-        display_end -= char_len(text[0])
-        text = text[1:]
-    if at_end and display_end == max_width:
+    if unicode_aware:
+        return min_start(text, max_width, at_end)
+    result = max(0, len(text) - max_width)
+    if at_end and len(text) - result == max_width:
         result += 1
     return result
 
@@ -202,19 +192,9 @@ def _get_offset(text, visible_width, unicode_aware=True):
     :param visible_width: The required location within that text (as seen on screen).
     :return: The offset within text (as a character offset within the string).
     """
-    result = 0
-    width = 0
     if unicode_aware:
-        for c in text:
-            if visible_width - width <= 0:
-                break
-            result += 1
-            width += wcwidth(c)
-        if visible_width - width < 0:
-            result -= 1
-    else:
-        result = min(len(text), visible_width)
-    return result
+        return column_offset(text, visible_width)
+    return min(len(text), visible_width)
 
 
 @lru_cache(256)
@@ -234,7 +214,7 @@ def _split_text(text, width, height, unicode_aware=True):
     tokens = text.split(" ")
     result = []
     current_line = ""
-    string_len = wcswidth if unicode_aware else len
+    string_len = string_width if unicode_aware else len
     for token in tokens:
         for i, line_token in enumerate(token.split("\n")):
             if string_len(current_line + line_token) > width or i > 0:
@@ -365,12 +345,15 @@ class Frame(Effect):
         # typically caused by callbacks subsequently trying to re-use functions.
         self._in_call = False
 
+        # Hook used by the Profiler to time each widget - called as fn(widget, frame_no).
+        self._profile_widget = None
+
         # Now set up any passed data - use the public property to trigger any
         # necessary updates.
         self.data = deepcopy(self._initial_data)
 
         # Optimization for non-unicode displays to avoid slow unicode calls.
-        self.string_len = wcswidth if self._canvas.unicode_aware else len
+        self.string_len = string_width if self._canvas.unicode_aware else len
 
         # Ensure that we have the default palette in place
         self._theme = None
@@ -863,36 +846,42 @@ class Frame(Effect):
         # it now.
         if event is not None:
             if isinstance(event, KeyboardEvent):
-                if event.key_code in [Screen.KEY_TAB, Screen.KEY_DOWN]:
-                    # Move on to next widget.
-                    self._layouts[self._focus].blur()
-                    old_focus = self._focus
-                    self._focus += 1
-                    while self._focus != old_focus:
-                        try:
-                            self._layouts[self._focus].focus(force_first=True)
-                            break
-                        except IndexError:
-                            self._focus += 1
-                            if self._focus >= len(self._layouts):
-                                self._focus = 0
-                    self._layouts[self._focus].focus(force_first=True)
-                    old_event = None
-                elif event.key_code in [Screen.KEY_BACK_TAB, Screen.KEY_UP]:
-                    # Move on to previous widget.
-                    self._layouts[self._focus].blur()
-                    old_focus = self._focus
-                    self._focus -= 1
-                    while self._focus != old_focus:
-                        if self._focus < 0:
-                            self._focus = len(self._layouts) - 1
-                        try:
-                            self._layouts[self._focus].focus(force_last=True)
-                            break
-                        except IndexError:
-                            self._focus -= 1
-                    self._layouts[self._focus].focus(force_last=True)
-                    old_event = None
+                while event is not None and event.key_code in [
+                        Screen.KEY_TAB, Screen.KEY_DOWN, Screen.KEY_BACK_TAB, Screen.KEY_UP]:
+                    if event.key_code in [Screen.KEY_TAB, Screen.KEY_DOWN]:
+                        # Move on to next widget.
+                        self._layouts[self._focus].blur()
+                        old_focus = self._focus
+                        self._focus += 1
+                        while self._focus != old_focus:
+                            try:
+                                self._layouts[self._focus].focus(force_first=True)
+                                break
+                            except IndexError:
+                                self._focus += 1
+                                if self._focus >= len(self._layouts):
+                                    self._focus = 0
+                        self._layouts[self._focus].focus(force_first=True)
+                        old_event = None
+                    else:
+                        # Move on to previous widget.
+                        self._layouts[self._focus].blur()
+                        old_focus = self._focus
+                        self._focus -= 1
+                        while self._focus != old_focus:
+                            if self._focus < 0:
+                                self._focus = len(self._layouts) - 1
+                            try:
+                                self._layouts[self._focus].focus(force_last=True)
+                                break
+                            except IndexError:
+                                self._focus -= 1
+                        self._layouts[self._focus].focus(force_last=True)
+                        old_event = None
+
+                    # Any remaining key presses go to the newly focussed widget first.
+                    event = None if event.repeat <= 1 else self._layouts[self._focus].process_event(
+                        KeyboardEvent(event.key_code, repeat=event.repeat - 1), self._hover_focus)
             elif isinstance(event, MouseEvent):
                 # Give layouts/widgets first dibs on the mouse message.
                 for layout in self._layouts:
@@ -1064,7 +1053,7 @@ class Layout(object):
         width = max_width
         y = w = 0
         max_y = start_y
-        string_len = wcswidth if self._frame.canvas.unicode_aware else len
+        string_len = string_width if self._frame.canvas.unicode_aware else len
         dimensions = []
         for i, column in enumerate(self._columns):
             # For each column determine if we need a tab offset for labels.
@@ -1227,23 +1216,22 @@ class Layout(object):
                     # If we got here, we still should have the focus.
                     self._columns[self._live_col][self._live_widget].focus()
                     event = None
-                elif event.key_code == Screen.KEY_DOWN:
-                    # Move on to next widget in this column
-                    wid = self._live_widget
-                    self._columns[self._live_col][self._live_widget].blur()
-                    self._find_next_widget(1, stay_in_col=True)
-                    self._columns[self._live_col][self._live_widget].focus()
-                    # Don't swallow the event if it had no effect.
-                    event = event if wid == self._live_widget else None
-                elif event.key_code == Screen.KEY_UP:
-                    # Move on to previous widget, unless it is the first in the
-                    # Layout.
-                    wid = self._live_widget
-                    self._columns[self._live_col][self._live_widget].blur()
-                    self._find_next_widget(-1, stay_in_col=True)
-                    self._columns[self._live_col][self._live_widget].focus()
-                    # Don't swallow the event if it had no effect.
-                    event = event if wid == self._live_widget else None
+                elif event.key_code in [Screen.KEY_DOWN, Screen.KEY_UP]:
+                    # Move on to next/previous widget in this column.  Any remaining key presses
+                    # go to the new widget first, as they would have done if they had been sent
+                    # as separate events.
+                    key_code = event.key_code
+                    while event is not None and event.key_code == key_code:
+                        wid = self._live_widget
+                        self._columns[self._live_col][self._live_widget].blur()
+                        self._find_next_widget(1 if key_code == Screen.KEY_DOWN else -1, stay_in_col=True)
+                        self._columns[self._live_col][self._live_widget].focus()
+                        # Don't swallow the event if it had no effect.
+                        if wid == self._live_widget:
+                            return event
+                        event = None if event.repeat <= 1 else self._columns[
+                            self._live_col][self._live_widget].process_event(
+                                KeyboardEvent(key_code, repeat=event.repeat - 1))
                 elif event.key_code == Screen.KEY_LEFT:
                     # Move on to last widget in the previous column
                     self._columns[self._live_col][self._live_widget].blur()
@@ -1278,11 +1266,15 @@ class Layout(object):
 
         :param frame_no: The current frame to be drawn.
         """
+        profile = self._frame._profile_widget
         for column in self._columns:
             for widget in column:
                 # Don't bother with invisible widgets
                 if widget.is_visible:
-                    widget.update(frame_no)
+                    if profile is None:
+                        widget.update(frame_no)
+                    else:
+                        profile(widget, frame_no)
 
     def save(self, validate):
         """
@@ -1436,7 +1428,7 @@ class Widget(with_metaclass(ABCMeta, object)):
 
         # Helper function to optimise string length calculations - default for now and pick
         # the optimal version when we know whether we need unicode support or not.
-        self.string_len = wcswidth
+        self.string_len = string_width
 
     @property
     def frame(self):
@@ -1514,7 +1506,7 @@ class Widget(with_metaclass(ABCMeta, object)):
         :param frame: The owning Frame.
         """
         self._frame = frame
-        self.string_len = wcswidth if self._frame.canvas.unicode_aware else len
+        self.string_len = string_width if self._frame.canvas.unicode_aware else len
 
     def set_layout(self, x, y, offset, w, h):
         """
@@ -2130,11 +2122,11 @@ class RadioButtons(Widget):
         if isinstance(event, KeyboardEvent):
             if event.key_code == Screen.KEY_UP:
                 # Use property to trigger events.
-                self._selection = max(0, self._selection - 1)
+                self._selection = max(0, self._selection - event.repeat)
                 self.value = self._options[self._selection][1]
             elif event.key_code == Screen.KEY_DOWN:
                 # Use property to trigger events.
-                self._selection = min(self._selection + 1,
+                self._selection = min(self._selection + event.repeat,
                                       len(self._options) - 1)
                 self.value = self._options[self._selection][1]
             else:
@@ -2338,13 +2330,13 @@ class TextBox(Widget):
                         self._value[self._line] += \
                             self._value.pop(self._line + 1)
             elif event.key_code == Screen.KEY_PAGE_UP:
-                self._change_line(-self._h)
+                self._change_line(-self._h * event.repeat)
             elif event.key_code == Screen.KEY_PAGE_DOWN:
-                self._change_line(self._h)
+                self._change_line(self._h * event.repeat)
             elif event.key_code == Screen.KEY_UP:
-                self._change_line(-1)
+                self._change_line(-event.repeat)
             elif event.key_code == Screen.KEY_DOWN:
-                self._change_line(1)
+                self._change_line(event.repeat)
             elif event.key_code == Screen.KEY_LEFT:
                 # Move left one char, wrapping to previous line if needed.
                 self._column -= 1
@@ -2545,20 +2537,21 @@ class _BaseListBox(with_metaclass(ABCMeta, Widget)):
         if isinstance(event, KeyboardEvent):
             if len(self._options) > 0 and event.key_code == Screen.KEY_UP:
                 # Move up one line in text - use value to trigger on_select.
-                self._line = max(0, self._line - 1)
+                self._line = max(0, self._line - event.repeat)
                 self.value = self._options[self._line][1]
             elif len(self._options) > 0 and event.key_code == Screen.KEY_DOWN:
                 # Move down one line in text - use value to trigger on_select.
-                self._line = min(len(self._options) - 1, self._line + 1)
+                self._line = min(len(self._options) - 1, self._line + event.repeat)
                 self.value = self._options[self._line][1]
             elif len(self._options) > 0 and event.key_code == Screen.KEY_PAGE_UP:
                 # Move up one page.
-                self._line = max(0, self._line - self._h + (1 if self._titles else 0))
+                self._line = max(0, self._line - (self._h - (1 if self._titles else 0)) * event.repeat)
                 self.value = self._options[self._line][1]
             elif len(self._options) > 0 and event.key_code == Screen.KEY_PAGE_DOWN:
                 # Move down one page.
                 self._line = min(
-                    len(self._options) - 1, self._line + self._h - (1 if self._titles else 0))
+                    len(self._options) - 1,
+                    self._line + (self._h - (1 if self._titles else 0)) * event.repeat)
                 self.value = self._options[self._line][1]
             elif event.key_code in [Screen.ctrl("m"), Screen.ctrl("j")]:
                 # Fire select callback.
@@ -3329,7 +3322,7 @@ class PopUpDialog(Frame):
         self._on_close = on_close
 
         # Decide on optimum width of the dialog.  Limit to 2/3 the screen width.
-        string_len = wcswidth if screen.unicode_aware else len
+        string_len = string_width if screen.unicode_aware else len
         width = max([string_len(x) for x in text.split("\n")])
         width = max(width + 2,
                     sum([string_len(x) + 4 for x in buttons]) + len(buttons) + 5)
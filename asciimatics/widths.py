@@ -0,0 +1,131 @@
+"""
+This module works out how wide text will be when displayed on the Screen, allowing for the
+double-width glyphs used in CJK languages.  It is shared by the Screen, renderers and widgets, so
+that the (relatively expensive) width of each glyph is only ever calculated once.
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import str
+from array import array
+from bisect import bisect_left, bisect_right
+try:
+    from functools import lru_cache
+except ImportError:
+    from backports.functools_lru_cache import lru_cache
+from wcwidth import wcwidth
+
+# Cache of the display width of each glyph - wcwidth is too slow to call for every character.
+_glyph_widths = {}
+
+
+def char_width(c):
+    """
+    Get the display width of a single character.
+
+    Characters below 256 (i.e. ASCII and Latin-1) are always treated as single width.  Zero-width
+    glyphs (e.g. combining characters) return 0.
+
+    :param c: The character to check.
+    :returns: The number of cells the character will use on the Screen.
+    """
+    if ord(c) < 256:
+        return 1
+    width = _glyph_widths.get(c)
+    if width is None:
+        width = _glyph_widths[c] = max(0, wcwidth(c))
+    return width
+
+
+def _is_narrow(text):
+    """
+    Check whether a string only contains characters that are always single width.
+    """
+    return len(text) == 0 or ord(max(text)) < 256
+
+
+@lru_cache(256)
+def _prefix_widths(text):
+    """
+    Calculate the cumulative display widths for a string.
+
+    :param text: The text to analyze.
+    :returns: An array where entry i is the display width of the first i characters of `text`.
+    """
+    widths = array("i", [0] * (len(text) + 1))
+    total = 0
+    for i, c in enumerate(text):
+        total += char_width(c)
+        widths[i + 1] = total
+    return widths
+
+
+def string_width(text):
+    """
+    Get the display width of a string.
+
+    :param text: The text to check.
+    :returns: The number of cells the text will use on the Screen.
+    """
+    text = str(text)
+    if _is_narrow(text):
+        return len(text)
+    return sum([char_width(c) for c in text])
+
+
+def truncate(text, width):
+    """
+    Find the longest prefix of a string that fits within the specified display width.
+
+    :param text: The text to truncate (which may be ColouredText).
+    :param width: The maximum display width.
+    :returns: The truncated text.
+    """
+    plain = str(text)
+    if _is_narrow(plain):
+        return text[:max(0, width)]
+    return text[:max(0, bisect_right(_prefix_widths(plain), width) - 1)]
+
+
+def column_offset(text, column):
+    """
+    Find the character offset within a string for a given display column.
+
+    If the column lies in the middle of a double-width glyph, this returns the offset of that glyph.
+
+    :param text: The text to analyze.
+    :param column: The display column within the text.
+    :returns: The character offset within the text.
+    """
+    text = str(text)
+    if _is_narrow(text):
+        return min(len(text), column)
+    widths = _prefix_widths(text)
+    offset = bisect_left(widths, column)
+    if offset > len(text):
+        return len(text)
+    return offset - 1 if widths[offset] > column else offset
+
+
+def min_start(text, max_width, at_end=False):
+    """
+    Find the starting offset in a string that will reduce it to be no wider than the specified
+    display width.
+
+    :param text: The text to analyze.
+    :param max_width: The required maximum display width.
+    :param at_end: Allow an extra cell at the end of the text (e.g. for a cursor).
+    :returns: The character offset within the text to start at.
+    """
+    text = str(text)
+    if _is_narrow(text):
+        result = max(0, len(text) - max_width)
+        display_end = len(text) - result
+    else:
+        widths = _prefix_widths(text)
+        result = min(len(text), bisect_left(widths, widths[-1] - max_width))
+        display_end = widths[-1] - widths[result]
+    if at_end and display_end == max_width:
+        result += 1
+    return result
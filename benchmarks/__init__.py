@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for asciimatics.  These run without a terminal (using a HeadlessScreen), so
+can be run anywhere - e.g. `python -m benchmarks.bench_rendering`.  Use `--help` for options.
+"""
@@ -0,0 +1,232 @@
+"""
+Benchmarks for the rendering hot paths: drawing onto a Screen, refreshing the display, the
+DynamicRenderers and all the built-in Effects.
+
+Run with `python -m benchmarks.bench_rendering` - use `--help` for options.
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+from math import sin, cos, pi
+import sys
+from asciimatics.effects import Scroll, Cycle, BannerText, Print, Mirage, Stars, Matrix, Wipe, \
+    Snow, Clock, Cog, RandomNoise, Julia
+from asciimatics.particles import StarFirework, RingFirework, SerpentFirework, PalmFirework, \
+    Explosion, DropScreen, ShootScreen, Rain
+from asciimatics.paths import Path
+from asciimatics.renderers import FigletText, StaticRenderer, Fire, Plasma, Kaleidoscope, BarChart
+from asciimatics.screen import Screen, HeadlessScreen
+from asciimatics.sprites import Sam
+from benchmarks.harness import Benchmark, main
+
+#: Screen sizes (height, width) used for the Effect benchmarks.
+SIZES = [(24, 80), (50, 160), (100, 300)]
+
+_ASCII = "The quick brown fox jumps over the lazy dog. "
+_UNICODE = "你好世界 éèê █▓▒░ "
+
+
+def _print_at(unicode_aware, text):
+    def _setup():
+        screen = HeadlessScreen(25, 80, unicode_aware=unicode_aware)
+        line = (text * (80 // len(text) + 1))[:80]
+
+        def _run():
+            for y in range(screen.height):
+                screen.print_at(line, 0, y, colour=y % 8)
+        return _run
+    return _setup
+
+
+def _paint():
+    screen = HeadlessScreen(25, 80)
+    line = (_ASCII * 2)[:80]
+    colour_map = [(i % 8, i % 3, (i // 8) % 8) for i in range(len(line))]
+
+    def _run():
+        for y in range(screen.height):
+            screen.paint(line, 0, y, colour_map=colour_map)
+    return _run
+
+
+def _deltas_sync(changed):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        buffer = screen._buffer
+        lines = ["A" * 160, "B" * 160]
+        frame = [0]
+
+        def _run():
+            if changed:
+                frame[0] ^= 1
+                for y in range(0, screen.height, 2):
+                    screen.print_at(lines[frame[0]], 0, y)
+            for _ in buffer.deltas(0, screen.height):
+                pass
+            buffer.sync()
+        return _run
+    return _setup
+
+
+def _highlight(blend):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        for y in range(screen.height):
+            screen.print_at(_ASCII * 4, 0, y, colour=y % 8, bg=(y + 1) % 8)
+
+        def _run():
+            screen.highlight(0, 0, screen.width, screen.height, fg=Screen.COLOUR_RED,
+                             bg=Screen.COLOUR_BLUE, blend=blend)
+        return _run
+    return _setup
+
+
+def _draw(thin):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+
+        def _run():
+            for i in range(0, 360, 10):
+                screen.move(80, 25)
+                screen.draw(80 + 70 * cos(i * pi / 180), 25 + 24 * sin(i * pi / 180), thin=thin)
+        return _run
+    return _setup
+
+
+def _draw_lines():
+    screen = HeadlessScreen(50, 160)
+    spokes = [[(80, 25), (80 + 70 * cos(i * pi / 180), 25 + 24 * sin(i * pi / 180))]
+              for i in range(0, 360, 10)]
+    wave = [[(80 + 70 * sin(i * pi / 100), 25 + 24 * cos(i * pi / 40)) for i in range(200)]]
+
+    def _run():
+        screen.draw_lines(spokes, thin=True)
+        screen.draw_lines(wave)
+    return _run
+
+
+def _fill_polygon():
+    screen = HeadlessScreen(50, 160)
+    star = [(80 + (70 if i % 2 == 0 else 30) * cos(i * pi / 5),
+             25 + (24 if i % 2 == 0 else 10) * sin(i * pi / 5)) for i in range(10)]
+
+    def _run():
+        screen.fill_polygon([star])
+    return _run
+
+
+def _renderer(create):
+    def _setup():
+        renderer = create()
+
+        def _run():
+            return renderer.rendered_text
+        return _run
+    return _setup
+
+
+def _fill(screen):
+    """
+    Fill the screen with some text so that Effects that move existing content have work to do.
+    """
+    for y in range(screen.height):
+        screen.print_at((_ASCII * (screen.width // len(_ASCII) + 1))[:screen.width], 0, y, colour=y % 8)
+
+
+def _effect(size, create, finished):
+    def _setup():
+        screen = HeadlessScreen(*size)
+        effect = create(screen)
+        frame = [0]
+
+        def _start():
+            _fill(screen)
+            effect.reset()
+            frame[0] = 0
+
+        def _run():
+            # Restart transient Effects so that each frame measures some real work.
+            if finished is not None and finished(screen, effect, frame[0]):
+                _start()
+            frame[0] += 1
+            effect.update(frame[0])
+            screen.refresh()
+
+        _start()
+        return _run
+    return _setup
+
+
+def _particles_done(screen, effect, frame_no):
+    return frame_no > 0 and len(effect._active_systems) == 0
+
+
+def _sam(screen):
+    path = Path()
+    path.jump_to(-10, screen.height // 2)
+    path.move_straight_to(screen.width + 10, screen.height // 2, screen.width)
+    return Sam(screen, path)
+
+
+#: The built-in Effects to benchmark.  Each entry is the name, a function to create the Effect for a
+#: Screen and an optional function to decide when to restart the Effect.
+EFFECTS = [
+    ("BannerText", lambda s: BannerText(s, FigletText("Hello world!"), s.height // 2 - 3,
+                                        Screen.COLOUR_GREEN), None),
+    ("Clock", lambda s: Clock(s, s.width // 2, s.height // 2, s.height // 2 - 1), None),
+    ("Cog", lambda s: Cog(s, s.width // 2, s.height // 2, s.height // 2 - 1), None),
+    ("Cycle", lambda s: Cycle(s, FigletText("Cycle"), s.height // 2 - 3), None),
+    ("DropScreen", lambda s: DropScreen(s, 100), _particles_done),
+    ("Explosion", lambda s: Explosion(s, s.width // 2, s.height // 2, 25), _particles_done),
+    ("Julia", lambda s: Julia(s), None),
+    ("Matrix", lambda s: Matrix(s), None),
+    ("Mirage", lambda s: Mirage(s, FigletText("Mirage"), s.height // 2 - 3, Screen.COLOUR_GREEN), None),
+    ("PalmFirework", lambda s: PalmFirework(s, s.width // 2, s.height - 1, 40), _particles_done),
+    ("Print", lambda s: Print(s, StaticRenderer(images=[_ASCII * 8]), 0, speed=1), None),
+    ("Rain", lambda s: Rain(s, 200), _particles_done),
+    ("RandomNoise", lambda s: RandomNoise(s), None),
+    ("RingFirework", lambda s: RingFirework(s, s.width // 2, s.height - 1, 40), _particles_done),
+    ("Scroll", lambda s: Scroll(s, 1), None),
+    ("SerpentFirework", lambda s: SerpentFirework(s, s.width // 2, s.height - 1, 40), _particles_done),
+    ("ShootScreen", lambda s: ShootScreen(s, s.width // 2, s.height // 2, 100), _particles_done),
+    ("Snow", lambda s: Snow(s), None),
+    ("Sprite", _sam, lambda s, e, f: f >= s.width + 20),
+    ("StarFirework", lambda s: StarFirework(s, s.width // 2, s.height - 1, 40), _particles_done),
+    ("Stars", lambda s: Stars(s, s.width * s.height // 20), None),
+    ("Wipe", lambda s: Wipe(s), lambda s, e, f: f >= 2 * s.height),
+]
+
+
+def _bar_values():
+    return [lambda: 50, lambda: 75, lambda: 25]
+
+
+BENCHMARKS = [
+    Benchmark("print_at/ascii", _print_at(False, _ASCII)),
+    Benchmark("print_at/unicode_aware/ascii", _print_at(True, _ASCII)),
+    Benchmark("print_at/unicode_aware/unicode", _print_at(True, _UNICODE)),
+    Benchmark("paint/colour_map", _paint),
+    Benchmark("buffer/deltas_sync/changed", _deltas_sync(True)),
+    Benchmark("buffer/deltas_sync/unchanged", _deltas_sync(False)),
+    Benchmark("highlight/blend_50", _highlight(50)),
+    Benchmark("highlight/blend_100", _highlight(100)),
+    Benchmark("draw/thin", _draw(True)),
+    Benchmark("draw/thick", _draw(False)),
+    Benchmark("draw_lines", _draw_lines),
+    Benchmark("fill_polygon", _fill_polygon),
+    Benchmark("renderer/Fire", _renderer(lambda: Fire(24, 80, "*" * 70, 0.8, 60, 256, bg=True))),
+    Benchmark("renderer/Plasma", _renderer(lambda: Plasma(24, 80, 256))),
+    Benchmark("renderer/Kaleidoscope", _renderer(
+        lambda: Kaleidoscope(24, 80, StaticRenderer(images=["${1}A${2}B${3}C\n" * 10]), 2))),
+    Benchmark("renderer/BarChart", _renderer(
+        lambda: BarChart(10, 40, _bar_values(), gradient=[(10, 2), (20, 3), (40, 1)]))),
+] + [
+    Benchmark("effect/{}/{}x{}".format(name, size[1], size[0]), _effect(size, create, finished))
+    for name, create, finished in EFFECTS for size in SIZES
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main(BENCHMARKS, "Benchmarks for asciimatics rendering."))
@@ -0,0 +1,288 @@
+"""
+Benchmarks for the widgets framework: building, drawing and navigating large Frames and widgets
+with a lot of data.
+
+Run with `python -m benchmarks.bench_widgets` - use `--help` for options.
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+import atexit
+from itertools import cycle
+import os
+import shutil
+import sys
+import tempfile
+from asciimatics.event import KeyboardEvent
+from asciimatics.parsers import AsciimaticsParser
+from asciimatics.screen import Screen, HeadlessScreen
+from asciimatics.widgets import Frame, Layout, Label, Text, CheckBox, Button, Divider, ListBox, \
+    MultiColumnListBox, TextBox, FileBrowser, Widget
+from benchmarks.harness import Benchmark, main
+
+#: Number of widgets in the large Frame benchmarks.
+WIDGET_COUNTS = [100, 500]
+
+#: Number of options in the list box benchmarks.
+OPTION_COUNTS = [10000, 100000, 1000000]
+
+#: Number of lines in the text box benchmarks.
+LINE_COUNTS = [100000]
+
+#: Number of files (in each of 10 directories) in the file browser benchmarks.
+FILE_COUNTS = [100, 1000]
+
+
+def _frame(screen, add_widgets):
+    """
+    Create a full screen Frame containing the specified widgets.
+    """
+    frame = Frame(screen, screen.height, screen.width, has_border=True, can_scroll=True)
+    layout = Layout([1, 1], fill_frame=True)
+    frame.add_layout(layout)
+    add_widgets(layout)
+    frame.fix()
+    frame.reset()
+    return frame
+
+
+def _many_widgets(count):
+    """
+    Create a function to add lots of different widgets to a Layout.
+    """
+    def _add(layout):
+        for i in range(count // 5):
+            column = i % 2
+            layout.add_widget(Label("Label {}".format(i)), column)
+            layout.add_widget(Text("Text {}:".format(i), name="text{}".format(i)), column)
+            layout.add_widget(CheckBox("Check {}".format(i), name="check{}".format(i)), column)
+            layout.add_widget(Button("Button {}".format(i), None), column)
+            layout.add_widget(Divider(), column)
+    return _add
+
+
+def _single(widget):
+    """
+    Create a function to add a single widget to a Layout.
+    """
+    def _add(layout):
+        layout.add_widget(widget)
+    return _add
+
+
+def _draw(screen, frame):
+    """
+    Create a function to draw the next frame of a Frame, as the Screen would.
+    """
+    frame_no = [0]
+
+    def _run():
+        frame_no[0] += 1
+        frame.update(frame_no[0])
+        screen.refresh()
+    return _run
+
+
+def _navigate(screen, frame, keys):
+    """
+    Create a function to measure the latency from a key press to its result being displayed.
+    """
+    draw = _draw(screen, frame)
+    events = cycle([KeyboardEvent(k) for k in keys])
+
+    def _run():
+        frame.process_event(next(events))
+        draw()
+    return _run
+
+
+def _frame_fix(count):
+    def _setup():
+        frame = _frame(HeadlessScreen(50, 160), _many_widgets(count))
+        return frame.fix
+    return _setup
+
+
+def _frame_update(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        frame = _frame(screen, _many_widgets(count))
+        frame_no = [0]
+
+        def _run():
+            frame_no[0] += 1
+            frame._update(frame_no[0])
+        return _run
+    return _setup
+
+
+def _frame_navigate(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        frame = _frame(screen, _many_widgets(count))
+
+        # Tab through the whole Frame and back again so that it scrolls as well.
+        keys = [Screen.KEY_TAB] * count + [Screen.KEY_BACK_TAB] * count
+        return _navigate(screen, frame, keys)
+    return _setup
+
+
+def _options(count, columns):
+    if columns:
+        return [(["Row {}".format(i), "{}".format(i * 7 % 1000), "Description {}".format(i)], i)
+                for i in range(count)]
+    return [("Option {}".format(i), i) for i in range(count)]
+
+
+def _list_box(count, columns):
+    if columns:
+        return MultiColumnListBox(Widget.FILL_FRAME, ["<20", ">10", "<0"], _options(count, columns),
+                                  titles=["Name", "Value", "Description"], name="list",
+                                  add_scroll_bar=True)
+    return ListBox(Widget.FILL_FRAME, _options(count, columns), name="list", add_scroll_bar=True)
+
+
+def _list_options(count, columns):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _list_box(count, columns)
+        _frame(screen, _single(widget))
+        options = [_options(count, columns), _options(count, columns)[::-1]]
+        index = [0]
+
+        def _run():
+            index[0] ^= 1
+            widget.options = options[index[0]]
+        return _run
+    return _setup
+
+
+def _list_value(count, columns):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _list_box(count, columns)
+        _frame(screen, _single(widget))
+        values = cycle([count - 1, 0, count // 2])
+
+        def _run():
+            widget.value = next(values)
+        return _run
+    return _setup
+
+
+def _list_update(count, columns):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _list_box(count, columns)
+        return _draw(screen, _frame(screen, _single(widget)))
+    return _setup
+
+
+def _list_navigate(count, columns):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _list_box(count, columns)
+        frame = _frame(screen, _single(widget))
+        keys = [Screen.KEY_DOWN] * 100 + [Screen.KEY_PAGE_DOWN] * 10 + [Screen.KEY_PAGE_UP] * 10 + \
+            [Screen.KEY_UP] * 100
+        return _navigate(screen, frame, keys)
+    return _setup
+
+
+def _lines(count):
+    return ["${{{}}}Line {} of the text with some ${{7,1}}colour${{7,2}} in it".format(i % 8, i)
+            for i in range(count)]
+
+
+def _text_box():
+    return TextBox(Widget.FILL_FRAME, name="text", line_wrap=True, parser=AsciimaticsParser())
+
+
+def _text_value(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _text_box()
+        _frame(screen, _single(widget))
+        lines = _lines(count)
+
+        def _run():
+            widget.value = lines
+        return _run
+    return _setup
+
+
+def _text_update(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _text_box()
+        frame = _frame(screen, _single(widget))
+        widget.value = _lines(count)
+        return _draw(screen, frame)
+    return _setup
+
+
+def _text_navigate(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        widget = _text_box()
+        frame = _frame(screen, _single(widget))
+        widget.value = _lines(count)
+        keys = [Screen.KEY_DOWN] * 100 + [Screen.KEY_PAGE_DOWN] * 10 + [Screen.KEY_PAGE_UP] * 10 + \
+            [Screen.KEY_UP] * 100
+        return _navigate(screen, frame, keys)
+    return _setup
+
+
+def _make_tree(count):
+    """
+    Create a temporary directory tree with 10 sub-directories, each containing `count` files.
+    """
+    root = tempfile.mkdtemp(prefix="asciimatics_bench_")
+    atexit.register(shutil.rmtree, root, True)
+    for d in range(10):
+        path = os.path.join(root, "dir{:02}".format(d))
+        os.mkdir(path)
+        for f in range(count):
+            with open(os.path.join(path, "file{:06}.txt".format(f)), "w") as file_:
+                file_.write("x" * (f % 100))
+    return root
+
+
+def _file_browser(count):
+    def _setup():
+        screen = HeadlessScreen(50, 160)
+        root = _make_tree(count)
+        widget = FileBrowser(Widget.FILL_FRAME, root, name="files")
+        _frame(screen, _single(widget))
+        directory = os.path.join(root, "dir00")
+
+        def _run():
+            widget._populate_list(directory)
+        return _run
+    return _setup
+
+
+BENCHMARKS = [
+    Benchmark("frame/{}/{}_widgets".format(op, count), fn(count))
+    for count in WIDGET_COUNTS
+    for op, fn in (("fix", _frame_fix), ("update", _frame_update), ("navigate", _frame_navigate))
+] + [
+    Benchmark("{}/{}/{}_options".format(name, op, count), fn(count, columns))
+    for name, columns in (("ListBox", False), ("MultiColumnListBox", True))
+    for count in OPTION_COUNTS
+    for op, fn in (("options", _list_options), ("value", _list_value), ("update", _list_update),
+                   ("navigate", _list_navigate))
+] + [
+    Benchmark("TextBox/{}/{}_lines".format(op, count), fn(count))
+    for count in LINE_COUNTS
+    for op, fn in (("value", _text_value), ("update", _text_update), ("navigate", _text_navigate))
+] + [
+    Benchmark("FileBrowser/populate/{}_files".format(count), _file_browser(count))
+    for count in FILE_COUNTS
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main(BENCHMARKS, "Benchmarks for asciimatics widgets."))
@@ -0,0 +1,248 @@
+"""
+This module provides the common code to run benchmarks, report the results and compare them
+against a saved baseline.
+"""
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import object
+from builtins import range
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 can't trace allocations, so we just report timings.
+    tracemalloc = None
+
+_now = getattr(time, "perf_counter", time.time)
+
+#: The latency percentiles to report for each benchmark.
+PERCENTILES = (50, 90, 99)
+
+
+class Benchmark(object):
+    """
+    A single benchmark.
+
+    The setup function is called once (outside of any timings) to create the function to be
+    measured.  This means that each benchmark only measures the operation that it is interested
+    in and not the cost of creating Screens, Renderers, etc.
+    """
+
+    def __init__(self, name, setup):
+        """
+        :param name: The unique name of the benchmark.
+        :param setup: Function that takes no parameters and returns the function to be measured.
+        """
+        self.name = name
+        self.setup = setup
+
+
+class Result(object):
+    """
+    The results of running a single benchmark.
+    """
+
+    def __init__(self, name, rate, mean, percentiles=None, peak=None, retained=None):
+        """
+        :param name: The name of the benchmark.
+        :param rate: The number of calls per second (i.e. frames per second for a frame).
+        :param mean: The mean time for each call in seconds.
+        :param percentiles: Dictionary of latency percentiles for each call in seconds (if known).
+        :param peak: The peak memory allocated by a single call in bytes (if known).
+        :param retained: The memory still allocated after a single call in bytes (if known).
+        """
+        self.name = name
+        self.rate = rate
+        self.mean = mean
+        self.percentiles = percentiles if percentiles else {}
+        self.peak = peak
+        self.retained = retained
+
+    def to_dict(self):
+        """
+        :returns: A dictionary of the results, suitable for saving as JSON.
+        """
+        return {"rate": self.rate, "mean": self.mean, "peak": self.peak, "retained": self.retained,
+                "percentiles": dict((str(k), v) for k, v in self.percentiles.items())}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        """
+        Create a Result from a dictionary created by to_dict.
+        """
+        percentiles = dict((int(k), v) for k, v in data.get("percentiles", {}).items())
+        return cls(name, data["rate"], data["mean"], percentiles, data.get("peak"), data.get("retained"))
+
+
+def measure(benchmark, min_time=0.2, repeat=3):
+    """
+    Run a benchmark and measure how fast it is.
+
+    The function is called repeatedly for at least `min_time` seconds and this is repeated
+    `repeat` times, taking the best result to reduce noise from other processes.  Each call is
+    also timed individually to find the latency percentiles.
+
+    :param benchmark: The Benchmark to run.
+    :param min_time: Minimum time in seconds for each timing run.
+    :param repeat: The number of timing runs.
+    :returns: The Result for this benchmark.
+    """
+    # Make sure that any randomized Effects do the same thing every time.
+    random.seed(42)
+    fn = benchmark.setup()
+
+    # Warm up (e.g. to fill any caches) and then find the fastest run.
+    fn()
+    best = None
+    samples = []
+    for _ in range(repeat):
+        count = 0
+        start = last = _now()
+        while True:
+            fn()
+            count += 1
+            now = _now()
+            samples.append(now - last)
+            last = now
+            elapsed = now - start
+            if elapsed >= min_time:
+                break
+        mean = elapsed / count
+        if best is None or mean < best:
+            best = mean
+
+    # Now see how much memory a single call needs.
+    peak = retained = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            fn()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(0, peak - before)
+            retained = current - before
+        finally:
+            tracemalloc.stop()
+
+    samples.sort()
+    percentiles = dict((p, samples[min(len(samples) - 1, len(samples) * p // 100)]) for p in PERCENTILES)
+    return Result(benchmark.name, 1 / best if best > 0 else float("inf"), best, percentiles, peak, retained)
+
+
+def save_results(results, filename):
+    """
+    Save a set of results as a baseline.
+
+    :param results: The list of Results to save.
+    :param filename: The name of the file to create.
+    """
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": dict((r.name, r.to_dict()) for r in results),
+    }
+    with io.open(filename, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2, sort_keys=True))
+
+
+def load_results(filename):
+    """
+    Load a baseline created by save_results.
+
+    :param filename: The name of the file to read.
+    :returns: A dictionary of Results, keyed by benchmark name.
+    """
+    with io.open(filename, "r", encoding="utf-8") as f:
+        data = json.loads(f.read())
+    return dict((k, Result.from_dict(k, v)) for k, v in data["results"].items())
+
+
+def _format_bytes(value):
+    return "-" if value is None else "{:.1f}".format(value / 1024)
+
+
+def _format_time(value):
+    return "{:>10}".format("-") if value is None else "{:>10.3f}".format(value * 1000)
+
+
+def report(results, baseline=None, threshold=10.0, out=sys.stdout):
+    """
+    Print a table of results, optionally compared against a baseline.
+
+    :param results: The list of Results to report.
+    :param baseline: Optional dictionary of baseline Results from load_results.
+    :param threshold: Percentage slow down that counts as a regression.
+    :param out: Stream to print the report to.
+    :returns: The list of names of the benchmarks that have regressed.
+    """
+    regressions = []
+    header = "{:<44} {:>12} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "Benchmark", "Rate (/s)", "Mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Peak KB", "Kept KB")
+    if baseline is not None:
+        header += " {:>12} {:>8}".format("Base (/s)", "Change")
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for result in results:
+        line = "{:<44} {:>12.1f} {:>10.3f} {} {:>10} {:>10}".format(
+            result.name, result.rate, result.mean * 1000,
+            " ".join(_format_time(result.percentiles.get(p)) for p in PERCENTILES),
+            _format_bytes(result.peak), _format_bytes(result.retained))
+        if baseline is not None:
+            old = baseline.get(result.name)
+            if old is None:
+                line += " {:>12} {:>8}".format("-", "new")
+            else:
+                change = (result.rate - old.rate) * 100 / old.rate if old.rate > 0 else 0
+                line += " {:>12.1f} {:>+7.1f}%".format(old.rate, change)
+                if change < -threshold:
+                    line += " REGRESSED"
+                    regressions.append(result.name)
+        print(line, file=out)
+    return regressions
+
+
+def main(benchmarks, description, argv=None):
+    """
+    Command line entry point for a benchmark suite.
+
+    :param benchmarks: The list of Benchmarks in the suite.
+    :param description: Description of the suite for the help text.
+    :param argv: Optional list of command line arguments (defaults to sys.argv).
+    :returns: The exit code for the process.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("-l", "--list", action="store_true", help="List the benchmarks and exit.")
+    parser.add_argument("-s", "--save", metavar="FILE", help="Save the results as a baseline.")
+    parser.add_argument("-c", "--compare", metavar="FILE", help="Compare the results with a baseline.")
+    parser.add_argument("-t", "--threshold", type=float, default=10.0,
+                        help="Percentage slow down that counts as a regression (default: 10).")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum time in seconds for each timing run (default: 0.2).")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timing runs (default: 3).")
+    args = parser.parse_args(argv)
+
+    selected = [b for b in benchmarks if not args.filter or any(f in b.name for f in args.filter)]
+    if args.list:
+        for benchmark in selected:
+            print(benchmark.name)
+        return 0
+
+    baseline = load_results(args.compare) if args.compare else None
+    results = [measure(b, args.min_time, args.repeat) for b in selected]
+    regressions = report(results, baseline, args.threshold)
+    if args.save:
+        save_results(results, args.save)
+    return 1 if regressions else 0
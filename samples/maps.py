@@ -290,14 +290,6 @@ class Map(Effect):
                 ("poi_label", [], []),
             ]
 
-    def _draw_lines_internal(self, coords, colour, bg):
-        """Helper to draw lines connecting a set of nodes that are scaled for the Screen."""
-        for i, (x, y) in enumerate(coords):
-            if i == 0:
-                self._screen.move(x, y)
-            else:
-                self._screen.draw(x, y, colour=colour, bg=bg, thin=True)
-
     def _draw_polygons(self, feature, bg, colour, extent, polygons, xo, yo):
         """Draw a set of polygons from a vector tile."""
         coords = []
@@ -306,15 +298,14 @@ class Map(Effect):
         # Polygons are expensive to draw and the buildings layer is huge - so we convert to
         # lines in order to process updates fast enough to animate.
         if "type" in feature["properties"] and "building" in feature["properties"]["type"]:
-            for line in coords:
-                self._draw_lines_internal(line, colour, bg)
+            self._screen.draw_lines(coords, colour=colour, bg=bg, thin=True)
         else:
             self._screen.fill_polygon(coords, colour=colour, bg=bg)
 
-    def _draw_lines(self, bg, colour, extent, line, xo, yo):
+    def _draw_lines(self, bg, colour, extent, lines, xo, yo):
         """Draw a set of lines from a vector tile."""
-        coords = [self._scale_coords(x, y, extent, xo, yo) for x, y in line]
-        self._draw_lines_internal(coords, colour, bg)
+        coords = [[self._scale_coords(x, y, extent, xo, yo) for x, y in line] for line in lines]
+        self._screen.draw_lines(coords, colour=colour, bg=bg, thin=True)
 
     def _draw_feature(self, feature, extent, colour, bg, xo, yo):
         """Draw a single feature from a layer in a vector tile."""
@@ -325,10 +316,9 @@ class Map(Effect):
             for multi_polygon in geometry["coordinates"]:
                 self._draw_polygons(feature, bg, colour, extent, multi_polygon, xo, yo)
         elif feature["geometry"]["type"] == "LineString":
-            self._draw_lines(bg, colour, extent, geometry["coordinates"], xo, yo)
+            self._draw_lines(bg, colour, extent, [geometry["coordinates"]], xo, yo)
         elif feature["geometry"]["type"] == "MultiLineString":
-            for line in geometry["coordinates"]:
-                self._draw_lines(bg, colour, extent, line, xo, yo)
+            self._draw_lines(bg, colour, extent, geometry["coordinates"], xo, yo)
         elif feature["geometry"]["type"] == "Point":
             x, y = self._scale_coords(
                 geometry["coordinates"][0], geometry["coordinates"][1], extent, xo, yo)
@@ -6,20 +6,19 @@ from asciimatics.parsers import AnsiTerminalParser
 from asciimatics.event import KeyboardEvent
 import sys
 import subprocess
-import threading
 try:
-    import select
+    import asyncio
     import pty
     import os
     import fcntl
     import curses
 except Exception:
-    print("This demo only runs on Unix systems.")
+    print("This demo only runs on Unix systems with Python 3.")
     sys.exit(0)
 
 
 class Terminal(TextBox):
-    def __init__(self, height):
+    def __init__(self, height, loop):
         super(Terminal, self).__init__(height, line_wrap=True, parser=AnsiTerminalParser())
 
         #Key definitions
@@ -41,20 +40,21 @@ class Terminal(TextBox):
         fl = fcntl.fcntl(self._master, fcntl.F_GETFL)
         fcntl.fcntl(self._master, fcntl.F_SETFL, fl | os.O_NONBLOCK)
 
-        # Start the shell and thread to pull data from it.
+        # Start the shell and ask the event loop to tell us when there is data from it.
         self._shell = subprocess.Popen(["bash", "-i"], preexec_fn=os.setsid, stdin=slave, stdout=slave, stderr=slave)
-        self._lock = threading.Lock()
-        self._thread = threading.Thread(target=self._background)
-        self._thread.daemon = True
-        self._thread.start()
+        os.close(slave)
+        self._loop = loop
+        self._loop.add_reader(self._master, self._background)
 
-    def update(self, frame_no):
-        # Don't allow background thread to update values mid screen refresh.
-        with self._lock:
-            super(Terminal, self).update(frame_no)
+    def close(self):
+        # Stop listening to the pseudo TTY and close it (which hangs up the shell).
+        if self._master is not None:
+            self._loop.remove_reader(self._master)
+            os.close(self._master)
+            self._master = None
 
     def process_event(self, event):
-        if isinstance(event, KeyboardEvent):
+        if isinstance(event, KeyboardEvent) and self._master is not None:
             if event.key_code > 0:
                 os.write(self._master, chr(event.key_code).encode())
                 return
@@ -64,50 +64,59 @@ class Terminal(TextBox):
         return event
 
     def _background(self):
+        # This runs in the same event loop as the Screen, so no need to lock anything.
+        value = ""
         while True:
-            ready, _, _ = select.select([self._master], [], [])
-            for stream in ready:
-                value = ""
-                while True:
-                    try:
-                        data = os.read(stream, 102400)
-                        data = data.decode("utf8", "replace")
-                        value += data
-                    # Python 2 and 3 raise different exceptions when they would block
-                    except Exception:
-                        with self._lock:
-                            value = value.split("\n")
-                            if len(self.value) > 0:
-                                value = self.value[:-1] + ["".join([self.value[-1].raw_text, value[0]])] + value[1:]
-                            self.value = value[-self._h:]
-                            cursor = self.value[-1:][0]._cursor
-                            if cursor > 0:
-                                self._column -= cursor
-                            self._frame.screen.force_update()
-                        break
+            try:
+                data = os.read(self._master, 102400)
+            except BlockingIOError:
+                # Read everything there is for now.
+                break
+            except OSError:
+                # The shell has gone away (e.g. EIO), so there is nothing more to read.
+                data = None
+            if not data:
+                self.close()
+                break
+            value += data.decode("utf8", "replace")
+        value = value.split("\n")
+        if len(self.value) > 0:
+            value = self.value[:-1] + ["".join([self.value[-1].raw_text, value[0]])] + value[1:]
+        self.value = value[-self._h:]
+        cursor = self.value[-1:][0]._cursor
+        if cursor > 0:
+            self._column -= cursor
+        self._frame.screen.force_update()
 
 class DemoFrame(Frame):
-    def __init__(self, screen):
+    def __init__(self, screen, loop):
         super(DemoFrame, self).__init__(screen, screen.height, screen.width)
 
         # Create the widgets for the demo.
         layout = Layout([100], fill_frame=True)
         self.add_layout(layout)
-        layout.add_widget(Terminal(Widget.FILL_FRAME))
+        self.terminal = Terminal(Widget.FILL_FRAME, loop)
+        layout.add_widget(self.terminal)
         self.fix()
         self.set_theme("monochrome")
 
-def demo(screen, scene):
-    screen.play([Scene([
-        Background(screen),
-        DemoFrame(screen)
-    ], -1)], stop_on_resize=True, start_scene=scene, allow_int=True)
+def demo(screen, scene, loop):
+    frame = DemoFrame(screen, loop)
+    try:
+        loop.run_until_complete(screen.play_async([Scene([
+            Background(screen),
+            frame
+        ], -1)], stop_on_resize=True, start_scene=scene, loop=loop))
+    finally:
+        # Each resize creates a new Terminal, so tidy up the old one.
+        frame.terminal.close()
 
 
 last_scene = None
+event_loop = asyncio.new_event_loop()
 while True:
     try:
-        Screen.wrapper(demo, catch_interrupt=False, arguments=[last_scene])
+        Screen.wrapper(demo, catch_interrupt=False, arguments=[last_scene, event_loop])
         sys.exit(0)
     except ResizeScreenError as e:
         last_scene = e.scene
@@ -61,7 +61,7 @@ setup(
     keywords='ascii ansi art credits titles animation curses '
              'ncurses windows xterm mouse keyboard terminal tty '
              'color colour crossplatform console',
-    packages=find_packages(exclude=['contrib', 'docs', 'tests*']),
+    packages=find_packages(exclude=['contrib', 'docs', 'tests*', 'benchmarks*']),
     install_requires=[
         'pyfiglet >= 0.7.2',
         'Pillow >= 2.7.0',
@@ -0,0 +1,106 @@
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from asciimatics.effects import Print
+from asciimatics.profiler import Profiler, ProfilerOverlay
+from asciimatics.renderers import StaticRenderer
+from asciimatics.scene import Scene
+from asciimatics.screen import HeadlessScreen, FrameScheduler
+from asciimatics.widgets import Frame, Layout, Label, Text
+from tests.mock_objects import MockEffect
+
+
+class TestProfiler(unittest.TestCase):
+    def test_effects(self):
+        """
+        Check that the Profiler records timings and cells for each Effect.
+        """
+        screen = HeadlessScreen(10, 40)
+        effect = Print(screen, StaticRenderer(images=["Hello"]), 0, speed=1)
+        stop = MockEffect(count=5)
+        profiler = Profiler()
+        profiler.profile_scene(Scene([effect, stop], -1))
+        screen.play([Scene([effect, stop], -1)], scheduler=FrameScheduler(fps=None))
+
+        # Check the results.
+        self.assertEqual(len(profiler.results), 2)
+        stats = [s for s in profiler.results if s.target is effect][0]
+        self.assertEqual(stats.name, "Print")
+        self.assertEqual(stats.calls, 5)
+        self.assertEqual(stats.cells, 25)
+        self.assertGreater(stats.total_time, 0)
+        self.assertGreaterEqual(stats.max_time, stats.mean_time)
+        self.assertEqual(len(profiler.report()), 3)
+        self.assertEqual(len(profiler.report(limit=1)), 2)
+        self.assertTrue(profiler.report()[0].startswith("Name"))
+
+        # Check that stopping restores the Effect and that reset clears the results.
+        profiler.stop()
+        self.assertNotIn("update", effect.__dict__)
+        self.assertNotIn("set", screen._buffer.__dict__)
+        effect.update(0)
+        self.assertEqual(stats.calls, 5)
+        profiler.reset()
+        self.assertEqual(stats.calls, 0)
+        self.assertEqual(stats.cells, 0)
+
+    def test_frame(self):
+        """
+        Check that the Profiler records timings for each widget in a Frame.
+        """
+        screen = HeadlessScreen(10, 40)
+        frame = Frame(screen, 10, 40, has_border=False, reduce_cpu=False)
+        layout = Layout([100])
+        frame.add_layout(layout)
+        label = Label("Label")
+        text = Text("Text:", name="text")
+        layout.add_widget(label)
+        layout.add_widget(text)
+        frame.fix()
+        profiler = Profiler()
+        profiler.profile(frame)
+
+        # Profiling the same Effect again is harmless.
+        profiler.profile(frame)
+        self.assertEqual(len(profiler.results), 1)
+
+        # Widgets are added to the results as they are drawn.
+        screen.play([Scene([frame, MockEffect(count=2)], -1)], scheduler=FrameScheduler(fps=None))
+        stats = dict((s.name, s) for s in profiler.results)
+        self.assertEqual(sorted(stats.keys()), ["Frame", "Label", "Text(text)"])
+        for name in ("Label", "Text(text)"):
+            self.assertIs(stats[name].parent, stats["Frame"])
+            self.assertEqual(stats[name].calls, 2)
+            self.assertGreater(stats[name].cells, 0)
+
+        # The Frame draws onto the Screen by copying its canvas.
+        self.assertGreater(stats["Frame"].cells, 0)
+        self.assertGreaterEqual(stats["Frame"].total_time, stats["Label"].total_time)
+        self.assertIsNone(stats["Frame"].parent)
+
+        # Stopping removes the hook from the Frame.
+        profiler.stop()
+        self.assertIsNone(frame._profile_widget)
+
+    def test_overlay(self):
+        """
+        Check that the ProfilerOverlay displays the results.
+        """
+        screen = HeadlessScreen(10, 80)
+        effect = Print(screen, StaticRenderer(images=["Hello"]), 5)
+        profiler = Profiler()
+        profiler.profile(effect)
+        overlay = ProfilerOverlay(screen, profiler, count=1, y=1)
+        self.assertEqual(overlay.stop_frame, 0)
+        self.assertEqual(overlay.frame_update_count, 20)
+        screen.play([Scene([effect, overlay, MockEffect(count=3)], -1)], scheduler=FrameScheduler(fps=None))
+        text = screen.display_text
+        self.assertTrue(text[1].startswith("Name"))
+        self.assertTrue(text[2].startswith("Print"))
+        self.assertEqual(text[3].strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
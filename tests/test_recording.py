@@ -0,0 +1,224 @@
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import unittest
+from asciimatics.effects import Print, Cycle
+from asciimatics.event import KeyboardEvent
+from asciimatics.recording import Recording, Replay, SceneCache
+from asciimatics.renderers import StaticRenderer
+from asciimatics.scene import Scene
+from asciimatics.screen import Screen, HeadlessScreen, FrameScheduler
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def _record(self, filename):
+        """
+        Record some changes to a Screen, returning the expected display after each refresh.
+        """
+        screen = HeadlessScreen(5, 20)
+        screen.print_at("Before", 0, 0, colour=Screen.COLOUR_RED)
+        screen.refresh()
+        screen.start_recording(os.path.join(self.tmp_dir, filename))
+        displays = [screen.display_text]
+
+        screen.print_at("Hello", 2, 1, colour=Screen.COLOUR_GREEN, bg=Screen.COLOUR_BLUE)
+        screen.print_at("World", 8, 1)
+        screen.refresh()
+        displays.append(screen.display_text)
+
+        screen.scroll_region(screen.start_line, 3, 1)
+        screen.print_at("Scrolled", 0, 4, attr=Screen.A_BOLD)
+        screen.refresh()
+        displays.append(screen.display_text)
+
+        # A refresh with no changes isn't recorded.
+        screen.refresh()
+
+        screen.clear()
+        screen.print_at("Cleared", 0, 2)
+        screen.refresh()
+        displays.append(screen.display_text)
+        screen.stop_recording()
+        return screen, displays
+
+    def _check_replay(self, filename):
+        screen, displays = self._record(filename)
+        recording = Recording(os.path.join(self.tmp_dir, filename))
+        self.assertEqual(recording.width, 20)
+        self.assertEqual(recording.height, 5)
+        self.assertEqual(recording.colours, screen.colours)
+        self.assertFalse(recording.unicode_aware)
+        self.assertEqual(len(recording.frames), len(displays))
+        self.assertGreaterEqual(recording.duration, 0)
+
+        # Replaying each frame on a new Screen should give the same results.
+        replay = HeadlessScreen(5, 20)
+        for i, expected in enumerate(displays):
+            recording.draw_frame(replay, i)
+            replay.refresh()
+            self.assertEqual(replay.display_text, expected)
+        self.assertEqual(replay.get_display(0, 2), screen.get_display(0, 2))
+
+    def test_replay(self):
+        """
+        Check that a recording can be replayed.
+        """
+        self._check_replay("test.rec")
+
+    def test_compressed(self):
+        """
+        Check that a compressed recording can be replayed.
+        """
+        self._check_replay("test.rec.gz")
+
+    def test_play(self):
+        """
+        Check that a Recording can play itself on a Screen.
+        """
+        self._record("test.rec")
+        recording = Recording(os.path.join(self.tmp_dir, "test.rec"))
+        screen = HeadlessScreen(5, 20)
+        recording.play(screen, speed=100, stop_on_input=False)
+        self.assertEqual(screen.display_text[2], "Cleared             ")
+
+        # Check that input can stop the playback.
+        screen = HeadlessScreen(5, 20, events=[KeyboardEvent(ord("q"))])
+        recording.play(screen, speed=100)
+        self.assertEqual(screen.display_text[0], " " * 20)
+
+    def test_replay_effect(self):
+        """
+        Check that the Replay Effect plays back a Recording in a Scene.
+        """
+        self._record("test.rec")
+        recording = Recording(os.path.join(self.tmp_dir, "test.rec"))
+        screen = HeadlessScreen(5, 20)
+        effect = Replay(screen, recording, speed=100, stop_app=True)
+        self.assertEqual(effect.stop_frame, 0)
+        screen.play([Scene([effect], -1)], scheduler=FrameScheduler(fps=100))
+        self.assertEqual(screen.display_text[2], "Cleared             ")
+
+    def test_clock(self):
+        """
+        Check that recordings can use their own clock and mark when they ended.
+        """
+        filename = os.path.join(self.tmp_dir, "clock.rec")
+        now = [10]
+        screen = HeadlessScreen(5, 20)
+        screen.start_recording(filename, clock=lambda: now[0])
+        now[0] = 12
+        screen.print_at("Hello", 0, 0)
+        screen.refresh()
+        now[0] = 15
+        screen.stop_recording(mark_end=True)
+        recording = Recording(filename)
+        self.assertEqual([f[0] for f in recording.frames], [0, 2, 5])
+        self.assertEqual(recording.frames[-1][1], [])
+        self.assertEqual(recording.duration, 5)
+
+    def test_bad_version(self):
+        """
+        Check that unknown file versions are rejected.
+        """
+        filename = os.path.join(self.tmp_dir, "bad.rec")
+        with open(filename, "w") as f:
+            f.write('{"version": 99}\n')
+        with self.assertRaises(ValueError):
+            Recording(filename)
+
+
+class TestSceneCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.created = 0
+
+    def _create(self, screen):
+        self.created += 1
+        return Scene([Print(screen, StaticRenderer(images=["Hello\nWorld"]), 1, speed=1),
+                      Cycle(screen, StaticRenderer(images=["Cycle"]), 4)], 15)
+
+    def test_cache(self):
+        """
+        Check that cached Scenes are only rendered once and replay the original.
+        """
+        # Play the original Scene to see what it should look like.
+        expected = HeadlessScreen(6, 20)
+        expected.play([self._create(expected)], repeat=False, scheduler=FrameScheduler(fps=None))
+        self.created = 0
+
+        # Now play the cached version.
+        cache = SceneCache(self.tmp_dir)
+        screen = HeadlessScreen(6, 20)
+        scene = cache.scene(screen, "test", self._create)
+        self.assertEqual(self.created, 1)
+        self.assertEqual(scene.name, "test")
+        self.assertEqual(scene.duration, 15)
+        screen.play([scene], repeat=False, scheduler=FrameScheduler(fps=None))
+        self.assertEqual(screen.display_text, expected.display_text)
+        for x in range(20):
+            self.assertEqual(screen.get_display(x, 4), expected.get_display(x, 4))
+
+        # The same Screen settings should re-use the cache - from memory or disk.
+        cache.scene(screen, "test", self._create)
+        self.assertEqual(self.created, 1)
+        screen = HeadlessScreen(6, 20)
+        scene = SceneCache(self.tmp_dir).scene(screen, "test", self._create)
+        self.assertEqual(self.created, 1)
+        screen.play([scene], repeat=False, scheduler=FrameScheduler(fps=None))
+        self.assertEqual(screen.display_text, expected.display_text)
+
+        # Any change to the Screen needs a new rendering.
+        cache.scene(HeadlessScreen(7, 20), "test", self._create)
+        cache.scene(HeadlessScreen(6, 20, colours=8), "test", self._create)
+        cache.scene(HeadlessScreen(6, 20, unicode_aware=True), "test", self._create)
+        self.assertEqual(self.created, 4)
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 4)
+
+    def test_unsafe_names(self):
+        """
+        Check that Scene names can't write outside the cache directory.
+        """
+        cache_dir = os.path.join(self.tmp_dir, "cache")
+        cache = SceneCache(cache_dir)
+        screen = HeadlessScreen(6, 20)
+        cache.scene(screen, "../../escape", self._create)
+        cache.scene(screen, "a/b", self._create)
+        cache.scene(screen, "a_b", self._create)
+        self.assertEqual(os.listdir(self.tmp_dir), ["cache"])
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+        # Names that only differ in unsafe characters are still cached separately.
+        self.created = 0
+        SceneCache(cache_dir).scene(screen, "a/b", self._create)
+        self.assertEqual(self.created, 0)
+
+    def test_memory_only(self):
+        """
+        Check that the cache can be used without a directory.
+        """
+        cache = SceneCache()
+        screen = HeadlessScreen(6, 20)
+        cache.scene(screen, "test", self._create)
+        cache.scene(screen, "test", self._create)
+        self.assertEqual(self.created, 1)
+
+    def test_infinite_scene(self):
+        """
+        Check that Scenes without a fixed duration are rejected.
+        """
+        with self.assertRaises(ValueError):
+            SceneCache().scene(HeadlessScreen(6, 20), "test", lambda s: Scene([Cycle(
+                s, StaticRenderer(images=["Cycle"]), 4)], -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,13 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import os
-from mock import MagicMock
+from mock import MagicMock, patch
+from array import array
+from math import sqrt
 from random import randint
 import unittest
 import sys
+import threading
 import time
 from builtins import str
 from builtins import chr
@@ -19,8 +22,11 @@ try:
     from asciimatics.screen import _SignalState
 except ImportError:
     pass
+from asciimatics.effects import Print
+from asciimatics.renderers import StaticRenderer
 from asciimatics.scene import Scene
-from asciimatics.screen import Screen, Canvas, ManagedScreen
+from asciimatics.screen import Screen, Canvas, ManagedScreen, HeadlessScreen, FrameScheduler, \
+    _DoubleBuffer
 from tests.mock_objects import MockEffect
 if sys.platform == "win32":
     import win32console
@@ -159,8 +165,10 @@ class TestScreen(unittest.TestCase):
             screen.highlight(0, 0, screen.width, 1, fg=0, bg=0, blend=50)
             for x in range(screen.width):
                 _, fg2, _, bg2 = screen.get_from(x, 0)
-                self.assertEqual(bg2, 0)
-                self.assertEqual(fg2, 0)
+                self.assertEqual(bg2, screen._blend(0, Screen.COLOUR_YELLOW, 50))
+                self.assertEqual(fg2, screen._blend(0, Screen.COLOUR_CYAN, 50))
+                self.assertNotEqual(bg2, Screen.COLOUR_YELLOW)
+                self.assertNotEqual(fg2, Screen.COLOUR_CYAN)
 
         Screen.wrapper(
             check_screen_and_canvas, height=15, arguments=[internal_checks])
@@ -461,6 +469,179 @@ class TestScreen(unittest.TestCase):
         Screen.wrapper(
             check_screen_and_canvas, height=15, arguments=[internal_checks])
 
+    def test_refresh_runs(self):
+        """
+        Check that refresh coalesces adjacent changes with the same colours.
+        """
+        def internal_checks(screen):
+            screen.refresh()
+            screen._print_at = MagicMock()
+            screen._change_colours = MagicMock()
+            screen.print_at("ab", 0, 1, colour=Screen.COLOUR_RED)
+            screen.print_at("cd", 2, 1, colour=Screen.COLOUR_RED)
+            screen.print_at("ef", 4, 1, colour=Screen.COLOUR_BLUE)
+            screen.print_at("gh", 7, 1, colour=Screen.COLOUR_BLUE)
+            screen.refresh()
+            self.assertEqual(
+                [c[0] for c in screen._print_at.call_args_list],
+                [("abcd", 0, 1, 4), ("ef", 4, 1, 2), ("gh", 7, 1, 2)])
+            self.assertEqual(
+                [c[0] for c in screen._change_colours.call_args_list],
+                [(Screen.COLOUR_RED, 0, 0), (Screen.COLOUR_BLUE, 0, 0), (Screen.COLOUR_BLUE, 0, 0)])
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_buffered_output(self):
+        """
+        Check that curses output is written in one go on refresh, even with short writes.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Only valid for curses platforms")
+
+        def internal_checks(screen):
+            screen.refresh()
+            written = []
+
+            def short_write(_, data):
+                written.append(bytes(data[:5]))
+                return len(written[-1])
+
+            with patch("asciimatics.screen.os.write", side_effect=short_write) as mock_write:
+                screen.print_at("Hello-world!", 0, 0)
+                self.assertEqual(mock_write.call_count, 0)
+                screen.refresh()
+                self.assertIn(b"Hello-world!", b"".join(written))
+                self.assertGreater(mock_write.call_count, 2)
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_frame_stats_output(self):
+        """
+        Check that curses output is recorded in the frame statistics.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Only valid for curses platforms")
+
+        def internal_checks(screen):
+            screen.enable_frame_stats()
+            screen.set_scenes([Scene([Print(screen, StaticRenderer(["Hello"]), 0, speed=1)], 10)])
+            screen.draw_next_frame()
+            stats = screen.frame_stats[-1]
+            self.assertEqual(stats.cells, 5)
+            self.assertGreater(stats.bytes, 5)
+            self.assertGreater(stats.escape_sequences, 0)
+            self.assertGreaterEqual(stats.output_time, 0)
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_escape_sequence_cache(self):
+        """
+        Check that cached escape sequences match the terminfo database.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Only valid for curses platforms")
+
+        def internal_checks(screen):
+            for x, y in ((0, 0), (5, 3), (screen.width - 1, screen.height - 1)):
+                self.assertEqual(screen._move_cursor(x, y),
+                                 curses.tparm(curses.tigetstr("cup"), y, x).decode("utf-8"))
+            for colour in range(screen.colours):
+                self.assertEqual(screen._expand(screen._fg_colours, screen._fg_color, colour),
+                                 curses.tparm(curses.tigetstr("setaf"), colour).decode("utf-8"))
+            self.assertEqual(len(screen._fg_colours), screen.colours)
+
+            # Non-standard cursor moves are cached instead.
+            screen._ansi_cursor = False
+            self.assertEqual(screen._move_cursor(1, 2),
+                             curses.tparm(curses.tigetstr("cup"), 2, 1).decode("utf-8"))
+            self.assertIn((1, 2), screen._cursor_moves)
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_relative_cursor_moves(self):
+        """
+        Check that curses output uses the cheapest cursor moves.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Only valid for curses platforms")
+
+        def internal_checks(screen):
+            screen.refresh()
+            screen.print_at("a", 0, 1)
+            screen.print_at("b", 2, 1)
+            screen.print_at("c", 20, 1)
+            screen.print_at("d", 0, 2)
+            screen.print_at("e", 5, 4)
+            screen._flush_output = MagicMock()
+            screen.refresh()
+            output = "".join(screen._output)
+
+            # Short gaps are reprinted and moving to the next line uses CR/LF.
+            self.assertIn("a b", output)
+            self.assertIn("c\r\nd", output)
+
+            # Absolute moves are only used where needed.
+            cup = curses.tigetstr("cup")
+            self.assertNotIn(curses.tparm(cup, 1, 20).decode("utf-8"), output)
+            self.assertIn(curses.tparm(cup, 4, 5).decode("utf-8"), output)
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_scroll_region(self):
+        """
+        Check that scrolling a band of the screen uses the terminal where possible.
+        """
+        def internal_checks(screen):
+            for y in range(screen.height):
+                screen.print_at(str(y % 10), 0, y)
+            screen.refresh()
+
+            # Scroll a full width canvas and check that the Screen follows suit.
+            canvas = Canvas(screen, 5, screen.width, 0, 2)
+            for y in range(10):
+                canvas.print_at(str(y), 1, y)
+            canvas.scroll_to(2)
+            self.assertEqual([chr(screen.get_from(0, y)[0]) for y in range(8)],
+                             ["0", "1", "4", "5", "6", " ", " ", "7"])
+            if screen._can_scroll_region:
+                self.assertEqual(screen._region_scrolls, [(2, 5, 2)])
+                self.assertEqual(list(screen._buffer.deltas(0, screen.height)), [])
+            screen.refresh()
+            self.assertEqual(screen._region_scrolls, [])
+
+            # Narrow canvases can't do the same trick.
+            canvas = Canvas(screen, 5, 10, 1, 2)
+            canvas.scroll_to(1)
+            self.assertEqual(screen._region_scrolls, [])
+
+        Screen.wrapper(internal_checks, height=15)
+
+    def test_synchronized_updates(self):
+        """
+        Check that refreshes are framed by synchronized update sequences when requested.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Only valid for curses platforms")
+
+        def internal_checks(screen, expected):
+            screen.refresh()
+            with patch("asciimatics.screen.os.write", side_effect=lambda _, data: len(data)) as mock_write:
+                # No need for anything if there is nothing to draw.
+                screen.refresh()
+                self.assertEqual(mock_write.call_count, 0)
+
+                screen.print_at("Hello", 0, 0)
+                screen.refresh()
+                output = bytes(mock_write.call_args[0][1]).decode("utf-8")
+                if expected:
+                    self.assertTrue(output.startswith(screen._begin_sync))
+                    self.assertTrue(output.endswith(screen._end_sync))
+                else:
+                    self.assertIsNone(screen._begin_sync)
+
+        Screen.wrapper(internal_checks, height=15, synchronized_updates=True, arguments=[True])
+        Screen.wrapper(internal_checks, height=15, arguments=[False])
+
     def test_origin(self):
         """
         Check that Canvas origin is correct.
@@ -838,6 +1019,29 @@ class TestScreen(unittest.TestCase):
 
         Screen.wrapper(internal_checks, height=15)
 
+    def test_wait_resize(self):
+        """
+        Check that wait_for_input is woken up by the screen being resized.
+        """
+        if sys.platform == "win32":
+            self.skipTest("Windows does not have signals.")
+
+        def internal_checks(screen):
+            timer = threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGWINCH))
+            timer.start()
+            start = time.time()
+            screen.wait_for_input(5)
+            timer.join()
+            self.assertLess(time.time() - start, 1)
+            self.assertTrue(screen.has_resized())
+
+            # The wake up is only used once.
+            start = time.time()
+            screen.wait_for_input(0.1)
+            self.assertGreaterEqual(time.time() - start, 0.1)
+
+        Screen.wrapper(internal_checks, height=15)
+
     def test_ctrl(self):
         """
         Check that ctrl returns the right values.
@@ -990,5 +1194,638 @@ class TestScreen(unittest.TestCase):
             self.assert_line_equals(canvas, "b                                      c")
 
 
+class TestDoubleBuffer(unittest.TestCase):
+    def test_get_and_set(self):
+        """
+        Check that the buffer stores and returns whole cells.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        self.assertEqual(buffer.get(0, 0), (" ", 7, 0, 0, 1))
+
+        # Single cell and slice updates.
+        buffer.set(1, 2, ("a", 1, 2, 3, 1))
+        buffer.set(slice(3, 5), 2, [("b", 4, 0, 5, 2), ("b", 4, 0, 5, 0)])
+        self.assertEqual(buffer.get(1, 2), ("a", 1, 2, 3, 1))
+        self.assertEqual(buffer.slice(2, 2, 3), [(" ", 7, 0, 0, 1), ("b", 4, 0, 5, 2), ("b", 4, 0, 5, 0)])
+
+        # Slices are clipped to the buffer.
+        self.assertEqual(len(buffer.slice(8, 0, 5)), 2)
+
+    def test_clear(self):
+        """
+        Check that clearing a box only affects that part of the buffer.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        buffer.clear(1, 2, 3, 2, 1, 3, 2)
+        self.assertEqual(buffer.get(1, 1), (" ", 7, 0, 0, 1))
+        self.assertEqual(buffer.get(2, 1), (" ", 1, 2, 3, 1))
+        self.assertEqual(buffer.get(4, 2), (" ", 1, 2, 3, 1))
+        self.assertEqual(buffer.get(5, 2), (" ", 7, 0, 0, 1))
+        self.assertEqual(buffer.get(2, 3), (" ", 7, 0, 0, 1))
+
+        # Clearing the whole buffer resets everything.
+        buffer.clear(2, 0, 4)
+        self.assertEqual(buffer.get(0, 0), (" ", 2, 0, 4, 1))
+        self.assertEqual(buffer.get(9, 4), (" ", 2, 0, 4, 1))
+
+    def test_deltas_and_sync(self):
+        """
+        Check that deltas report changed cells until the buffers are synchronized.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        buffer.sync()
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+        buffer.set(3, 1, ("a", 7, 0, 0, 1))
+        buffer.set(0, 4, (" ", 1, 0, 0, 1))
+        self.assertEqual(list(buffer.deltas(0, 5)), [(1, 3), (4, 0)])
+        self.assertEqual(list(buffer.deltas(0, 2)), [(1, 3)])
+        buffer.sync()
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+
+    def test_sync_in_place(self):
+        """
+        Check that sync patches the dirty spans into the existing screen buffer.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        buffer.sync()
+        screen_buffer = buffer._screen_buffer
+        chars = screen_buffer.chars
+        double_buffer = buffer._double_buffer
+
+        # Changes are copied into the same arrays, which are not shared with the double buffer.
+        buffer.set(3, 1, ("a", 1, 2, 3, 1))
+        buffer.sync()
+        self.assertIs(buffer._screen_buffer, screen_buffer)
+        self.assertIs(screen_buffer.chars, chars)
+        self.assertIsNot(screen_buffer.chars, double_buffer.chars)
+        self.assertEqual(
+            [plane[13] for plane in screen_buffer.planes], [ord("a"), 1, 2, 3, 1])
+        buffer.set(4, 1, ("b", 1, 2, 3, 1))
+        self.assertEqual(chr(screen_buffer.chars[14]), " ")
+        self.assertEqual(list(buffer.deltas(0, 5)), [(1, 4)])
+
+        # A full clear fills the existing double buffer and the next sync copies all of it.
+        buffer.clear(2, 0, 4)
+        self.assertIs(buffer._double_buffer, double_buffer)
+        buffer.sync()
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+        self.assertEqual(list(screen_buffer.fg), [2] * 50)
+        self.assertEqual(list(screen_buffer.chars), [ord(" ")] * 50)
+
+    def test_dirty_rows(self):
+        """
+        Check that pending changes follow the rows when the buffer scrolls.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        buffer.sync()
+        buffer.set(4, 3, ("a", 7, 0, 0, 1))
+        buffer.set(slice(1, 3), 4, [("b", 7, 0, 0, 1), ("c", 7, 0, 0, 1)])
+        buffer.scroll(1)
+        self.assertEqual(list(buffer.deltas(0, 5)), [(2, 4), (3, 1), (3, 2)])
+        buffer.scroll(-2)
+        self.assertEqual(list(buffer.deltas(0, 5)), [(4, 4)])
+
+        # Clearing a box only touches the rows in that box.
+        buffer.sync()
+        buffer.clear(1, 0, 0, 8, 1, 2, 1)
+        self.assertEqual(list(buffer.deltas(0, 5)), [(1, 8), (1, 9)])
+
+    def test_scroll(self):
+        """
+        Check that scrolling moves both buffers.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        for y in range(5):
+            buffer.set(0, y, (str(y), 7, 0, 0, 1))
+        buffer.sync()
+
+        # Scroll up.
+        buffer.scroll(2)
+        self.assertEqual([buffer.get(0, y)[0] for y in range(5)], ["2", "3", "4", " ", " "])
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+
+        # Scroll down.
+        buffer.scroll(-1)
+        self.assertEqual([buffer.get(0, y)[0] for y in range(5)], [" ", "2", "3", "4", " "])
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+
+    def test_scroll_band(self):
+        """
+        Check that scrolling a band of lines leaves the rest of the buffer alone.
+        """
+        buffer = _DoubleBuffer(5, 10)
+        for y in range(5):
+            buffer.set(0, y, (str(y), 7, 0, 0, 1))
+        buffer.sync()
+
+        # Scroll the middle of the buffer along with the screen buffer.
+        buffer.scroll(1, 1, 3)
+        self.assertEqual([buffer.get(0, y)[0] for y in range(5)], ["0", "2", "3", " ", "4"])
+        self.assertEqual(list(buffer.deltas(0, 5)), [])
+
+        # Scroll just the double buffer - changed lines need redrawing.
+        buffer.scroll(-1, 0, 2, screen_buffer=False)
+        self.assertEqual([buffer.get(0, y)[0] for y in range(5)], [" ", "0", "3", " ", "4"])
+        self.assertEqual(list(buffer.deltas(0, 5)), [(0, 0), (1, 0)])
+
+    def test_block_transfer(self):
+        """
+        Check that block transfers clip to the target buffer.
+        """
+        source = _DoubleBuffer(3, 4)
+        source.clear(1, 0, 2)
+        target = _DoubleBuffer(5, 10)
+        target.block_transfer(source, -2, 3)
+        self.assertEqual(target.get(0, 3), (" ", 1, 0, 2, 1))
+        self.assertEqual(target.get(1, 4), (" ", 1, 0, 2, 1))
+        self.assertEqual(target.get(2, 4), (" ", 7, 0, 0, 1))
+        self.assertEqual(target.get(0, 2), (" ", 7, 0, 0, 1))
+
+    def test_block_transfer_damage(self):
+        """
+        Check that block transfers only copy cells that have changed.
+        """
+        source = _DoubleBuffer(2, 4)
+        target = _DoubleBuffer(5, 10)
+        source.set(1, 1, ("X", 1, 0, 2, 1))
+        target.block_transfer(source, 3, 1)
+        target.sync()
+
+        # Nothing has changed, so nothing to redraw.
+        target.block_transfer(source, 3, 1)
+        self.assertEqual(list(target.deltas(0, 5)), [])
+
+        # Only the changed cells are marked for redrawing.
+        source.set(2, 0, ("Y", 1, 0, 2, 1))
+        target.block_transfer(source, 3, 1)
+        self.assertEqual(list(target.deltas(0, 5)), [(1, 5)])
+        self.assertEqual((target._dirty_start[1], target._dirty_end[1]), (5, 6))
+        target.sync()
+
+        # Check that anything drawn over the area is restored (e.g. for overlapping Frames).
+        target.set(4, 2, ("Z", 3, 0, 0, 1))
+        target.sync()
+        target.block_transfer(source, 3, 1)
+        self.assertEqual(target.get(4, 2), ("X", 1, 0, 2, 1))
+        self.assertEqual(list(target.deltas(0, 5)), [(2, 4)])
+
+    def test_recolour(self):
+        """
+        Check that recolouring maps the colours of a box through the look-up tables.
+        """
+        buffer = _DoubleBuffer(4, 5)
+        buffer.clear(1, 2, 3)
+        buffer.set(1, 1, ("X", 255, 2, 3, 1))
+        buffer.sync()
+        table = array("h", [(c + 1) % 256 for c in range(256)])
+        colour_map = (table, bytes(bytearray(list(table))))
+
+        # Only the box should change.
+        buffer.recolour(1, 1, 3, 2, fg_map=colour_map)
+        self.assertEqual(buffer.get(1, 1), ("X", 0, 2, 3, 1))
+        self.assertEqual(buffer.get(3, 2), (" ", 2, 2, 3, 1))
+        self.assertEqual(buffer.get(0, 1), (" ", 1, 2, 3, 1))
+        self.assertEqual(buffer.get(4, 2), (" ", 1, 2, 3, 1))
+        self.assertEqual(buffer.get(1, 0), (" ", 1, 2, 3, 1))
+        self.assertEqual(list(buffer.deltas(0, 4)), [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3)])
+
+        # Full width boxes are done in one go.
+        buffer.recolour(0, 2, 5, 2, bg_map=colour_map)
+        self.assertEqual(buffer.get(0, 2), (" ", 1, 2, 4, 1))
+        self.assertEqual(buffer.get(4, 3), (" ", 1, 2, 4, 1))
+        self.assertEqual(buffer.get(4, 1), (" ", 1, 2, 3, 1))
+        self.assertEqual((buffer._dirty_start[3], buffer._dirty_end[3]), (0, 5))
+
+
+class TestHeadlessScreen(unittest.TestCase):
+    def test_refresh(self):
+        """
+        Check that refresh draws to the in-memory display.
+        """
+        screen = HeadlessScreen(5, 20, colours=8)
+        self.assertEqual(screen.dimensions, (5, 20))
+        self.assertEqual(screen.colours, 8)
+        screen.print_at("Hello", 2, 1, colour=Screen.COLOUR_RED, bg=Screen.COLOUR_BLUE)
+        self.assertEqual(screen.display_text[1], " " * 20)
+        screen.refresh()
+        self.assertEqual(screen.display_text[1], "  Hello             ")
+        self.assertEqual(screen.get_display(2, 1), (ord("H"), Screen.COLOUR_RED, 0, Screen.COLOUR_BLUE))
+
+        # Check that double-width glyphs are laid out correctly.
+        screen = HeadlessScreen(5, 20, unicode_aware=True)
+        screen.print_at("你好!", 0, 0)
+        screen.refresh()
+        self.assertEqual(screen.display_text[0], "你好!               ")
+
+    def test_print_runs(self):
+        """
+        Check that print_at writes runs of cells correctly in unicode aware mode.
+        """
+        screen = HeadlessScreen(5, 20, unicode_aware=True)
+
+        # Transparent spaces leave the existing text in place for both ASCII and wide text.
+        screen.print_at("abcdefghij", 0, 0)
+        screen.print_at("X Y  Z", 1, 0, transparent=True)
+        screen.print_at("你 好", 10, 0)
+        screen.print_at("a b", 10, 0, transparent=True)
+        screen.refresh()
+        self.assertEqual(screen.display_text[0], "aXcYefZhijaxb好     ")
+
+        # ASCII text that bisects double-width glyphs tidies up the orphaned halves.
+        screen.print_at("你好你好", 0, 1)
+        screen.print_at("ab", 1, 1)
+        screen.refresh()
+        self.assertEqual(screen.display_text[1], "xabx你好            ")
+
+        # Wide glyphs that don't fit are not drawn at all.
+        screen.print_at("你好", 17, 2)
+        screen.refresh()
+        self.assertEqual(screen.display_text[2], "                 你 ")
+
+    def test_draw_lines(self):
+        """
+        Check that drawing a batch of lines matches drawing them one at a time.
+        """
+        lines = [[(0, 0), (20, 10), (40, 0), (2, 9)],
+                 [(10, 10), (10, 1), (30.5, 3.5)],
+                 [(5, 5), (35, 5)]]
+        for thin in (True, False):
+            for char in (None, "*"):
+                batch = HeadlessScreen(12, 40, unicode_aware=True)
+                single = HeadlessScreen(12, 40, unicode_aware=True)
+                batch.draw_lines(lines, char=char, colour=Screen.COLOUR_RED, thin=thin)
+                for line in lines:
+                    single.move(*line[0])
+                    for x, y in line[1:]:
+                        single.draw(x, y, char=char, colour=Screen.COLOUR_RED, thin=thin)
+                self.assertEqual([[batch.get_from(x, y) for x in range(40)] for y in range(12)],
+                                 [[single.get_from(x, y) for x in range(40)] for y in range(12)])
+
+                # Drawing cursor is left at the last point.
+                batch.draw(0, 0, char=char)
+                single.move(35, 5)
+                single.draw(0, 0, char=char)
+                self.assertEqual([[batch.get_from(x, y) for x in range(40)] for y in range(12)],
+                                 [[single.get_from(x, y) for x in range(40)] for y in range(12)])
+
+    def test_blend(self):
+        """
+        Check that colour blending finds the closest colour in the palette.
+        """
+        def nearest(screen, new, old, ratio):
+            # Simple linear search of the palette for the expected answer.
+            palette = screen.palette
+            rgb = [(c1 * ratio + c2 * (100 - ratio)) // 100
+                   for c1, c2 in zip(palette[new * 3:new * 3 + 3], palette[old * 3:old * 3 + 3])]
+            diffs = [sqrt(((screen.palette[c * 3] - rgb[0]) * 0.3) ** 2 +
+                          ((screen.palette[c * 3 + 1] - rgb[1]) * 0.59) ** 2 +
+                          ((screen.palette[c * 3 + 2] - rgb[2]) * 0.11) ** 2)
+                     for c in range(screen.colours)]
+            return diffs.index(min(diffs))
+
+        for colours in (8, 256):
+            screen = HeadlessScreen(5, 20, colours=colours)
+
+            # Blend ratio and order of colours must both be respected.
+            self.assertEqual(screen._blend(Screen.COLOUR_RED, Screen.COLOUR_BLACK, 100), Screen.COLOUR_RED)
+            self.assertEqual(screen._blend(Screen.COLOUR_RED, Screen.COLOUR_BLACK, 0), Screen.COLOUR_BLACK)
+            self.assertEqual(screen._blend(Screen.COLOUR_BLACK, Screen.COLOUR_RED, 100), 0)
+            self.assertEqual(screen._blend(None, Screen.COLOUR_RED, 50), Screen.COLOUR_RED)
+
+            # Check a random sample against the full search.
+            for _ in range(500):
+                new = randint(0, colours - 1)
+                old = randint(0, colours - 1)
+                ratio = randint(0, 100)
+                self.assertEqual(screen._blend(new, old, ratio), nearest(screen, new, old, ratio))
+
+            # The translation table for highlights is built once, along with the look-up table.
+            table, translation = screen._blend_table(Screen.COLOUR_RED, 50)
+            self.assertEqual(list(bytearray(translation)), list(table))
+            self.assertIs(screen._blend_table(Screen.COLOUR_RED, 50)[1], translation)
+
+    def test_scroll(self):
+        """
+        Check that scrolling moves the display.
+        """
+        screen = HeadlessScreen(5, 20, buffer_height=10)
+        for y in range(5):
+            screen.print_at(str(y), 0, y)
+        screen.refresh()
+        screen.scroll()
+        screen.refresh()
+        self.assertEqual([line[0] for line in screen.display_text], ["1", "2", "3", "4", " "])
+        screen.scroll_region(screen.start_line + 1, 3, -1)
+        screen.refresh()
+        self.assertEqual([line[0] for line in screen.display_text], ["1", " ", "2", "3", " "])
+
+        # Screens that can scroll regions but don't override _scroll_region just redraw the band.
+        class RedrawScreen(HeadlessScreen):
+            def _scroll_region(self, y, height, lines):
+                Screen._scroll_region(self, y, height, lines)
+
+        screen = RedrawScreen(5, 20)
+        for y in range(5):
+            screen.print_at(str(y), 0, y)
+        screen.refresh()
+        screen.scroll_region(screen.start_line + 1, 3, 1)
+        screen.refresh()
+        self.assertEqual([line[0] for line in screen.display_text], ["0", "2", "3", " ", "4"])
+
+    def test_frame_stats(self):
+        """
+        Check that frame statistics can be recorded.
+        """
+        screen = HeadlessScreen(5, 20, events=[KeyboardEvent(ord("a"))])
+        self.assertEqual(screen.frame_stats, [])
+        frames = []
+        screen.enable_frame_stats(history=2, callback=frames.append)
+        effect = Print(screen, StaticRenderer(["Hello"]), 0, speed=1)
+        screen.set_scenes([Scene([effect], 10)], unhandled_input=lambda _: None)
+        for _ in range(4):
+            screen.force_update()
+            screen.draw_next_frame()
+
+        # Check that the callback sees all frames, but the history is limited.
+        self.assertEqual([stats.frame for stats in frames], [1, 2, 3, 4])
+        self.assertEqual(screen.frame_stats, frames[-2:])
+        self.assertEqual(frames[0].events, 1)
+        self.assertEqual(frames[1].events, 0)
+        self.assertEqual(frames[0].cells, 5)
+        self.assertEqual(frames[1].cells, 0)
+        self.assertEqual(frames[0].effect_times[0][0], effect)
+        for stats in frames:
+            self.assertGreaterEqual(stats.total_time,
+                                    stats.input_time + stats.update_time + stats.refresh_time)
+
+        # Check that recording can be switched off again.
+        screen.disable_frame_stats()
+        screen.force_update()
+        screen.draw_next_frame()
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(screen.frame_stats, [])
+
+    def test_coalesce_events(self):
+        """
+        Check that similar input events can be merged.
+        """
+        events = []
+
+        class RecordingEffect(MockEffect):
+            def process_event(self, event):
+                events.append(repr(event))
+                return None
+
+        screen = HeadlessScreen(5, 20, events=[
+            MouseEvent(1, 1, 0),
+            MouseEvent(2, 2, 0),
+            MouseEvent(2, 2, MouseEvent.LEFT_CLICK),
+            KeyboardEvent(Screen.KEY_DOWN),
+            KeyboardEvent(Screen.KEY_DOWN),
+            KeyboardEvent(Screen.KEY_DOWN),
+            KeyboardEvent(ord("a")),
+            KeyboardEvent(ord("a")),
+            KeyboardEvent(Screen.KEY_UP)])
+        screen.set_scenes([Scene([RecordingEffect(count=100)], -1)], coalesce_events=True)
+        screen.draw_next_frame()
+        self.assertEqual(events, [
+            "MouseEvent (2, 2) 0",
+            "MouseEvent (2, 2) 1",
+            "KeyboardEvent: {} x3".format(Screen.KEY_DOWN),
+            "KeyboardEvent: 97",
+            "KeyboardEvent: 97",
+            "KeyboardEvent: {}".format(Screen.KEY_UP)])
+
+        # Check that input processing can be limited on each frame.
+        del events[:]
+        screen.add_event(KeyboardEvent(Screen.KEY_DOWN))
+        screen.add_event(KeyboardEvent(ord("a")))
+        screen.set_scenes([Scene([RecordingEffect(count=100)], -1)], max_input_time=0)
+        screen.draw_next_frame()
+        self.assertEqual(events, ["KeyboardEvent: {}".format(Screen.KEY_DOWN)])
+        screen.draw_next_frame()
+        self.assertEqual(len(events), 2)
+
+    def test_play(self):
+        """
+        Check that scripted events drive Screen.play.
+        """
+        screen = HeadlessScreen(5, 20, events=[KeyboardEvent(ord("a"))])
+        screen.add_event(KeyboardEvent(ord("q")))
+        effect = MockEffect(count=100, swallow=False)
+        screen.set_title("Test")
+        screen.play([Scene([effect], 0)])
+        self.assertTrue(effect.event_called)
+        self.assertIsNone(screen.get_event())
+        self.assertFalse(screen.has_resized())
+        self.assertEqual(screen.title, "Test")
+
+
+class TestFrameScheduler(unittest.TestCase):
+    def setUp(self):
+        # Run all tests against a fake clock, recording how the scheduler waits.
+        self.now = 0.0
+        self.waits = []
+
+    def _clock(self):
+        return self.now
+
+    def _wait(self, delay, interruptible):
+        self.waits.append((round(delay, 6), interruptible))
+        self.now += delay
+
+    def _scheduler(self, **kwargs):
+        scheduler = FrameScheduler(**kwargs)
+        scheduler._now = self._clock
+        return scheduler
+
+    def _screen(self):
+        screen = HeadlessScreen(5, 20)
+        screen.wait_for_input = lambda delay: self._wait(delay, True)
+        return screen
+
+    def test_idle_frames(self):
+        """
+        Check that play sleeps until the next required update.
+        """
+        screen = self._screen()
+        effect = MockEffect(count=3, frame_rate=10)
+        screen.play([Scene([effect], -1)], scheduler=self._scheduler(fps=20))
+        self.assertEqual(self.waits, [(0.5, True), (0.5, True)])
+        self.assertEqual(screen._frame, 21)
+
+    def test_frame_rate(self):
+        """
+        Check that play runs at the target frame rate.
+        """
+        screen = self._screen()
+        effect = MockEffect(count=3)
+        with patch("time.sleep", side_effect=lambda delay: self._wait(delay, False)):
+            screen.play([Scene([effect], -1)], scheduler=self._scheduler(fps=50))
+        self.assertEqual(self.waits, [(0.02, False), (0.02, False)])
+
+        # Input can interrupt the delay if allowed.
+        self.waits = []
+        screen.play([Scene([MockEffect(count=2)], -1)], scheduler=self._scheduler(fps=50),
+                    allow_int=True)
+        self.assertEqual(self.waits, [(0.02, True)])
+
+        # No limit means no waiting.
+        self.waits = []
+        screen.play([Scene([MockEffect(count=2, frame_rate=10)], -1)],
+                    scheduler=self._scheduler(fps=None))
+        self.assertEqual(self.waits, [])
+        self.assertEqual(screen._frame, 11)
+
+        # Check invalid frame rates are rejected.
+        with self.assertRaises(ValueError):
+            FrameScheduler(fps=0)
+
+    def test_policies(self):
+        """
+        Check the policies for handling slow frames.
+        """
+        screen = self._screen()
+        for policy, passed, waits in ((FrameScheduler.SLIP, [1, 1], [(0.1, True)]),
+                                      (FrameScheduler.CATCH_UP, [1, 1, 1], [(0.05, True)]),
+                                      (FrameScheduler.DROP_FRAMES, [2, 1], [(0.05, True)])):
+            # Simulate a 2.5 frame delay in rendering the first frame.
+            self.now = 0.0
+            self.waits = []
+            scheduler = self._scheduler(fps=10, policy=policy)
+            scheduler.reset()
+            self.now = 0.25
+            results = [scheduler.wait(screen, 1, allow_int=True) for _ in passed]
+            self.assertEqual(results, passed)
+            self.assertEqual(self.waits, waits)
+
+    @unittest.skipIf(sys.version_info < (3, 5), "asyncio not supported")
+    def test_play_async(self):
+        """
+        Check that play_async runs Scenes inside an asyncio event loop.
+        """
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        # Without an input fd, the Screen polls for input on every frame.
+        screen = HeadlessScreen(5, 20, events=[KeyboardEvent(ord("a"))])
+        effect = MockEffect(count=2, frame_rate=0)
+        loop.call_later(0.01, screen.add_event, KeyboardEvent(ord("b")))
+        loop.run_until_complete(
+            screen.play_async([Scene([effect], -1)], scheduler=FrameScheduler(fps=100), loop=loop))
+        self.assertTrue(effect.event_called)
+
+        # Stopping the application completes the future.
+        screen = HeadlessScreen(5, 20)
+        effect = MockEffect(count=3)
+        future = screen.play_async([Scene([effect], -1)], scheduler=FrameScheduler(fps=None), loop=loop)
+        loop.run_until_complete(future)
+        self.assertIsNone(future.result())
+        self.assertEqual(screen._frame, 3)
+
+        # Other errors are passed back through the future.
+        screen = HeadlessScreen(5, 20)
+        future = screen.play_async([Scene([MockEffect(count=1, stop=False, next_scene="Missing")], -1)],
+                                   loop=loop)
+        with self.assertRaises(RuntimeError):
+            loop.run_until_complete(future)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "get_running_loop not supported")
+    def test_play_async_default_loop(self):
+        """
+        Check that play_async picks a sensible event loop when none is specified.
+        """
+        import asyncio
+
+        # Inside a coroutine, it uses the running loop.
+        async def play():
+            return await HeadlessScreen(5, 20).play_async(
+                [Scene([MockEffect(count=2)], -1)], scheduler=FrameScheduler(fps=None))
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        loop.run_until_complete(play())
+
+        # Otherwise, it creates a new loop rather than using the deprecated get_event_loop.
+        with patch("asyncio.get_event_loop", side_effect=RuntimeError("Deprecated")):
+            future = HeadlessScreen(5, 20).play_async(
+                [Scene([MockEffect(count=2)], -1)], scheduler=FrameScheduler(fps=None))
+        new_loop = future.get_loop()
+        self.addCleanup(new_loop.close)
+        self.assertIsNot(new_loop, loop)
+        new_loop.run_until_complete(future)
+        self.assertIsNone(future.result())
+
+    @unittest.skipIf(sys.platform == "win32" or sys.version_info < (3, 5), "asyncio readers not supported")
+    def test_play_async_wake_up(self):
+        """
+        Check that play_async sleeps until woken by input or a forced update.
+        """
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+
+        # Input on the fd wakes the Screen up.
+        screen = HeadlessScreen(5, 20)
+        screen._input_fd = read_fd
+        effect = MockEffect(count=2, frame_rate=0)
+        loop.call_later(0.01, screen.add_event, KeyboardEvent(ord("a")))
+        loop.call_later(0.01, os.write, write_fd, b"a")
+        start = time.time()
+        loop.run_until_complete(
+            screen.play_async([Scene([effect], -1)], scheduler=FrameScheduler(max_wait=10), loop=loop))
+        self.assertTrue(effect.event_called)
+        self.assertLess(time.time() - start, 5)
+
+        # So does a forced update.
+        os.read(read_fd, 1)
+        effect = MockEffect(count=2, frame_rate=0)
+        loop.call_later(0.01, screen.force_update)
+        start = time.time()
+        loop.run_until_complete(
+            screen.play_async([Scene([effect], -1)], scheduler=FrameScheduler(max_wait=10), loop=loop))
+        self.assertFalse(effect.event_called)
+        self.assertLess(time.time() - start, 5)
+
+    @unittest.skipIf(sys.platform == "win32" or sys.version_info < (3, 5), "asyncio readers not supported")
+    def test_play_async_wake_up_frames(self):
+        """
+        Check that waking up play_async part way through a wait keeps the frame count in step.
+        """
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        clock = [100.0]
+        scheduler = FrameScheduler(fps=10)
+        scheduler._now = lambda: clock[0]
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+
+        # Draw the first frame and then wait for 5 idle frames.
+        screen = HeadlessScreen(5, 20)
+        screen._input_fd = read_fd
+        future = screen.play_async(
+            [Scene([MockEffect(count=100, frame_rate=5)], -1)], scheduler=scheduler, loop=loop)
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(screen._frame, 1)
+        self.assertEqual(screen._next_frame_count, 5)
+
+        # Wake up with input and a forced update 2.5 frames into the wait - the 2 frames that
+        # went by must be counted, and the schedule should stay on the original time-line.
+        clock[0] += 0.25
+        screen.add_event(KeyboardEvent(ord("a")))
+        screen.force_update()
+        screen._wake_up_async(scheduler)
+        self.assertEqual(screen._frame, 3)
+        self.assertAlmostEqual(scheduler._last, 100.2)
+        future.cancel()
+        loop.run_until_complete(asyncio.sleep(0))
+
+
 if __name__ == '__main__':
     unittest.main()
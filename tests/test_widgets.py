@@ -1275,6 +1275,101 @@ class TestWidgets(unittest.TestCase):
             "                                        \n" +
             "                                        \n")
 
+    def test_repeated_keys(self):
+        """
+        Check that list and text widgets handle repeated key presses.
+        """
+        # Create a dummy screen.
+        screen = MagicMock(spec=Screen, colours=8, unicode_aware=False)
+        scene = MagicMock(spec=Scene)
+        canvas = Canvas(screen, 10, 40, 0, 0)
+
+        # Create the form we want to test.
+        form = Frame(canvas, canvas.height, canvas.width, has_border=False)
+        layout = Layout([100], fill_frame=True)
+        simple_list = ListBox(3, [("Item {}".format(i), i) for i in range(10)], name="simple_list")
+        text_box = TextBox(3, name="text_box")
+        form.add_layout(layout)
+        layout.add_widget(simple_list)
+        layout.add_widget(text_box)
+        form.fix()
+        form.register_scene(scene)
+        form.reset()
+
+        # Check that the list moves the selection by the repeat count.
+        form.process_event(KeyboardEvent(Screen.KEY_DOWN, repeat=4))
+        self.assertEqual(simple_list.value, 4)
+        form.process_event(KeyboardEvent(Screen.KEY_PAGE_DOWN, repeat=2))
+        self.assertEqual(simple_list.value, 9)
+        form.process_event(KeyboardEvent(Screen.KEY_UP, repeat=3))
+        self.assertEqual(simple_list.value, 6)
+
+        # Check that the text box moves the cursor by the repeat count.
+        text_box.value = ["Line {}".format(i) for i in range(10)]
+        form.switch_focus(layout, 0, 1)
+        form.process_event(KeyboardEvent(Screen.KEY_UP, repeat=5))
+        form.process_event(KeyboardEvent(ord("!")))
+        self.assertEqual(text_box.value[4], "Line 4!")
+
+    def test_repeated_keys_move_focus(self):
+        """
+        Check that repeated key presses left over after moving the focus are not lost.
+        """
+        def _form():
+            screen = MagicMock(spec=Screen, colours=8, unicode_aware=False)
+            canvas = Canvas(screen, 10, 40, 0, 0)
+            form = Frame(canvas, canvas.height, canvas.width, has_border=False)
+            layout = Layout([100])
+            layout2 = Layout([100])
+            form.add_layout(layout)
+            form.add_layout(layout2)
+            widgets = [Text(name="text1"),
+                       Text(name="text2"),
+                       Text(name="text3"),
+                       ListBox(3, [("Item {}".format(i), i) for i in range(5)], name="list")]
+            layout.add_widget(widgets[0])
+            layout.add_widget(widgets[1])
+            layout2.add_widget(widgets[2])
+            layout2.add_widget(widgets[3])
+            form.fix()
+            form.register_scene(MagicMock(spec=Scene))
+            form.reset()
+            return form, widgets
+
+        # A repeated key must have the same effect as sending each key press separately - moving
+        # the focus through the widgets (and Layouts) and then on to the list.
+        for key_code in [Screen.KEY_DOWN, Screen.KEY_UP]:
+            for count in range(1, 8):
+                form, widgets = _form()
+                form.process_event(KeyboardEvent(key_code, repeat=count))
+                form2, widgets2 = _form()
+                for _ in range(count):
+                    form2.process_event(KeyboardEvent(key_code))
+                self.assertEqual([w._has_focus for w in widgets], [w._has_focus for w in widgets2])
+                self.assertEqual(widgets[3].value, widgets2[3].value)
+
+        # Check the boundary explicitly - 3 presses to get to the list and the rest move down it.
+        form, widgets = _form()
+        form.process_event(KeyboardEvent(Screen.KEY_DOWN, repeat=6))
+        self.assertTrue(widgets[3]._has_focus)
+        self.assertEqual(widgets[3].value, 3)
+
+        # Long repeats through lots of widgets must not recurse.
+        screen = MagicMock(spec=Screen, colours=8, unicode_aware=False)
+        canvas = Canvas(screen, 10, 40, 0, 0)
+        form = Frame(canvas, canvas.height, canvas.width, has_border=False)
+        layout = Layout([100])
+        form.add_layout(layout)
+        count = sys.getrecursionlimit() + 10
+        widgets = [Text(name="text{}".format(i)) for i in range(count)]
+        for widget in widgets:
+            layout.add_widget(widget)
+        form.fix()
+        form.register_scene(MagicMock(spec=Scene))
+        form.reset()
+        form.process_event(KeyboardEvent(Screen.KEY_DOWN, repeat=count - 1))
+        self.assertTrue(widgets[-1]._has_focus)
+
     def test_multi_column_list_box_scrollbar(self):
         """
         Check MultiColumnListBox scrollbar works.
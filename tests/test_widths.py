@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from asciimatics.parsers import AsciimaticsParser
+from asciimatics.utilities import ColouredText
+from asciimatics.widths import char_width, string_width, truncate, column_offset, min_start
+
+
+class TestWidths(unittest.TestCase):
+    def test_widths(self):
+        """
+        Check that character and string widths allow for double-width glyphs.
+        """
+        self.assertEqual(char_width("a"), 1)
+        self.assertEqual(char_width("\t"), 1)
+        self.assertEqual(char_width("你"), 2)
+        self.assertEqual(char_width("\u0301"), 0)
+        self.assertEqual(string_width(""), 0)
+        self.assertEqual(string_width("abc"), 3)
+        self.assertEqual(string_width("a你確b"), 6)
+        self.assertEqual(string_width(ColouredText("${1}你${2}b", AsciimaticsParser())), 3)
+
+    def test_truncate(self):
+        """
+        Check that truncation never splits a double-width glyph.
+        """
+        self.assertEqual(truncate("abcdef", 3), "abc")
+        self.assertEqual(truncate("a你確b", 3), "a你")
+        self.assertEqual(truncate("a你確b", 4), "a你")
+        self.assertEqual(truncate("a你確b", 10), "a你確b")
+        self.assertEqual(truncate("你確", 0), "")
+        text = truncate(ColouredText("${1}你${2}確", AsciimaticsParser()), 3)
+        self.assertIsInstance(text, ColouredText)
+        self.assertEqual(str(text), "你")
+
+    def test_offsets(self):
+        """
+        Check conversion between display columns and character offsets.
+        """
+        self.assertEqual(column_offset("abcdef", 3), 3)
+        self.assertEqual(column_offset("abcdef", 10), 6)
+        self.assertEqual(column_offset("a你確b", 0), 0)
+        self.assertEqual(column_offset("a你確b", 1), 1)
+        self.assertEqual(column_offset("a你確b", 2), 1)
+        self.assertEqual(column_offset("a你確b", 3), 2)
+        self.assertEqual(column_offset("a你確b", 10), 4)
+
+        # Long lines give the same answers as short ones.
+        text = "a你確b" * 1000
+        self.assertEqual(column_offset(text, 6 * 500 + 3), 4 * 500 + 2)
+
+    def test_min_start(self):
+        """
+        Check that the start of a string can be dropped to fit a width.
+        """
+        self.assertEqual(min_start("abcdef", 4), 2)
+        self.assertEqual(min_start("abcdef", 4, at_end=True), 3)
+        self.assertEqual(min_start("abcdef", 10), 0)
+        self.assertEqual(min_start("a你確b", 4), 2)
+        self.assertEqual(min_start("a你確b", 3), 2)
+        self.assertEqual(min_start("a你確b", 3, at_end=True), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()